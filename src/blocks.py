@@ -0,0 +1,61 @@
+
+
+import numpy as np
+
+
+class Blocks():
+
+    '''
+    This class holds the lookup tables for city blocks. A block is stored
+    as a 4-bit mask where bit 0 is set if the block has road access on the
+    right side, bit 1 stands for the top side, bit 2 for the left side and
+    bit 3 for the bottom side, the same order the sides have always had in the
+    CityCenter-object. The layout of a CityCenter-object is an n x n NumPy
+    array of these masks ('numpy.uint8'), 'CityCenter.blocks[i, j]' being the
+    block in column i and row j. The twelve possible masks are named below and
+    listed in 'self.OPTIONS', the four dead ends don't exist. 'self.WEIGHT'
+    tells how many accessible sides a mask has, 'self.TYPE' what kind of a
+    piece it is, 'self.DIRECTIONS' lists the accessible sides in increasing
+    order and 'self.SIDES' has the old four-term list of each mask. Each table
+    has an entry for all 16 masks, 'self.WEIGHTS' is the same as 'self.WEIGHT'
+    as an array so that whole layouts can be looked up at once.
+    '''
+
+    # The accessible sides
+    RIGHT = 1
+    TOP = 2
+    LEFT = 4
+    BOTTOM = 8
+
+    # The twelve blocks
+    LAWN = 0
+    HORIZONTAL = RIGHT | LEFT
+    VERTICAL = TOP | BOTTOM
+    CURVE_1 = RIGHT | TOP
+    CURVE_2 = TOP | LEFT
+    CURVE_3 = LEFT | BOTTOM
+    CURVE_4 = RIGHT | BOTTOM
+    T_INTERSECTION_1 = RIGHT | TOP | BOTTOM
+    T_INTERSECTION_2 = RIGHT | TOP | LEFT
+    T_INTERSECTION_3 = TOP | LEFT | BOTTOM
+    T_INTERSECTION_4 = RIGHT | LEFT | BOTTOM
+    FOUR_WAY = RIGHT | TOP | LEFT | BOTTOM
+
+    OPTIONS = [LAWN, HORIZONTAL, VERTICAL, CURVE_1, CURVE_2, CURVE_3, CURVE_4,
+        T_INTERSECTION_2, T_INTERSECTION_3, T_INTERSECTION_4, T_INTERSECTION_1, FOUR_WAY]
+
+    # The kinds of pieces
+    EMPTY = 0
+    DEAD_END = 1
+    STRAIGHT = 2
+    CURVE = 3
+    T_INTERSECTION = 4
+    INTERSECTION = 5
+
+    WEIGHT = [bin(mask).count('1') for mask in range(16)]
+    WEIGHTS = np.array(WEIGHT, dtype=np.uint8)
+    DIRECTIONS = [tuple(side for side in range(4) if mask >> side & 1) for mask in range(16)]
+    # The [right, top, left, bottom] lists of 1s and 0s the blocks used to be.
+    SIDES = [[mask >> side & 1 for side in range(4)] for mask in range(16)]
+    TYPE = [EMPTY, DEAD_END, DEAD_END, CURVE, DEAD_END, STRAIGHT, CURVE, T_INTERSECTION,
+        DEAD_END, CURVE, STRAIGHT, T_INTERSECTION, CURVE, T_INTERSECTION, T_INTERSECTION, INTERSECTION]
@@ -3,19 +3,28 @@
 from random import randint
 from constants import Constants
 from graph import Graph
+from conflict_table import ConflictTable
+from route_cache import RouteCache
+from pair_cache import PairCache
+from scheduler import Scheduler
+from lanes import Lanes
+from kinetic_queue import KineticQueue
+from layout_generator import LayoutGenerator
+from union_find import UnionFind
+from blocks import Blocks
 
 
 class CityCenter():
     
     '''
     This class represents the area in which the vehicles move.
-    In this class a city block is represented as a list with four 
-    binary values. If the observed value is 1, the block has road access
-    on this side. The value at index 0 stands for the right side,
-    index 1 stands for the top side and so on. The only unavailable
-    block is a block with three zeros and only a single one, if this
-    existed, it would look like a dead end road piece. For further 
-    information, check 'self.set_options' and 'self.options'.
+    In this class a city block is represented as a 4-bit mask. If the
+    observed bit is set, the block has road access on this side. Bit 0
+    stands for the right side, bit 1 stands for the top side and so on.
+    The layout 'self.blocks' is an n x n NumPy array of these masks. The
+    only unavailable blocks are the ones with a single bit set, if these
+    existed, they would look like dead end road pieces. For further
+    information, check 'self.set_options' and the Blocks-class.
     '''
     
     def __init__(self, dimensions):
@@ -28,23 +37,39 @@ class CityCenter():
         self.set_maximum()
         # A graph to resemble the road structure.
         self.graph = Graph(self.blocks)
+        # The crossings of every pair of path pieces on the same block.
+        self.conflicts = ConflictTable()
+        # The crossings of the paths of every pair of vehicles.
+        self.pairs = PairCache(self.conflicts)
+        # Every route generated so far, shared by the vehicles.
+        self.routes = RouteCache()
         # These will get updated as vehicles enter the map, check 
         # 'self.update' and 'self.add_vehicle' for further information.
         # 'self.availabe' and 'self.cooldown' will complement each other.
         self.vehicles = []
         self.available = []
         self.cooldown = dict()
+        # Every radar gets it's targets from this queue, the vehicles 
+        # get an identifier in the order they are added to the city.
+        self.queue = KineticQueue()
+        self.next_id = 0
+        # The turns of the vehicles for the heavy work.
+        self.scheduler = Scheduler()
+        # The vehicles on each piece of road in order.
+        self.lanes = Lanes()
         # Set all the locations where the 
         # map can be entered and exited.
         self.set_borders() 
+        # The exits that can be reached from each entry.
+        self.set_reachable()
         
     def get_vehicles(self): return self.vehicles    
         
     def get_dimensions(self): return self.dimensions
     
     def get_block(self, x, y):
-        # Returns the identifier for the block at indexes x, y.
-        return self.blocks[x][y]
+        # Returns the identifier (mask) for the block at indexes x, y.
+        return int(self.blocks[x, y])
     
     def is_overheated(self):
         # When this returns True, the city isn't physically full, but
@@ -62,11 +87,20 @@ class CityCenter():
         
         done = []
         
+        # Move every vehicle first, then let each of
+        # them decide what to do from the new positions.
+        for vehicle in self.get_vehicles(): vehicle.run()
+        self.queue.advance()
+        self.scheduler.next()
+        
         # Keep every relevant vehicle moving,
         # remove all the irrelevant ones.
         for vehicle in self.get_vehicles():
             if not vehicle.is_done():
-                vehicle.drive()
+                if vehicle.is_asleep() and not vehicle.is_due():
+                    # Nothing around it has changed, check 'Vehicle.sleep'.
+                    vehicle.doze()
+                else: vehicle.drive()
             else:
                 # If we get here, this vehicle has reached it's
                 # goal and is no longer needed for the simulation.
@@ -111,15 +145,15 @@ class CityCenter():
         return self.maximum - subtraction
     
     def remove_vehicles(self, done):
-        # Remove every vehicle in 'done' and care of the radars of all the
-        # remaining vehicles. This method can also be called by the GUI.
+        # Remove every vehicle in 'done' from the city and from the queue the
+        # radars use. This method can also be called by the Simulation-object.
         
         for vehicle in done:
             self.get_vehicles().remove(vehicle)
-            
-        for vehicle in self.get_vehicles():
-            for removed in done:
-                vehicle.get_radar().remove_target(removed)
+            self.queue.remove(vehicle)
+            self.pairs.forget(vehicle)
+            self.scheduler.remove(vehicle)
+            self.lanes.remove(vehicle)
     
     def add_vehicle(self, added_vehicle):
         # This method adds a new new vehicle on the map. Before the vehicle can 
@@ -128,54 +162,19 @@ class CityCenter():
         # in 'self.entry_points' and in 'self.exit_points'. 'self.available' and 
         # 'self.cooldown' tell which of them can be used at the moment.
                                         
+        # Choose the vehicle entry location by random, any of 'self.available' will do.
         ok_indexes = self.available
-        limit = len(self.entry_points)-1
-        
-        OK = False
-        while not OK:
-            # Choose the vehicle entry location by random.
-            index1 = randint(0, limit)
-            # The index must be in 'self.available'.
-            if index1 in ok_indexes:
-                OK = True
+        index1 = ok_indexes[randint(0, len(ok_indexes)-1)]
+        
+        # Choose the goal randomly, but aim for a different side on the map. Some exits
+        # might be unavailable to certain entry points though, depends on the layout.
+        # In that case any exit that can be reached will do, check 'self.set_reachable'.
+        preferred, reachable = self.reachable[index1]
+        if len(preferred): index2 = preferred[randint(0, len(preferred)-1)]
+        else: index2 = reachable[randint(0, len(reachable)-1)]
 
-        entry = self.entry_points[index1]
-        
-        OK = False
-        while not OK:
-            # Choose the goal randomly, but aim for a different side on the map.
-            index2 = randint(index1+int(0.25*limit), index1+int(0.75*limit))
-            if index2 > limit:
-                index2 -= limit
-            # The vehicle can not enter and exit the map at the same location.
-            if index1 != index2:
-                OK = True
-            
-        goal = self.exit_points[index2]
-
-        # Let the vehicle's Pathh-object decide the route between these locations.
-        # Some exits might be unavailable to certain entry points though, depends on 
-        # the layout. If 'functioning' equals True, 'added_vehicle' has a functioning path.
-        functioning = added_vehicle.get_path().generate_path(self.graph, self.blocks, entry, goal)
-        
-        while not functioning:
-            # Hold on to the same entry and find a goal location 
-            # that enables a functioning path between these two.
-            
-            OK = False
-            while not OK:
-                # The path generation failed on the 
-                # first try, make the requirements easier.
-                index2 = randint(0, limit)
-                if index2 > limit:
-                    index2 -= limit
-                if index1 != index2:
-                    OK = True
-                    
-            goal = self.exit_points[index2]
-            
-            # Try as many times as it takes.
-            functioning = added_vehicle.get_path().generate_path(self.graph, self.blocks, entry, goal)
+        # Let the vehicle's Pathh-object follow the route between these locations.
+        self.set_route(added_vehicle.get_path(), index1, index2)
                    
         # 5 seconds of cool down for the chosen entry.
         self.cooldown[index1] = 5000
@@ -183,48 +182,52 @@ class CityCenter():
         # Remove the entry from 'self.available' for the time being.
         self.available.remove(index1)
         
-        for vehicle in self.get_vehicles():
-            # Update every vehicle's radar of surrounding
-            # vehicles, including the freshly added one.
-            vehicle.get_radar().add_target(added_vehicle)
-            added_vehicle.get_radar().add_target(vehicle)
+        # Let the radar get the surrounding vehicles from the queue.
+        added_vehicle.id = self.next_id
+        self.next_id += 1
+        self.scheduler.add(added_vehicle)
+        self.lanes.add(added_vehicle)
+        added_vehicle.get_radar().set_queue(self.queue)
+        added_vehicle.get_radar().set_conflicts(self.conflicts)
+        added_vehicle.get_radar().set_pairs(self.pairs)
         
         self.vehicles.append(added_vehicle)
         
         # Now that everything is taken care of, spawn 'added_vehicle'
         # on the map. The GUI will take care of the graphics.
         added_vehicle.spawn()
+        
+        # The other radars will see the vehicle right away.
+        self.queue.insert(added_vehicle)
+    
+    def set_route(self, path, index1, index2):
+        # Give 'path' the route from entry point 'index1' to exit point 'index2'. The
+        # route is generated only the first time it's needed, after that it's found from
+        # 'self.routes'. Returns False if there is no route between these two points.
+        
+        key = (index1, index2)
+        if key in self.routes:
+            route = self.routes.get(key)
+            if route is None: return False
+            path.set_route(route)
+            return True
+        
+        entry = self.entry_points[index1]
+        goal = self.exit_points[index2]
+        if path.generate_path(self.graph, self.blocks, entry, goal):
+            self.routes.put(key, path.get_route())
+            return True
+        self.routes.put(key, None)
+        return False
     
     def set_options(self):
-        self.options = [None]*12
-        # These represent all the 
-        # possible city block variations.
-        self.options[0] = [0,0,0,0]
-        self.options[1] = [1,0,1,0]
-        self.options[2] = [0,1,0,1]
-        self.options[3] = [1,1,0,0]
-        self.options[4] = [0,1,1,0]
-        self.options[5] = [0,0,1,1]
-        self.options[6] = [1,0,0,1]
-        self.options[7] = [1,1,1,0]
-        self.options[8] = [0,1,1,1]
-        self.options[9] = [1,0,1,1]
-        self.options[10] = [1,1,0,1]
-        self.options[11] = [1,1,1,1]
+        # These represent all the possible city block
+        # variations, in the same order as in 'LayoutGenerator'.
+        self.options = Blocks.OPTIONS[:]
         
     def calculate_weight(self, block):
         # A blocks weight is defined by how many accessible sides it has.
-        weight = 0
-        for i in block:
-            if i == 1:
-                weight += 1
-        return weight
-        
-    def check_adjacent(self, block, index):
-        # This method is helps to determine which blocks can be placed next to the current one.
-        if block == [None]: return None
-        elif block[index] == 1: return 1
-        else: return 0
+        return Blocks.WEIGHT[block]
         
     def on_the_edge(self, i, j):
         # Returns True if the block at indexes i, j is on the edge of the map.
@@ -234,234 +237,83 @@ class CityCenter():
         elif j == self.get_dimensions()-1: return True
         else: return False
 
-    def find_suitable(self, conditions):
-        # This method chooses and returns a suitable block for the current situation.
-        # If there are more than one suitable block, the block is chosen randomly from these.
-        
-        suitables = self.options[:]
-        unsuitables = []
-        
-        # 12 elements in 'self.options'
-        for i in range(12):
-            # 4 values in a block
-            for j in range(4):
-                # 0 and 1 are the conditions
-                if conditions[j] == 0:
-                    if self.options[i][j] != 0:
-                        if not self.options[i] in unsuitables:
-                            unsuitables.append(self.options[i])
-                elif conditions[j] == 1:
-                    if self.options[i][j] != 1:
-                        if not self.options[i] in unsuitables:
-                            unsuitables.append(self.options[i])
-        
-        for block in unsuitables:
-            suitables.remove(block)
-        
-        if len(suitables) == 0: return None
-        
-        index = randint(0, len(suitables)-1)
-        chosen = suitables[index]
-        
-        return chosen
-        
     def set_blocks(self):
+        # Form the city layout, check 'LayoutGenerator'. If there are dead loops, the
+        # blocks around them are chosen again, this happens rarely. If that doesn't
+        # help after a few tries, the whole layout is made again.
+        
+        self.generator = LayoutGenerator(self.get_dimensions())
+        self.blocks = self.generator.generate()
+        tries = 0
+        
+        dead_loops = self.find_dead_loops()
+        while len(dead_loops):
+            tries += 1
+            if tries > 5:
+                self.blocks = self.generator.generate()
+                tries = 0
+            else:
+                blocks = []
+                for intersection, chain in dead_loops:
+                    blocks.append(intersection)
+                    blocks += chain
+                # Reach a bit further every time.
+                self.blocks = self.generator.repair(blocks, tries)
+            dead_loops = self.find_dead_loops()
+    
+    def find_dead_loops(self):
+        # This method finds the "dead" loops in the city layout. A dead loop is a loop that
+        # starts from an intersection and ends at the same intersection without having another
+        # intersection-piece in between. Every road block inside the edges that is not an
+        # intersection is part of exactly one chain of such blocks. The chains are formed
+        # by merging neighboring blocks with a UnionFind-object, after which the ends of each
+        # chain are known. A chain is dead if both of its ends lead to the same intersection.
+        # Returns a list of (intersection, chain) tuples, where 'intersection' is an (i, j)
+        # tuple and 'chain' is a list of (i, j) tuples.
         
         limit = self.get_dimensions()
-
-        # Initialize the blocks.
-        self.blocks = []
-        for i in range(limit):
-            self.blocks.append([])
-            for j in range(limit):
-                self.blocks[i].append([None])
-                
-        # Set the bottom and top rows first.
-        for i in range(limit):
-            for j in range(limit):
-                if j == 0:
-                    if i%2: self.blocks[i][j] = [0,1,0,1]
-                    else: self.blocks[i][j] = [0,0,0,0]
-                    if i == limit-1: self.blocks[i][j] = [0,0,0,0]
-                elif j == limit-1 and limit%2:
-                    if i%2: self.blocks[i][j] = [0,1,0,1]
-                    else: self.blocks[i][j] = [0,0,0,0]
-                    if i == 0 or i == limit-1: self.blocks[i][j] = [0,0,0,0]
-                elif j == limit-1 and not limit%2:
-                    if not i%2: self.blocks[i][j] = [0,1,0,1]
-                    else: self.blocks[i][j] = [0,0,0,0]
-                    if i == 0 or i == limit-1: self.blocks[i][j] = [0,0,0,0]   
-                                                       
-        # Set the left-most and right-most columns.      
-        for i in range(limit):
-            for j in range(1, limit-1):
-                if i == 0 and not limit%2:
-                    if not j%2: self.blocks[i][j] = [1,0,1,0]
-                    else: self.blocks[i][j] = [0,0,0,0]
-                elif i == 0 and limit%2:
-                    if j%2: self.blocks[i][j] = [1,0,1,0]
-                    else: self.blocks[i][j] = [0,0,0,0]
-                elif i == limit-1:
-                    if j%2: self.blocks[i][j] = [1,0,1,0]
-                    else: self.blocks[i][j] = [0,0,0,0]      
-        
-        # Set four connecting pieces near the corners.
-        if limit >= 6 and limit%2:
-            self.blocks[1][1] = [0,1,1,1]
-            self.blocks[limit-2][1] = [1,1,1,0]
-            self.blocks[1][limit-2] = [1,0,1,1]
-            self.blocks[limit-2][limit-2] = [1,1,0,1]      
-        elif limit >= 6:
-            self.blocks[1][2] = [0,1,1,1]
-            self.blocks[limit-3][1] = [1,1,1,0]
-            self.blocks[2][limit-2] = [1,0,1,1]
-            self.blocks[limit-2][limit-3] = [1,1,0,1]
-        
-        # Set a few centerpieces next.
-        if limit == 4:
-            # No randomness in a 4x4 layout.
-            self.blocks[1][1] = [0,1,0,1]
-            self.blocks[1][2] = [1,1,1,0]
-            self.blocks[2][1] = [1,0,0,1]
-            self.blocks[2][2] = [0,1,1,1]
-        elif limit == 5:
-            self.blocks[2][2] = [1,0,1,1]
-            self.blocks[3][2] = [0,1,1,0]
-            self.blocks[2][3] = [1,1,0,0]
-        elif limit == 6:
-            self.blocks[2][2] = [1,1,0,0]
-            self.blocks[2][3] = [0,0,0,0]
-            self.blocks[3][2] = [1,0,1,1]
-            self.blocks[3][3] = [0,1,0,1]
-        elif limit == 7:
-            self.blocks[2][2] = [1,0,1,1]
-            self.blocks[2][4] = [1,1,1,1]
-            self.blocks[4][2] = [1,1,1,1]
-            self.blocks[4][4] = [1,1,1,0]
-            self.blocks[3][2] = [1,0,1,0]
-            self.blocks[3][4] = [1,0,1,0]
-            self.blocks[2][3] = [0,1,0,1]
-            self.blocks[4][3] = [0,1,0,1]
-            self.blocks[3][3] = [0,0,0,0]
-            self.blocks[1][4] = [1,1,0,0]
-            self.blocks[4][5] = [0,0,0,0]
-            self.blocks[3][5] = [0,0,1,1]
-        elif limit == 8:
-            self.blocks[1][1] = [1,1,0,0]
-            self.blocks[1][2] = [1,0,1,1]
-            self.blocks[2][1] = [1,0,1,1]
-            self.blocks[2][2] = [0,1,1,0]
-            self.blocks[5][2] = [0,0,0,0]
-            self.blocks[2][5] = [0,0,0,0]
-            self.blocks[3][3] = [1,0,0,1]
-            self.blocks[4][3] = [1,1,1,1]
-            self.blocks[3][4] = [0,1,1,0]
-            self.blocks[4][4] = [0,1,0,1]
-            self.blocks[2][4] = [1,0,1,0]
-            self.blocks[2][3] = [0,0,0,0]
-            self.blocks[4][2] = [0,1,0,1]
-            self.blocks[3][2] = [0,0,0,0]
-            self.blocks[6][4] = [0,1,0,1]
-        elif limit == 9:
-            self.blocks[3][3] = [0,0,0,0]
-            self.blocks[4][3] = [0,1,0,1]
-            self.blocks[5][3] = [0,0,0,0]
-            self.blocks[3][4] = [1,0,1,0]
-            self.blocks[4][4] = [1,1,1,1]
-            self.blocks[5][4] = [1,0,1,0]
-            self.blocks[3][5] = [0,0,0,0]
-            self.blocks[4][5] = [0,1,0,1]
-            self.blocks[5][5] = [0,0,0,0]
-            self.blocks[2][1] = [0,0,0,0]
-            self.blocks[7][2] = [0,0,0,0]
-            self.blocks[1][6] = [0,0,0,0]
-            self.blocks[6][7] = [0,1,1,0]
-            self.blocks[7][6] = [0,0,1,1]
-            self.blocks[7][5] = [1,1,1,0]
-            self.blocks[7][4] = [0,1,0,1]
-            self.blocks[2][3] = [0,1,0,1]
-            
-        # Set the missing pieces, this is partially random.
-        for i in range(1,limit-1):
-            for j in range(1,limit-1):
-                if self.blocks[i][j] == [None]:                    
-                    # The requirement can be 1, 0 or None, depends on the adjacent block and its observed side.                    
-                    right_requirement = self.check_adjacent(self.blocks[i+1][j], 2)
-                    above_requirement = self.check_adjacent(self.blocks[i][j-1], 3)
-                    left_requirement = self.check_adjacent(self.blocks[i-1][j], 0)
-                    below_requirement = self.check_adjacent(self.blocks[i][j+1], 1)
-                    new = self.find_suitable([right_requirement,above_requirement,left_requirement,below_requirement])
-                    if new == None:
-                        self.set_blocks()
-                    else: self.blocks[i][j] = new
-        
-        # If there are dead loops, make a new one.
-        self.check_for_dead_loops()
-                
-    def check_for_dead_loops(self):
-        # This method finds if there are any "dead" loops in the city layout.
-        # A dead loop is a loop that starts from an intersection and ends at the same
-        # intersection without having another intersection-piece in between.
-        
-        limit = self.get_dimensions()
-        visited = []
+        blocks = self.blocks.tolist()
+        weight = Blocks.WEIGHT
+        chains = UnionFind(limit*limit)
         
-        for i in range(limit):
-            visited.append([])
-            for j in range(limit):
-                # Lawn and edge pieces are automatically visited.
-                if self.calculate_weight(self.get_block(i,j)) == 0 or self.on_the_edge(i,j):
-                    visited[i].append(True)
-                else: visited[i].append(False)
-        
-        self.dead = False
+        def in_chain(i, j):
+            # A road block between two others.
+            return 0 < i < limit-1 and 0 < j < limit-1 and weight[blocks[i][j]] == 2
         
+        # Merge every chain block with the chain block on the right and below, if they are connected.
+        members = []
         for i in range(1, limit-1):
             for j in range(1, limit-1):
-                if visited[i][j] == False:
-                    self.DFS(visited, i, j, None, None, None)      
-        
-        if self.dead:
-            # Let's try again, this happens rarely.
-            self.set_blocks()
-
-    def DFS(self, visited, i, j, i_start, j_start, previous):
-        # This recursive algorithm goes through the blocks in depth-first search
-        # order. When we arrive to an unvisited intersection, after marking it visited, we 
-        # first try the block on the right, if we have access to it. Next we try the one above,
-        # the one on the left and the one below respectively. The previous parameter tells
-        # the direction the current block was entered from (0, 1, 3, 3), this way we don't 
-        # start to backtrack. This method is called from 'self.check_dead_loops()'.
-        
-        visited[i][j] = True
-        
-        # If this is an intersection block we start looking for dead loops from here.
-        # If we find an intersection block in the observed chain of blocks, we can safely say
-        # that no dead loops start from the the previous observation point (if there was one).
-        if self.calculate_weight(self.get_block(i, j)) > 2:
-            i_start, j_start = i, j
-            
-        # Try moving right.
-        if self.blocks[i][j][0] == 1 and not previous == 0:
-            if visited[i+1][j] == True:
-                if i+1 == i_start and j == j_start: self.dead = True
-            else: self.DFS(visited, i+1, j, i_start, j_start, 2)
-        # Try moving up.
-        if self.blocks[i][j][1] == 1 and not previous == 1:
-            if visited[i][j-1] == True:
-                if i == i_start and j-1 == j_start: self.dead = True
-            else: self.DFS(visited, i, j-1, i_start, j_start, 3)
-        # Try moving left.
-        if self.blocks[i][j][2] == 1 and not previous == 2:
-            if visited[i-1][j] == True:
-                if i-1 == i_start and j == j_start: self.dead = True
-            else: self.DFS(visited, i-1, j, i_start, j_start, 0)
-        # Try moving down.
-        if self.blocks[i][j][3] == 1 and not previous == 3:
-            if visited[i][j+1] == True:
-                if i == i_start and j+1 == j_start: self.dead = True
-            else: self.DFS(visited, i, j+1, i_start, j_start, 1)
-            
+                if not in_chain(i, j): continue
+                members.append((i, j))
+                if blocks[i][j] & Blocks.RIGHT and in_chain(i+1, j): chains.union(i*limit+j, (i+1)*limit+j)
+                if blocks[i][j] & Blocks.BOTTOM and in_chain(i, j+1): chains.union(i*limit+j, i*limit+j+1)
+        
+        # The blocks each chain leads to on its two ends.
+        ends = dict()
+        steps = ((1, 0), (0, -1), (-1, 0), (0, 1))
+        for i, j in members:
+            for side in Blocks.DIRECTIONS[blocks[i][j]]:
+                i_next, j_next = i+steps[side][0], j+steps[side][1]
+                if not in_chain(i_next, j_next):
+                    root = chains.find(i*limit+j)
+                    if root in ends: ends[root].append((i_next, j_next))
+                    else: ends[root] = [(i_next, j_next)]
+        
+        dead = dict()
+        for root in ends.keys():
+            chain_ends = ends[root]
+            if len(chain_ends) == 2 and chain_ends[0] == chain_ends[1]:
+                i, j = chain_ends[0]
+                if not self.on_the_edge(i, j):
+                    dead[root] = (chain_ends[0], [])
+        
+        for i, j in members:
+            root = chains.find(i*limit+j)
+            if root in dead: dead[root][1].append((i, j))
+        
+        return list(dead.values())
+    
     def set_maximum(self):
         # The maximum vehicle occupation is directly proportional
         # to the city dimensions, e.g. the length of the map edge.
@@ -496,11 +348,13 @@ class CityCenter():
         
         self.entry_points = []
         self.exit_points = []
+        # The graph vertex of each entry and exit point.
+        self.border_vertices = []
         
         for vertex in self.graph.get_vertices():
             
-            # The vertex itself tells the coordinates.
-            i, j = int(vertex[0]), int(vertex[1])
+            # The graph tells the coordinates of the vertex.
+            i, j = self.graph.get_location(vertex)
 
             if i == 0:
                 # Left side
@@ -534,13 +388,48 @@ class CityCenter():
                 self.exit_points.append([])
                 self.exit_points[-1].append(i*x + x/2 - r)  
                 self.exit_points[-1].append(limit*x)
+            else:
+                # An intersection inside the map.
+                continue
+            
+            self.border_vertices.append(vertex)
+        
+    def set_reachable(self):
+        # Find out which exits can be reached from each entry, one shortest path tree 
+        # per entry vertex is enough. 'self.reachable' is a list of (preferred, reachable)
+        # tuples, one for each entry index. Both are lists of exit indexes, the preferred
+        # ones are on a different side of the map than the entry. An entry without any
+        # reachable exits is left out of 'self.available' for good.
+        
+        limit = len(self.entry_points)-1
+        self.reachable = []
+        
+        for index1 in range(len(self.entry_points)):
+            distances = self.graph.get_distances(self.border_vertices[index1])
+            # The vehicle can not enter and exit the map at the same location.
+            reachable = [index2 for index2 in range(len(self.exit_points)) \
+                if index2 != index1 and self.border_vertices[index2] in distances]
+            # Aim for the exits a quarter to three quarters around the map from the entry.
+            preferred = []
+            for index2 in range(index1+int(0.25*limit), index1+int(0.75*limit)+1):
+                if index2 > limit:
+                    index2 -= limit
+                if index2 in reachable and not index2 in preferred:
+                    preferred.append(index2)
+            self.reachable.append((preferred, reachable))
         
         # List 'self.available' will quickly tell the indexes of currently 
         # accessible entries. As a vehicle uses a certain location to enter 
         # the map, this can not be used immediately again, otherwise vehicles 
         # might collide right as they spawn.
+        self.set_available()
+        
+    def set_available(self):
+        # Every entry with at least one reachable exit is available.
+        self.available = []
         for index in range(len(self.entry_points)):
-            self.available.append(index)
+            if len(self.reachable[index][1]):
+                self.available.append(index)
             
     def reset(self):
         # This is called when a new simulation is 
@@ -548,11 +437,12 @@ class CityCenter():
         # GUI will take care of the expired graphics.
         
         self.vehicles = []
-        self.available = []
         self.cooldown = dict()
-        
-        for index in range(len(self.entry_points)):
-            self.available.append(index)
+        self.queue.clear()
+        self.pairs.clear()
+        self.scheduler.clear()
+        self.lanes.clear()
+        self.set_available()
 
         
         
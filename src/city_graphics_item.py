@@ -5,6 +5,7 @@ from PyQt5.QtWidgets import QGraphicsItem
 from PyQt5.Qt import QGraphicsRectItem, QBrush, QColor
 from PyQt5.QtCore import QPointF, QRectF, Qt
 from constants import Constants
+from blocks import Blocks
 
 class CityGraphicsItem(QGraphicsItem):
     
@@ -14,9 +15,9 @@ class CityGraphicsItem(QGraphicsItem):
     and returned to the GUI, which then adds the block to the 
     scene. There are twelve options in total, 'self.identifier'
     will decide which kind of a piece the CityGraphicsItem-
-    object will resemble. The identifier will be a four-term
-    list, check 'self.paint' and 'CityCenter.set_options' for
-    further information.
+    object will resemble. The identifier will be a block mask,
+    check 'self.paint' and the Blocks-class for further
+    information.
     '''
     
     def __init__(self, x, y, identifier):
@@ -38,20 +39,20 @@ class CityGraphicsItem(QGraphicsItem):
         self.painter.setPen(QColor(211, 211, 211))
         self.painter.drawRect(rect)
 
-        if self.identifier == [0,0,0,0]: self.lawn()
+        if self.identifier == Blocks.LAWN: self.lawn()
         
-        elif self.identifier == [1,0,1,0]: self.horizontal_road()
-        elif self.identifier == [0,1,0,1]: self.vertical_road()
+        elif self.identifier == Blocks.HORIZONTAL: self.horizontal_road()
+        elif self.identifier == Blocks.VERTICAL: self.vertical_road()
         
-        elif self.identifier == [1,1,0,0]: self.curve1()
-        elif self.identifier == [0,1,1,0]: self.curve2()
-        elif self.identifier == [0,0,1,1]: self.curve3()
-        elif self.identifier == [1,0,0,1]: self.curve4()
+        elif self.identifier == Blocks.CURVE_1: self.curve1()
+        elif self.identifier == Blocks.CURVE_2: self.curve2()
+        elif self.identifier == Blocks.CURVE_3: self.curve3()
+        elif self.identifier == Blocks.CURVE_4: self.curve4()
         
-        elif self.identifier == [1,1,0,1]: self.t_intersection1()
-        elif self.identifier == [1,1,1,0]: self.t_intersection2()
-        elif self.identifier == [0,1,1,1]: self.t_intersection3()
-        elif self.identifier == [1,0,1,1]: self.t_intersection4()
+        elif self.identifier == Blocks.T_INTERSECTION_1: self.t_intersection1()
+        elif self.identifier == Blocks.T_INTERSECTION_2: self.t_intersection2()
+        elif self.identifier == Blocks.T_INTERSECTION_3: self.t_intersection3()
+        elif self.identifier == Blocks.T_INTERSECTION_4: self.t_intersection4()
         
         else: self.four_way_intersection()
         
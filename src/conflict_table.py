@@ -0,0 +1,160 @@
+
+
+import numpy as np
+from constants import Constants
+from path import Pathh
+from radar import Radar
+
+
+class ConflictTable():
+
+    '''
+    Every path is built from the same twelve pieces: a straight line, a wide
+    left turn or a strict right turn, each facing one of four ways (check
+    'Pathh.set_line', 'Pathh.set_curve_1' and 'Pathh.set_curve_2'). Every piece
+    is placed on a block-aligned origin, therefore whether two pieces come close
+    to each other only depends on the kinds of the pieces and on how far apart
+    their blocks are. This class compares the coordinates of every pair of pieces
+    once, when the CityCenter-object is constructed. 'self.near' tells if two
+    pieces can come close at all when the second one is placed on the same or
+    one of the eight neighbouring blocks, the key is (own key, target key,
+    column offset, row offset). A piece never leaves it's block, so pieces
+    further apart never meet. The table only tells which pieces of two paths
+    need to be compared, the coordinates of those are then compared exactly,
+    so the answers are the same as comparing every coordinate of both paths.
+    '''
+
+    def __init__(self):
+        self.size = Constants.BLOCK_SIZE
+        self.radar = Radar()
+        self.pieces = dict()
+        self.lengths = dict()
+        self.near = dict()
+        self.set_pieces()
+        self.set_near()
+
+    def get_length(self, key): return self.lengths[key]
+
+    def set_pieces(self):
+        # Form the coordinates of every piece placed on the origin.
+        for kind in (Pathh.LINE, Pathh.CURVE_1, Pathh.CURVE_2):
+            for ctuple in ((1, 1), (-1, 1), (-1, -1), (1, -1)):
+                key = (kind, ctuple)
+                piece = self.set_piece(kind, ctuple)
+                self.pieces[key] = np.array(piece, dtype=float)
+                self.lengths[key] = len(piece)
+
+    def set_near(self):
+        # Compare every piece with every other piece (and itself) on the same or
+        # a neighbouring block. The distance is allowed to be a hair longer, the
+        # paths place the pieces on their blocks by adding the block origin, which
+        # may round the last digits.
+        near_distance = Constants.BLOCK_SIZE/10+1e-6
+        for own_key in self.pieces.keys():
+            own = self.pieces[own_key]
+            for target_key in self.pieces.keys():
+                target = self.pieces[target_key]
+                for column in (-1, 0, 1):
+                    for row in (-1, 0, 1):
+                        delta = own[:,None,:]-target[None,:,:]-[column*self.size, row*self.size]
+                        near = delta[:,:,0]**2+delta[:,:,1]**2 < near_distance**2
+                        self.near[(own_key, target_key, column, row)] = bool(near.any())
+
+    def set_piece(self, kind, ctuple):
+        # Return the coordinates of a single piece placed on the origin.
+        return Pathh(Constants.SEDAN).place([0, 0], kind, ctuple)
+
+    def is_near(self, own_block, own_key, target_block, target_key):
+        # Return True if the pieces on blocks 'own_block' and 'target_block' can come close.
+        column = target_block[0]-own_block[0]
+        row = target_block[1]-own_block[1]
+        if abs(column) > 1 or abs(row) > 1: return False
+        return self.near[(own_key, target_key, column, row)]
+
+    def spans(self, pieces, passed, limit):
+        # Leave out the first 'passed' coordinates of the pieces. Return (block,
+        # key, start, stop) tuples, where 'start' and 'stop' are the indexes of the
+        # piece in the relevant coordinates. Nothing from index 'limit' on is listed.
+        relevant = []
+        start = -passed
+        for block, key in pieces:
+            stop = start+self.lengths[key]
+            first, last = max(start, 0), min(stop, limit)
+            if first < last: relevant.append((block, key, first, last))
+            start = stop
+        return relevant
+
+    def find(self, own_pieces, own_passed, own_coordinates, target_pieces, target_passed, target_coordinates):
+        # Return the (has_to_yield, cross_point, angle) triple of 'Radar.crossing'
+        # for two lists of pieces, check 'Pathh.get_window'. 'own_coordinates' and
+        # 'target_coordinates' are the relevant coordinates of the pieces, the first
+        # 'own_passed' and 'target_passed' coordinates of the pieces are left out of them.
+        # The pieces are gone through in the order of 'own_pieces' and each is compared
+        # only with the pieces of the target it can come close to. The last eight own
+        # and the last four target coordinates are left out, 'Radar.crossing' looks
+        # a few coordinates further on both paths.
+
+        min_distance = Constants.BLOCK_SIZE/10
+        own = np.asarray(own_coordinates, dtype=float)
+        target = np.asarray(target_coordinates, dtype=float)
+        others = self.spans(target_pieces, target_passed, len(target)-4)
+
+        for block, key, start, stop in self.spans(own_pieces, own_passed, len(own)-8):
+            indexes = [np.arange(other_start, other_stop) for other_block, other_key, other_start, other_stop \
+                in others if self.is_near(block, key, other_block, other_key)]
+            if not indexes: continue
+            indexes = np.concatenate(indexes)
+
+            # Squared distances between the coordinates of the piece and the near ones.
+            delta = own[start:stop,None,:]-target[None,indexes,:]
+            close = delta[:,:,0]**2+delta[:,:,1]**2 < min_distance**2
+            first = int(close.argmax())
+            if not close.flat[first]: continue
+
+            i = start+first//len(indexes)
+            j = int(indexes[first%len(indexes)])
+            return self.radar.crossing(own_coordinates, target_coordinates, i, j)
+
+        return False, None, None
+
+    def close_pairs(self, own_pieces, own_coordinates, target_pieces, target_coordinates):
+        # Return every (i, j) index pair of 'own_coordinates' and 'target_coordinates'
+        # closer than 'min_distance' as two arrays sorted by 'i' and then by 'j'. Unlike
+        # in 'self.find', nothing is left out, the coordinates are those of the whole
+        # pieces, check 'Pathh.get_window_coordinates'. 'self.first_close' picks the
+        # pair 'self.find' would have found from these.
+
+        min_distance = Constants.BLOCK_SIZE/10
+        own = np.asarray(own_coordinates, dtype=float)
+        target = np.asarray(target_coordinates, dtype=float)
+        others = self.spans(target_pieces, 0, len(target))
+        found_i, found_j = [], []
+
+        for block, key, start, stop in self.spans(own_pieces, 0, len(own)):
+            indexes = [np.arange(other_start, other_stop) for other_block, other_key, other_start, other_stop \
+                in others if self.is_near(block, key, other_block, other_key)]
+            if not indexes: continue
+            indexes = np.concatenate(indexes)
+
+            delta = own[start:stop,None,:]-target[None,indexes,:]
+            rows, columns = np.nonzero(delta[:,:,0]**2+delta[:,:,1]**2 < min_distance**2)
+            found_i.append(start+rows)
+            found_j.append(indexes[columns])
+
+        if not found_i: return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        # The pieces are in order and so are the rows within a piece and the
+        # target pieces within a row, the pairs come out sorted already.
+        return np.concatenate(found_i), np.concatenate(found_j)
+
+    def first_close(self, pairs, own_passed, own_length, target_passed, target_length):
+        # Return the first pair of 'self.close_pairs' that 'self.find' would compare,
+        # 'own_length' and 'target_length' being the lengths of the coordinates of the
+        # whole pieces. The indexes are returned relative to the relevant coordinates,
+        # which leave out the first 'own_passed' and 'target_passed'. Return None if
+        # there's no such pair.
+        i, j = pairs
+        if not len(i): return None
+        usable = (i >= own_passed)&(i < own_length-8)&(j >= target_passed)&(j < target_length-4)
+        first = int(usable.argmax())
+        if not usable[first]: return None
+        return int(i[first])-own_passed, int(j[first])-target_passed
@@ -0,0 +1,117 @@
+
+
+import math
+from bisect import bisect_right
+from constants import Constants
+
+
+class Geometry():
+
+    '''
+    This class holds the vector calculations the Radar-objects need. Vectors
+    and locations are [x, y] pairs. Whether a location is ahead or behind is
+    the sign of a dot product and the angle between two vectors comes from one
+    'math.atan2' of their cross and dot products, no vector has to be scaled to
+    unit length first. Distances are compared squared when the distance itself
+    isn't needed. The distances kept from intersections depend on the angle
+    between the routes in steps, every set of steps is a table below: entry k
+    is for the angles below 'breaks[k]', the last one for the rest. Every break
+    is a multiple of 1/8 degrees, so the tables are expanded once into lists
+    with an entry for every 1/8 degrees between 0 and 180 with 'bisect', after
+    that an angle is looked up by indexing, check 'self.set_steps'. One object
+    is shared by every Radar-object.
+    '''
+
+    X = Constants.BLOCK_SIZE
+    # Entries per degree in the expanded tables
+    STEPS = 8
+
+    # The distance a yielding vehicle stays back from an intersection,
+    # for routes crossing from the left (angle > 0) and from the right.
+    YIELD_BREAKS = (32, 41.625, 65, 100, 140)
+    YIELD_LEFT = (7/10*X, 5/16*X, X/3, X/2, 8/21*X, 5/12*X)
+    YIELD_RIGHT_BREAKS = (32, 41.625, 65, 95, 111)
+    YIELD_RIGHT = (11/15*X, 4/5*X, 4/5*X, 2/3*X, 7/16*X, 3/5*X)
+
+    # The distance needed not to block an intersection, for intersections
+    # ahead and behind, crossing from the left and from the right.
+    BLOCK_BREAKS = (32, 41.625, 65, 95, 111, 140)
+    BLOCK_AHEAD_LEFT = (X/1.7, X/20, X/15, X/15, X/5, X/10, X/5.5)
+    BLOCK_AHEAD_RIGHT = (X/3, X/10, X/10, X/15, X/7, X/3, X/5.5)
+    BLOCK_BEHIND_LEFT = (0, X/20, 0, X/5, X/7, X/3.5, X/5.5)
+    BLOCK_BEHIND_RIGHT = (X/3, X/10, X/10, X/12, X/7, X/4, X/6)
+
+    # Shortening the distance to an intersection for vehicles ahead of it and behind it.
+    CROSS_BREAKS = (32, 41.625, 140)
+    CROSS_AHEAD = (-X/3.5, -X/10, 0, -X/2.5)
+    CROSS_BEHIND = (0, 0, 0, -X/2.5)
+
+    def __init__(self):
+        self.yield_left = self.set_steps(self.YIELD_BREAKS, self.YIELD_LEFT)
+        self.yield_right = self.set_steps(self.YIELD_RIGHT_BREAKS, self.YIELD_RIGHT)
+        self.block_ahead_left = self.set_steps(self.BLOCK_BREAKS, self.BLOCK_AHEAD_LEFT)
+        self.block_ahead_right = self.set_steps(self.BLOCK_BREAKS, self.BLOCK_AHEAD_RIGHT)
+        self.block_behind_left = self.set_steps(self.BLOCK_BREAKS, self.BLOCK_BEHIND_LEFT)
+        self.block_behind_right = self.set_steps(self.BLOCK_BREAKS, self.BLOCK_BEHIND_RIGHT)
+        self.cross_ahead = self.set_steps(self.CROSS_BREAKS, self.CROSS_AHEAD)
+        self.cross_behind = self.set_steps(self.CROSS_BREAKS, self.CROSS_BEHIND)
+
+    def set_steps(self, breaks, table):
+        # Expand 'table' to an entry for every 1/8 degrees. An angle 'a' between
+        # 0 and 180 degrees is then found at index int(8*a), scaling by 8 is exact.
+        return [table[bisect_right(breaks, k/self.STEPS)] for k in range(180*self.STEPS+1)]
+
+    def yielding_addition(self, angle):
+        # The part of the yielding distance given by the angle between the routes.
+        if angle > 0: return self.yield_left[int(angle*self.STEPS)]
+        return self.yield_right[int(-angle*self.STEPS)]
+
+    def blocking_addition(self, angle, ahead):
+        # The part of the blocking distance given by the angle between the routes.
+        if ahead:
+            if angle > 0: return self.block_ahead_left[int(angle*self.STEPS)]
+            return self.block_ahead_right[int(-angle*self.STEPS)]
+        if angle > 0: return self.block_behind_left[int(angle*self.STEPS)]
+        return self.block_behind_right[int(-angle*self.STEPS)]
+
+    def cross_addition(self, angle, ahead):
+        # Shorten the distance to an intersection depending on the angle between the routes.
+        if ahead: return self.cross_ahead[int(abs(angle)*self.STEPS)]
+        return self.cross_behind[int(abs(angle)*self.STEPS)]
+
+    def dot(self, v1, v2):
+        return v1[0]*v2[0] + v1[1]*v2[1]
+
+    def cross(self, v1, v2):
+        # The z-component of the cross product, positive
+        # when 'v2' is counter clockwise from 'v1'.
+        return v1[0]*v2[1] - v1[1]*v2[0]
+
+    def squared_distance(self, p1, p2):
+        dx, dy = p1[0]-p2[0], p1[1]-p2[1]
+        return dx*dx + dy*dy
+
+    def distance(self, p1, p2):
+        return math.sqrt(self.squared_distance(p1, p2))
+
+    def within(self, p1, p2, dist):
+        # Return True if 'p1' and 'p2' are at most 'dist' apart.
+        return self.squared_distance(p1, p2) <= dist*dist
+
+    def direction(self, vector):
+        # The direction of 'vector' between 0 and 360 degrees,
+        # None for a zero vector.
+        if not vector[0] and not vector[1]: return None
+        direction = math.degrees(math.atan2(vector[1], vector[0]))
+        if direction < 0: direction += 360
+        return direction
+
+    def signed_angle(self, v1, v2):
+        # The angle from 'v1' to 'v2' between -180 and 180 degrees, counter clockwise
+        # is positive. The y-axis of the vectors is expected to point up.
+        return math.degrees(math.atan2(self.cross(v1, v2), self.dot(v1, v2)))
+
+    def is_ahead(self, location, direction, target):
+        # Return True if 'target' is at most 90 degrees off 'direction' seen from 'location'.
+        # 'direction' points up along the y-axis, the locations are scene coordinates.
+        return direction[0]*(target[0]-location[0]) - direction[1]*(target[1]-location[1]) >= 0
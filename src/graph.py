@@ -1,150 +1,253 @@
 
 
+import heapq
+import numpy as np
+from blocks import Blocks
+
+
 class Graph():
     
     '''
-    The Graph-class takes in the CityCenter-objects layout as 'city_blocks'
-    and uses this to form a graph data structure. In the graph, vertices
-    are expressed as two-character strings that refer to the vertex location
-    in the original CityCenter-object. The graph edges are expressed as a dictionary, 
-    where a vertex (such as '14') is the key and a list of tuples is the
-    value. The list has as many tuples as the vertex has directly accessible
-    vertices. In each tuple, the first value is the accessible vertex, the second
-    is an integer representing the distance between these two and the third one
-    is the accessible vertex's direction (0, 1, 2 or 3) from the original vertex.
-    There are a maximum of 4 directions from each vertex, if a direction equals
-    0, it refers to the right-hand-side. Direction 1 represents the top side and
-    so on, just like the blocks in the CityCenter-object.
+    The Graph-class takes in the CityCenter-objects layout as 'city_blocks',
+    an array of block masks (check the Blocks-class), and uses this to form a
+    graph data structure. In the graph, vertices are expressed as integer
+    identifiers 0, 1, 2 and so on, in the order the blocks are listed in the
+    original CityCenter-object. 'self.locations' tells
+    the (i, j) indexes of the block each vertex refers to and 'self.index' is
+    the other way round, an array where every block that is not a vertex has
+    the value -1. The graph edges are stored in a compressed form: the edges
+    leaving vertex v are found at indexes 'self.offsets[v]' to 'self.offsets[v+1]'
+    in the arrays 'self.targets', 'self.lengths' and 'self.directions'. The first
+    one tells the accessible vertex, the second is an integer representing the
+    distance between these two and the third one is the accessible vertex's
+    direction (0, 1, 2 or 3) from the original vertex. There are a maximum of 4
+    directions from each vertex, if a direction equals 0, it refers to the
+    right-hand-side. Direction 1 represents the top side and so on, just like
+    the blocks in the CityCenter-object. 'self.get_adjacency' still offers the
+    edges as a dictionary of lists of (vertex, distance, direction) tuples.
     '''
     
     def __init__(self, city_blocks):        
         self.vertices = []
-        self.adjacency = dict()
+        self.locations = []
+        self.adjacency = None
         self.generate_graph(city_blocks)
         
     def get_vertices(self): return self.vertices
     
-    def get_adjacency(self): return self.adjacency
+    def get_location(self, vertex): return self.locations[vertex]
+    
+    def get_vertex(self, i, j):
+        # Return the vertex at block i, j or None if the block is not a vertex.
+        vertex = int(self.index[i, j])
+        if vertex < 0: return None
+        return vertex
+    
+    def get_csr(self): return self.offsets, self.targets, self.lengths, self.directions
+    
+    def get_edges(self, vertex):
+        # Return the edges leaving 'vertex' as (vertex, distance, direction) tuples.
+        start, stop = self.edge_range[vertex], self.edge_range[vertex+1]
+        return zip(self.edge_targets[start:stop], self.edge_lengths[start:stop], self.edge_directions[start:stop])
+    
+    def get_adjacency(self):
+        # The edges as a dictionary, for example: {0: [(2, 1, 0)], 2: [(3, 1, 0), (0, 1, 2)]}.
+        # This is only formed when asked for, the graph itself doesn't need it.
+        if self.adjacency is None:
+            self.adjacency = dict()
+            for vertex in self.vertices:
+                self.adjacency[vertex] = list(self.get_edges(vertex))
+        return self.adjacency
+    
+    def get_distances(self, source):
+        # Return a dictionary of the shortest distances from vertex 'source' to every
+        # vertex reachable from it, e.g. the shortest path tree rooted at 'source'.
+        # A vertex that is missing from the dictionary can not be reached.
+        distances = dict()
+        queue = [(0, source)]
+        while queue:
+            distance, vertex = heapq.heappop(queue)
+            if vertex in distances: continue
+            distances[vertex] = distance
+            for neighbor, edge_length, direction in self.get_edges(vertex):
+                if not neighbor in distances:
+                    heapq.heappush(queue, (distance+edge_length, neighbor))
+        return distances
     
     def generate_graph(self, city_blocks):
         
         limit = len(city_blocks)
+        masks = np.asarray(city_blocks, dtype=np.uint8)
+        weights = Blocks.WEIGHTS[masks]
+        on_the_edge = np.zeros((limit, limit), dtype=bool)
+        on_the_edge[[0, -1],:] = True
+        on_the_edge[:,[0, -1]] = True
         
-        for i in range(limit):
-            for j in range(limit):
-                # Naturally every intersection block will become a vertex.
-                if self.calculate_weight(city_blocks[i][j]) > 2:
-                    self.vertices.append(str(i)+str(j))
-                # Every bordering piece that has road access will also serve as a vertex.
-                elif i == 0 or i == limit-1:
-                    if 1 in city_blocks[i][j]:
-                        self.vertices.append(str(i)+str(j))
-                elif j == 0 or j == limit-1:
-                    if 1 in city_blocks[i][j]:
-                        self.vertices.append(str(i)+str(j))
+        # Naturally every intersection block will become a vertex. Every
+        # bordering piece that has road access will also serve as a vertex.
+        chosen = (weights > 2) | (on_the_edge & (weights > 0))
+        self.index = np.full((limit, limit), -1, dtype=np.int32)
+        self.index[chosen] = np.arange(int(chosen.sum()), dtype=np.int32)
+        self.locations = [(int(i), int(j)) for i, j in np.argwhere(chosen)]
+        self.vertices = list(range(len(self.locations)))
+        vertex_at = self.index.tolist()
+        masks = masks.tolist()
+        directions_of = Blocks.DIRECTIONS
         
-        def find_neighbors(i, j, previous, counter, original_direction):
-            # This is recursive algorithm that finds every neighboring vertex for vertex
-            # i, j and their respective distances and directions from the first vertex.
-
-            # Must stay inside the correct indexes, every bordering piece
-            # has a certain direction that is forbidden.
-            forbidden = None
-            if i == 0: forbidden = 2
-            elif i == limit-1: forbidden = 0
-            elif j == 0: forbidden = 1
-            elif j == limit-1: forbidden = 3
+        # How each direction changes the indexes and which side of the next block we arrive from.
+        steps = ((1, 0), (0, -1), (-1, 0), (0, 1))
+        opposite = (2, 3, 0, 1)
+        
+        def forbidden_side(i, j):
+            # Every bordering piece has a side that leads out of the map.
+            if i == 0: return 2
+            elif i == limit-1: return 0
+            elif j == 0: return 1
+            elif j == limit-1: return 3
+            return None
+        
+        # Every edge is listed in these as it's found, in no particular order.
+        sources, targets, distances, directions = [], [], [], []
+        # Tells whether the road leaving vertex v from side s, at index 4*v+s, has already been traced.
+        traced = [False]*(4*len(self.vertices))
+        
+        for vertex in self.vertices:
+            i_0, j_0 = self.locations[vertex]
+            forbidden = forbidden_side(i_0, j_0)
             
-            if previous == None:
-                # Don't add anything to the lists in the first vertex.
-                pass
-            else:
-                if forbidden != None:
-                    # If we get here, it means that this is a bordering
-                    # piece and this is not the piece we started from.
-                    neighbors.append(str(i)+str(j))
-                    distances.append(counter)
-                    directions.append(original_direction)
-                    # We don't have to move any further.
-                    return
-                elif self.calculate_weight(city_blocks[i][j]) > 2:
-                    # Intersection are naturally vertices.
-                    neighbors.append(str(i)+str(j))
+            for side in range(4):
+                if not masks[i_0][j_0] >> side & 1 or side == forbidden: continue
+                if traced[4*vertex+side]: continue
+                traced[4*vertex+side] = True
+                
+                # Move forward on the road one block at a time until we arrive to the next vertex.
+                # The amount of blocks it requires to move from vertex A to B is the distance
+                # between these two. Between the vertices every block has at most two sides
+                # open, the one we arrived from and the one we leave from.
+                i, j = i_0, j_0
+                direction = side
+                counter = 0
+                while True:
+                    i += steps[direction][0]
+                    j += steps[direction][1]
+                    if i < 0 or j < 0 or i >= limit or j >= limit: break
+                    counter += 1
+                    previous = opposite[direction]
+                    
+                    end = vertex_at[i][j]
+                    if end >= 0:
+                        # A bordering piece or an intersection, either way a vertex.
+                        break
+                    
+                    direction = None
+                    for index in directions_of[masks[i][j]]:
+                        if index != previous:
+                            direction = index
+                            break
+                    if direction is None:
+                        # A dead end.
+                        break
+                
+                if end < 0 or i < 0 or j < 0 or i >= limit or j >= limit: continue
+                
+                sources.append(vertex)
+                targets.append(end)
+                distances.append(counter)
+                directions.append(side)
+                
+                # The same road leads back from the other end, unless that end is a one-way
+                # entrance into the vertex. Either way it doesn't have to be traced again.
+                if masks[i][j] >> previous & 1 and previous != forbidden_side(i, j) \
+                    and not traced[4*end+previous]:
+                    traced[4*end+previous] = True
+                    sources.append(end)
+                    targets.append(vertex)
                     distances.append(counter)
-                    directions.append(original_direction)
-                    # We don't have to move any further.
-                    return
-            
-            # Each time we move to the next block, the counter grows by one.
-            # Here, the amount of find_neighbors()-function calls it requires
-            # to move from vertex A to B is the distance between these two.
-            counter += 1
-            
-            # Move forward on the road until we arrive to the next vertex.
-            if city_blocks[i][j][0] == 1:
-                if not forbidden == 0 and not previous == 0:
-                    if original_direction == None: find_neighbors(i+1, j, 2, counter, 0)
-                    else: find_neighbors(i+1, j, 2, counter, original_direction)
-            if city_blocks[i][j][1] == 1:
-                if not forbidden == 1 and not previous == 1:
-                    if original_direction == None: find_neighbors(i, j-1, 3, counter, 1)
-                    else: find_neighbors(i, j-1, 3, counter, original_direction)
-            if city_blocks[i][j][2] == 1:
-                if not forbidden == 2 and not previous == 2:
-                    if original_direction == None: find_neighbors(i-1, j, 0, counter, 2)
-                    else: find_neighbors(i-1, j, 0, counter, original_direction)
-            if city_blocks[i][j][3] == 1:
-                if not forbidden == 3 and not previous == 3:
-                    if original_direction == None: find_neighbors(i, j+1, 1, counter, 3)
-                    else: find_neighbors(i, j+1, 1, counter, original_direction)
+                    directions.append(previous)
+        
+        self.set_csr(sources, targets, distances, directions)
+    
+    def set_csr(self, sources, targets, distances, directions):
+        # Compress the edges into the arrays described in the class documentation. Sometimes
+        # there are more than one direct links between two intersections. We choose the one 
+        # with the smaller distance, or both, if they are equal. The edges of each vertex are
+        # in the order of their directions. Plain list copies of the arrays are kept as well,
+        # since reading single values from a list is faster than from an array when the graph
+        # is searched one vertex at a time.
+        
+        sources = np.array(sources, dtype=np.int32)
+        targets = np.array(targets, dtype=np.int32)
+        distances = np.array(distances, dtype=np.int32)
+        directions = np.array(directions, dtype=np.int8)
+        
+        if len(sources):
+            pair = sources.astype(np.int64)*len(self.vertices)+targets
+            unused, inverse = np.unique(pair, return_inverse=True)
+            shortest = np.full(inverse.max()+1, np.iinfo(np.int32).max, dtype=np.int32)
+            np.minimum.at(shortest, inverse, distances)
+            kept = distances == shortest[inverse]
+            order = np.lexsort((directions[kept], sources[kept]))
+            sources = sources[kept][order]
+            targets = targets[kept][order]
+            distances = distances[kept][order]
+            directions = directions[kept][order]
+        
+        counts = np.bincount(sources, minlength=len(self.vertices))
+        self.offsets = np.zeros(len(self.vertices)+1, dtype=np.int32)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.targets = targets
+        self.lengths = distances
+        self.directions = directions
+        
+        self.edge_range = self.offsets.tolist()
+        self.edge_targets = self.targets.tolist()
+        self.edge_lengths = self.lengths.tolist()
+        self.edge_directions = self.directions.tolist()
         
-        for vertex in self.vertices:
-            # The coordinates are directly in the vertex.
-            i, j = int(vertex[0]), int(vertex[1])
-            # Initialize three lists, where the first one represents all the neighboring vertices
-            # of the currently observed vertex. The second list represents their respective
-            # distances and the third one the respective directions (0, 1, 2, 3) we must start
-            # traveling to reach the destined vertex eventually.
-            neighbors, distances, directions = [], [], []
-            # Fill the lists accordingly.
-            find_neighbors(i, j, None, 0, None)
-            # Form three-term tuples from the lists and list these behind the key.
-            self.adjacency[vertex] = []
-            for index in range(len(neighbors)):
-                new_tuple = neighbors[index], distances[index], directions[index]
-                on_watch = []
-                for tuple in self.adjacency[vertex]:
-                    on_watch.append(tuple[0])
-                if not new_tuple[0] in on_watch:
-                    self.adjacency[vertex].append(new_tuple)
-                else:
-                    # This happens rather rarely, but when it happens, it means that there are
-                    # more than one direct links between two intersections. We choose the one 
-                    # with the smaller distance, or both, if they are equal.
-                    adj = self.adjacency[vertex]
-                    for tuple in adj:
-                        if tuple[0] == new_tuple[0]:
-                            original_tuple = tuple
-                    original_distance = tuple[1]
-                    new_distance = new_tuple[1]
-                    if original_distance < new_distance:
-                        pass
-                    elif original_distance == new_distance:
-                        self.adjacency[vertex].append(new_tuple)
-                    else:
-                        self.adjacency[vertex].remove(original_tuple)
-                        self.adjacency[vertex].append(new_tuple)
-            # self.adjacency[vertex] = [(neighbor_vertex_A, distance_to_A, direction_to_A),
-            # (neighbor_vertex_B, distance_to_B, direction_to_B)]
-
     def calculate_weight(self, block):
         # A blocks weight is defined by how many accessible sides it has.
-        weight = 0
-        for i in block:
-            if i == 1:
-                weight += 1
-        return weight
+        return Blocks.WEIGHT[block]
+    
+    
+    
+    
+
+if __name__ == '__main__':
+    # Measure how long it takes to build the graph of generated n x n layouts, e.g.
+    # 'python graph.py 10 100 500'. Roads run along randomly chosen rows and columns
+    # and lead out of the map on both ends. A few road blocks are cut off from each
+    # other, which leaves curves, T-intersections and dead ends here and there.
+    import sys
+    import time
+    import random
     
+    sizes = [int(n) for n in sys.argv[1:]] or [10, 50, 100, 200, 500]
     
+    def generate_blocks(n):
+        rows = [j for j in range(1, n-1) if random.random() < 0.4] or [n//2]
+        columns = [i for i in range(1, n-1) if random.random() < 0.4] or [n//2]
+        # Whether block i, j is connected to the next block on the right or below it.
+        right = [[False]*n for i in range(n)]
+        below = [[False]*n for i in range(n)]
+        for j in rows:
+            for i in range(n):
+                right[i][j] = i == n-1 or random.random() > 0.05
+        for i in columns:
+            for j in range(n):
+                below[i][j] = j == n-1 or random.random() > 0.05
+        city_blocks = np.zeros((n, n), dtype=np.uint8)
+        for i in range(n):
+            for j in range(n):
+                left = right[i-1][j] if i > 0 else j in rows
+                above = below[i][j-1] if j > 0 else i in columns
+                city_blocks[i, j] = right[i][j]*Blocks.RIGHT | above*Blocks.TOP | left*Blocks.LEFT | below[i][j]*Blocks.BOTTOM
+        return city_blocks
     
-    
\ No newline at end of file
+    random.seed(1)
+    for n in sizes:
+        city_blocks = generate_blocks(n)
+        start = time.perf_counter()
+        graph = Graph(city_blocks)
+        elapsed = time.perf_counter()-start
+        print(str(n)+'x'+str(n)+', '+str(len(graph.get_vertices()))+' vertices, '+str(len(graph.targets))+' edges, '+\
+            'built in '+str(round(elapsed, 3))+' s')
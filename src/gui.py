@@ -6,12 +6,11 @@ from PyQt5.Qt import QGraphicsRectItem, QBrush, QColor, \
     QGraphicsEllipseItem, QLabel, QMessageBox, QProgressBar, QFont
 from PyQt5.QtWidgets import QApplication
     
-from city_center import CityCenter
-from vehicle import Vehicle
+from simulation import Simulation
 from vehicle_graphics_model import VehicleGraphicsModel
 from city_graphics_item import CityGraphicsItem
 from constants import Constants
-from random import randint
+from blocks import Blocks
 
 
 class GUI(QtWidgets.QMainWindow):
@@ -39,6 +38,8 @@ class GUI(QtWidgets.QMainWindow):
     the program, just like clicking the cross button on the top right. The live
     input dialog lets the user set the preferred amount of vehicles on the map.
     The program runs with the help of a QTimer with a 10 millisecond time step.
+    Every time the timer fires, the headless Simulation-object is stepped once
+    and the graphics of the spawned and expired vehicles are taken care of.
     '''
     
     def __init__(self):
@@ -54,13 +55,13 @@ class GUI(QtWidgets.QMainWindow):
         size = self.select_size()
         if not size: return
         
-        # The size has been selected,
-        # construct the city layout.
-        self.city = CityCenter(size)
+        # The size has been selected, construct
+        # the city layout and the simulation engine.
+        self.simulation = Simulation(size)
+        self.city = self.simulation.get_city()
         
         # Set the default parameters.
         self.frozen = 1 # stopped
-        self.rush_hour = 0 # calm traffic
         self.erase = 0 # for deleting vehicles
         self.restart = False # only when asked
                
@@ -92,11 +93,15 @@ class GUI(QtWidgets.QMainWindow):
             
             # When the simulation is paused, the vehicles don't move.
             if not self.frozen:
-                if len(self.city.get_vehicles()) < self.set_count:
-                    self.spawn_vehicles()
                 # 'expired' is a list of all the 
                 # vehicles that have reached their goal.
-                expired = self.city.update()
+                spawned, expired = self.simulation.step()
+                for vehicle in spawned:
+                    self.set_vehicle_graphics(vehicle)
+                    self.paint_radar(vehicle)
+                    self.draw_path(vehicle)
+                if len(spawned):
+                    self.change_displayed_count()
                 if len(expired):
                     self.remove_items(expired) 
                 # The graphics move only when the vehicles move.
@@ -126,96 +131,22 @@ class GUI(QtWidgets.QMainWindow):
                 # user will not be fast enough to click 2 separate
                 # vehicles during one cycle (10 milliseconds).
                 self.remove_items([erased])
-                self.city.remove_vehicles([erased])
+                self.simulation.remove_vehicles([erased])
         else:       
             # Remove all graphics from the scene.
             self.remove_items(self.city.get_vehicles())
-            # Keep the same city, but start over.
-            self.city.reset()
+            # Keep the same city, but start over. This
+            # resets the vehicle count and the mode as well.
+            self.simulation.reset()
             # Reset the parameters.
             self.frozen = 0
-            self.rush_hour = 0
             self.erase = 0
             self.restart = False
             # Set the original title.
             self.set_title()
             # Set the original vehicle count as well.
-            self.set_count = self.default_casual_count
-            self.vehicle_dialog.setIntValue(self.set_count)
-            self.change_displayed_count()
-            
-    def spawn_vehicles(self):
-        
-        def another_one():
-            # Add one vehicle to the simulation.
-            
-            if self.city.is_overheated():
-                # There is no spot to place 
-                # the vehicle at the moment.            
-                return
-            
-            if self.city.is_at_full_capacity(self.rush_hour):
-                # The map is at the maximum capacity,
-                # can not place another vehicle.
-                return
-            
-            # Choose the vehicle type randomly, but with bigger chance
-            # of getting a sedan than a mini van and a bigger chance
-            # of getting a mini van than a pickup truck.
-            result = randint(1, 10)
-    
-            if result <= 2:
-                # 20 percent chance
-                vehicle_type = Constants.PICKUP_TRUCK
-            elif result <= 5:
-                # 30 percent chance
-                vehicle_type = Constants.MINI_VAN
-            else:
-                # 50 percent chance
-                vehicle_type = Constants.SEDAN
-            
-            # All colors are equally likely.
-            colors = ['Green','Blue','Yellow','Turquoise','Violet','Gray','Black','Orange','White']
-            color = colors[randint(0, len(colors)-1)]
-            
-            # Doesn't have a path yet, therefore doesn't
-            # have a position, a velocity or a rotation either.
-            vehicle = Vehicle(vehicle_type, color)
-            
-            # Determine where the vehicle is spawned 
-            # and what kind of a path it will get.
-            self.city.add_vehicle(vehicle)
-            
-            if self.rush_hour: 
-                # Casual mode by default
-                vehicle.change_mode()
+            self.change_displayed_count(new_limit=True)
             
-            self.set_vehicle_graphics(vehicle)
-            self.paint_radar(vehicle)
-            self.draw_path(vehicle)
-            self.change_displayed_count()
-        
-        current_amount = len(self.city.get_vehicles())
-        desired_amount = self.set_count
-        difference = desired_amount-current_amount
-        
-        if difference >= 3:
-            # Don't let the vehicle count drop 
-            # more than 2 from the desired amount.
-            while difference > 2:
-                another_one()
-                difference -= 1
-        elif difference == 2:
-            # A vehicle won't be spawned immediately with a 100% chance, but
-            # with the offset of 2 vehicles, another one will be shortly spawned.
-            if self.rush_hour: another_one()
-            elif randint(1, 250) == 250: another_one()
-        else:
-            # Same as the one above, but a new vehicle won't appear as fast.
-            if self.rush_hour:
-                if randint(1, 250) == 250: another_one()
-            elif randint(1, 300) == 300: another_one()
-        
     def remove_items(self, expired):
         # List 'expired' contains all of the vehicles whose graphics
         # (hull, wheels, windows, path) need to be removed from the scene.
@@ -252,7 +183,7 @@ class GUI(QtWidgets.QMainWindow):
         size = self.city.get_dimensions()
         second = '/'+str(size)+'x'+str(size)
         
-        if self.rush_hour: third = '/Rush hour'
+        if self.simulation.is_rush_hour(): third = '/Rush hour'
         else: third = '/Casual'
             
         if self.frozen: fourth = '/Stopped'
@@ -273,7 +204,7 @@ class GUI(QtWidgets.QMainWindow):
             # A number of vehicles have been added or removed,
             # change the displayed amount of vehicles by that much.
             new_count = len(self.city.get_vehicles())
-            max_count = self.city.get_maximum(self.rush_hour)
+            max_count = self.city.get_maximum(self.simulation.is_rush_hour())
             description = '     '+str(new_count)+'/'+str(max_count)+' Vehicles     '
             self.vehicle_label.setText(description)
             
@@ -291,15 +222,14 @@ class GUI(QtWidgets.QMainWindow):
             # The user has pressed the 'rush hour'-button, 
             # this means that the map capacity has changed.
             # Rush hour mode allows more vehicles to enter the map.
-            if self.rush_hour: self.set_count = self.default_rush_count
-            else: self.set_count = self.default_casual_count
-            self.vehicle_dialog.setIntValue(self.set_count)
+            # The Simulation-object has already chosen the new count.
             
             count = len(self.city.get_vehicles())
-            new_max_count = self.city.get_maximum(self.rush_hour)
+            new_max_count = self.city.get_maximum(self.simulation.is_rush_hour())
             description = '     '+str(count)+'/'+str(new_max_count)+' Vehicles     '
             self.vehicle_label.setText(description)
             self.vehicle_dialog.setIntRange(1, new_max_count)
+            self.vehicle_dialog.setIntValue(self.simulation.get_count())
             self.vehicle_bar.setRange(0, new_max_count)
             
             if count > new_max_count:
@@ -438,15 +368,11 @@ class GUI(QtWidgets.QMainWindow):
         self.sub_layout.addWidget(start_btn)
         
         def change_simulation():
-            # rush hour/calm
-            self.rush_hour = 1 - self.rush_hour
+            # rush hour/calm, the Simulation-object
+            # switches the mode of every vehicle.
+            self.simulation.change_mode()
             self.set_title()
             self.change_displayed_count(new_limit=True)
-            for vehicle in self.city.get_vehicles():
-                if self.rush_hour and not vehicle.is_rushing():
-                    vehicle.change_mode()
-                elif not self.rush_hour and vehicle.is_rushing():
-                    vehicle.change_mode()
         
         # Switch between rush hour/calm traffic, calm traffic by default.
         rush_btn = QtWidgets.QPushButton("rush hour")
@@ -514,19 +440,8 @@ class GUI(QtWidgets.QMainWindow):
     def set_occupation_display(self):
         # Add two widgets on the bottom right of the window.
         
-        def set_default_counts():
-            # Set the default amount of vehicles on the map
-            # for casual and rush hour traffic simulation.
-            
-            casual_max = self.city.get_maximum(0)
-            rush_max = self.city.get_maximum(1)
-            difference = rush_max-casual_max
-            
-            self.default_rush_count = casual_max
-            self.default_casual_count = casual_max-difference
-            self.set_count = self.default_casual_count
-            
-        set_default_counts()
+        # The default amount of vehicles for casual and rush
+        # hour traffic is chosen by the Simulation-object.
         
         # A label to display the vehicle count, updated in
         # 'self.update_everything() any time the vehicle count changes.
@@ -548,9 +463,8 @@ class GUI(QtWidgets.QMainWindow):
         # Add one more widget in the bottom-right corner.
         
         def preference(selected):
-            # 'self.set_count' represents the set 
-            # amount of vehicles chosen by the user.
-            self.set_count = selected
+            # The set amount of vehicles chosen by the user.
+            self.simulation.set_count(selected)
              
         # A live QInputDialog-object to select the desired amount of vehicles in
         # the city. Decreasing this will not lead to any vehicle suddenly disappearing.
@@ -558,7 +472,7 @@ class GUI(QtWidgets.QMainWindow):
         self.vehicle_dialog.setOption(QtWidgets.QInputDialog.NoButtons)
         self.vehicle_dialog.setInputMode(QtWidgets.QInputDialog.InputMode.IntInput)
         self.vehicle_dialog.setIntRange(1, self.city.get_maximum(0))
-        self.vehicle_dialog.setIntValue(self.set_count)
+        self.vehicle_dialog.setIntValue(self.simulation.get_count())
         self.vehicle_dialog.setLabelText('Set the vehicle count:')  
         self.vehicle_dialog.intValueChanged.connect(preference)
         self.sub_layout.addWidget(self.vehicle_dialog)
@@ -578,8 +492,8 @@ class GUI(QtWidgets.QMainWindow):
         if self.city.get_dimensions() == 3:
             # Add six more pieces to cover  
             # the white area around the map.
-            grass_piece = [0,0,0,0]
-            vertical_road_piece = [0,1,0,1]
+            grass_piece = Blocks.LAWN
+            vertical_road_piece = Blocks.VERTICAL
             map_piece1 = CityGraphicsItem(0, -size, grass_piece)
             self.scene.addItem(map_piece1)
             map_piece2 = CityGraphicsItem(size, -size, vertical_road_piece)
@@ -632,26 +546,23 @@ class GUI(QtWidgets.QMainWindow):
         
         self.path_items[vehicle] = []
         all_coordinates = vehicle.get_path().get_coordinates()
+        offsets = vehicle.get_path().get_offsets()
         if self.city.get_dimensions() == 3:
             start = 0
-            stop = len(all_coordinates)
+            stop = len(offsets)-1
         else:
             start = 1
-            stop = len(all_coordinates)-1
-        for index in range(start, stop):
-            # Don't mark any coordinates outside the map, e.g. the bordering pieces.
-            piece = all_coordinates[index]
-            for location in piece:
-                elli = QGraphicsEllipseItem(location[0]-dot/2,location[1]-dot/2,dot,dot)
-                elli.setBrush(QBrush(QColor(20,20,20)))
-                elli.setVisible(visible) 
-                self.scene.addItem(elli)
-                self.path_items[vehicle].append(elli)
+            stop = len(offsets)-2
+        # Don't mark any coordinates outside the map, e.g. the bordering pieces.
+        for location in all_coordinates[offsets[start]:offsets[stop]].tolist():
+            elli = QGraphicsEllipseItem(location[0]-dot/2,location[1]-dot/2,dot,dot)
+            elli.setBrush(QBrush(QColor(20,20,20)))
+            elli.setVisible(visible) 
+            self.scene.addItem(elli)
+            self.path_items[vehicle].append(elli)
         if self.city.get_dimensions() != 3:
             # One last dot on the edge of the map.
-            index = len(all_coordinates)-1
-            piece = all_coordinates[index]
-            location = piece[0]
+            location = all_coordinates[offsets[-2]].tolist()
             elli = QGraphicsEllipseItem(location[0]-dot/2,location[1]-dot/2,dot,dot)
             elli.setBrush(QBrush(QColor(20,20,20)))
             elli.setVisible(visible)
@@ -699,11 +610,11 @@ class GUI(QtWidgets.QMainWindow):
             self.centralWidget().setLayout(self.layout)
             
             # A completely new city.
-            self.city = CityCenter(new_size)
+            self.simulation = Simulation(new_size)
+            self.city = self.simulation.get_city()
             
             # Restore the default parameters.
             self.frozen = 1
-            self.rush_hour = 0
             self.erase = 0
             self.restart = False
             
@@ -0,0 +1,182 @@
+
+
+import heapq
+import math
+from radar import Radar
+from vehicle import Vehicle
+from spatial_grid import SpatialGrid
+
+
+class KineticQueue():
+
+    '''
+    This class keeps track of which vehicles see each other, e.g. which
+    pairs of vehicles are within the radar range of each other. The
+    CityCenter-object owns one that is shared by every Radar-object. A
+    vehicle moves at most 'Vehicle.MAX_SPEED' times 'Vehicle.STEP' each cycle,
+    so when the distance between two vehicles has been checked, it's known
+    how many cycles it takes at the least before either of them could cross
+    the range. That is the slack between the distance and the range divided
+    by the fastest the pair could close in (or move apart). The pair isn't
+    looked at again before that cycle. Only vehicles in the same or
+    neighbouring cells of 'self.grid' are paired, the cells are as wide as
+    the range so vehicles further apart can't see each other. A pair is
+    added when the grid first reports the two as neighbours and dropped
+    when it's check comes up and they aren't neighbours anymore. The same
+    way, a vehicle is moved on the grid only when it could have reached the
+    edge of it's cell, 'self.moves' is a heap of (cycle, id) events.
+    'self.events' is a heap of (cycle, smaller id, bigger id) events, one for
+    every pair in 'self.pairs', and 'self.visible' maps each vehicle to the
+    vehicles within it's range in the order of the identifiers. Vehicles far
+    apart are checked only every now and then, the closer they are to the
+    edge of the range, the more often. 'self.time' is the number of cycles
+    since the start and 'self.advance' has to be called once each cycle
+    after the vehicles have moved. The pairs of a removed vehicle are left
+    in the heap, they are dropped once they come up. A sleeping vehicle is
+    woken up when a vehicle enters or leaves it's range, check
+    'Vehicle.sleep'.
+    '''
+
+    # Any rounding in the movement is well within this.
+    SAFETY = 1.001
+
+    def __init__(self, reach=Radar.RANGE):
+        self.reach = reach
+        self.time = 0
+        # A vehicle stays in it's cell until it's a quarter of the range
+        # outside of it, vehicles further than one cell apart are out of range.
+        self.grid = SpatialGrid(1.5*reach, reach/4)
+        self.events = []
+        self.moves = []
+        self.pairs = set()
+        self.members = dict()
+        self.visible = dict()
+        self.checks = 0
+
+    def __len__(self): return len(self.members)
+
+    def get_closing(self, v1, v2):
+        # The most the distance between 'v1' and 'v2' can change in one cycle.
+        return (Vehicle.MAX_SPEED[v1.type]+Vehicle.MAX_SPEED[v2.type])*Vehicle.STEP*self.SAFETY
+
+    def locate(self, vehicle):
+        # Move 'vehicle' on the grid, pair it with the vehicles it has just
+        # become a neighbour of and schedule the next move.
+        for target in self.grid.move(vehicle):
+            self.pair(vehicle, target)
+        self.schedule(vehicle)
+
+    def schedule(self, vehicle):
+        # The vehicle can't leave it's cell for this many cycles.
+        slack = self.grid.get_slack(vehicle)
+        wait = int(slack/(Vehicle.MAX_SPEED[vehicle.type]*Vehicle.STEP*self.SAFETY))
+        heapq.heappush(self.moves, (self.time+wait+1, vehicle.id))
+
+    def check(self, v1, v2):
+        # Look at the distance between 'v1' and 'v2' and schedule the next check.
+        # The distance is compared exactly like in 'Geometry.within', which
+        # gives the same answer either way around.
+        self.checks += 1
+        p1, p2 = v1.get_position(), v2.get_position()
+        dx, dy = p1[0]-p2[0], p1[1]-p2[1]
+        squared = dx*dx + dy*dy
+        inside = squared <= self.reach*self.reach
+
+        seen = self.visible[v1]
+        if inside != (v2 in seen):
+            if inside:
+                self.see(v1, v2)
+                self.see(v2, v1)
+            else:
+                seen.remove(v2)
+                self.visible[v2].remove(v1)
+            # The radars of both have something new.
+            v1.wake()
+            v2.wake()
+
+        if v1.id < v2.id: key = (v1.id, v2.id)
+        else: key = (v2.id, v1.id)
+        if not inside and not self.grid.are_neighbours(v1, v2):
+            # Out of range until the grid reports them again.
+            self.pairs.discard(key)
+            return
+
+        # Neither of them can cross the range for this many cycles.
+        slack = abs(math.sqrt(squared)-self.reach)
+        wait = int(slack/self.get_closing(v1, v2))
+        self.pairs.add(key)
+        heapq.heappush(self.events, (self.time+wait+1,)+key)
+
+    def pair(self, v1, v2):
+        # The grid reports 'v1' and 'v2' as neighbours, check them
+        # right away unless they are paired already.
+        if v1.id < v2.id: key = (v1.id, v2.id)
+        else: key = (v2.id, v1.id)
+        if key not in self.pairs: self.check(v1, v2)
+
+    def see(self, observer, vehicle):
+        # Add 'vehicle' to the targets of 'observer', keeping the order.
+        seen = self.visible[observer]
+        seen.append(vehicle)
+        if len(seen) > 1 and seen[-2].id > vehicle.id:
+            seen.sort(key=lambda target: target.id)
+
+    def advance(self):
+        # Called once each cycle after the vehicles have been moved. The
+        # vehicles that may have changed cells are moved on the grid first,
+        # then only the pairs whose check is due are looked at.
+        self.time += 1
+        moves = self.moves
+        members = self.members
+        while len(moves) and moves[0][0] <= self.time:
+            vehicle = members.get(heapq.heappop(moves)[1])
+            if vehicle is not None: self.locate(vehicle)
+        events = self.events
+        while len(events) and events[0][0] <= self.time:
+            time, id1, id2 = heapq.heappop(events)
+            v1, v2 = members.get(id1), members.get(id2)
+            if v1 is None or v2 is None:
+                # One of them is gone.
+                self.pairs.discard((id1, id2))
+                continue
+            self.check(v1, v2)
+
+    def query(self, vehicle):
+        # Return the vehicles within the range of 'vehicle'. A vehicle
+        # that is just spawning isn't on the queue yet, it compares
+        # it's position with the vehicles in the nearby cells.
+        seen = self.visible.get(vehicle)
+        if seen is not None: return list(seen)
+        position = vehicle.get_position()
+        found = []
+        for target in self.grid.query(position, self.reach):
+            p = target.get_position()
+            dx, dy = position[0]-p[0], position[1]-p[1]
+            if dx*dx + dy*dy <= self.reach*self.reach:
+                found.append(target)
+        return found
+
+    def insert(self, vehicle):
+        # Add a spawned vehicle and pair it with the vehicles around it.
+        self.visible[vehicle] = []
+        self.grid.insert(vehicle)
+        for target in self.grid.neighbours(vehicle):
+            self.check(vehicle, target)
+        self.members[vehicle.id] = vehicle
+        self.schedule(vehicle)
+
+    def remove(self, vehicle):
+        # Take 'vehicle' off the queue.
+        if self.members.pop(vehicle.id, None) is None: return
+        self.grid.remove(vehicle)
+        for target in self.visible.pop(vehicle):
+            self.visible[target].remove(vehicle)
+            target.wake()
+
+    def clear(self):
+        self.grid.clear()
+        self.events = []
+        self.moves = []
+        self.pairs = set()
+        self.members = dict()
+        self.visible = dict()
@@ -0,0 +1,105 @@
+
+
+from bisect import bisect_right
+
+
+class Lanes():
+
+    '''
+    This class keeps the vehicles on each piece of road in the order they
+    drive it. A lane is a path piece on a block, e.g. a ((column, row), (kind,
+    ctuple)) tuple of 'Pathh.pieces'. Each road between two blocks and each
+    way through a block has it's own piece, and the pieces are placed on the
+    block origins, so the coordinates of the same lane are the same for every
+    path using it. 'self.queues' maps a lane to the vehicles on it, the one
+    furthest along first. 'self.located' maps a vehicle to it's lane, the
+    index of it's closest coordinate in the lane and the index of the lane in
+    it's path. A vehicle is moved as it's path progress grows, check
+    'Vehicle.update_path_progress'. The vehicle ahead of another one on the
+    same lane is then simply the one before it in the queue. The first one
+    on a lane follows the last one on the next lanes of it's path, check
+    'self.get_leader' and 'Vehicle.set_intersections'. The CityCenter-object
+    owns the lanes.
+    '''
+
+    def __init__(self):
+        self.queues = dict()
+        self.located = dict()
+
+    def add(self, vehicle):
+        # 'vehicle' is placed on it's first lane as it spawns.
+        vehicle.lanes = self
+
+    def move(self, vehicle, index):
+        # 'index' is the closest coordinate of 'vehicle' in the whole path.
+        path = vehicle.get_path()
+        offsets = path.get_offsets()
+        piece = min(bisect_right(offsets, index)-1, len(offsets)-2)
+        lane = path.get_pieces()[piece]
+        along = index-offsets[piece]
+
+        old = self.located.get(vehicle)
+        if old is not None and old[0] == lane:
+            if old[1] == along: return
+            self.located[vehicle] = (lane, along, piece)
+            queue = self.queues[lane]
+            k = queue.index(vehicle)
+            # Overtaking hardly ever happens.
+            while k and self.located[queue[k-1]][1] < along:
+                queue[k-1], queue[k] = queue[k], queue[k-1]
+                k -= 1
+            return
+
+        if old is not None: self.leave(vehicle, old[0])
+        self.located[vehicle] = (lane, along, piece)
+        queue = self.queues.get(lane)
+        if queue is None:
+            self.queues[lane] = [vehicle]
+            return
+        # Usually the vehicle enters the lane from the start, behind the others.
+        k = len(queue)
+        while k and self.located[queue[k-1]][1] < along: k -= 1
+        queue.insert(k, vehicle)
+
+    def leave(self, vehicle, lane):
+        queue = self.queues[lane]
+        queue.remove(vehicle)
+        if not len(queue): del self.queues[lane]
+
+    def get_lane(self, vehicle):
+        # Return the lane 'vehicle' is on, None before it has spawned.
+        located = self.located.get(vehicle)
+        if located is None: return None
+        return located[0]
+
+    def get_last(self, lane):
+        # Return the vehicle on 'lane' that is the least far
+        # along it, None if there are no vehicles on it.
+        queue = self.queues.get(lane)
+        if queue is None: return None
+        return queue[-1]
+
+    def get_leader(self, vehicle):
+        # Return the vehicle right ahead of 'vehicle' on the same lane. The first
+        # one on a lane is led by the last vehicle on the next lane of it's path
+        # that has any, as far as the relevant pieces go, check 'Pathh.get_window'.
+        # Return None if there's no vehicle ahead.
+        located = self.located.get(vehicle)
+        if located is None: return None
+        queue = self.queues[located[0]]
+        k = queue.index(vehicle)
+        if k: return queue[k-1]
+        path = vehicle.get_path()
+        last = path.progress+len(path.get_window())
+        for lane in path.get_pieces()[located[2]+1:last]:
+            leader = self.get_last(lane)
+            if leader is not None: return leader
+        return None
+
+    def remove(self, vehicle):
+        located = self.located.pop(vehicle, None)
+        if located is not None: self.leave(vehicle, located[0])
+
+    def clear(self):
+        self.queues = dict()
+        self.located = dict()
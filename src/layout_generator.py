@@ -0,0 +1,337 @@
+
+
+import sys
+import time
+import bisect
+import random
+import numpy as np
+from blocks import Blocks
+
+
+class LayoutGenerator():
+
+    '''
+    This class forms the city layouts for the CityCenter-object. A block is
+    stored as a 4-bit mask where bit 0 stands for road access on the right
+    side, bit 1 for the top side and so on, check the Blocks-class. There are
+    twelve kinds of blocks, every mask except the four dead ends, these are
+    listed in 'self.TILES' in the same order as 'Blocks.OPTIONS'. The blocks
+    that are not known yet are described by a 12-bit domain: bit k is set if
+    the block can still become tile k. Neighboring blocks must agree on their
+    common side, 'self.support' tells for each direction and each domain which
+    tiles the neighbor in that direction can become. The bordering pieces, the connecting pieces near the
+    corners and the centerpieces of the smaller maps are fixed first. After
+    that the rest of the blocks are chosen randomly one at a time in scanline
+    order and each choice is propagated to the neighbors right away, check
+    'self.propagate'. If a block runs out of options, the blocks around it are
+    chosen again, check 'self.backtrack'. Passing 'seed' makes the layout
+    reproducible, otherwise the seed is drawn from the 'random' module.
+    '''
+
+    # The masks of the twelve blocks.
+    TILES = Blocks.OPTIONS
+    # Every tile is still possible.
+    ANY = (1 << len(TILES))-1
+    # How each direction changes the indexes.
+    STEPS = ((1, 0), (0, -1), (-1, 0), (0, 1))
+
+    def __init__(self, dimensions, seed=None):
+        self.dimensions = dimensions
+        if seed is None: seed = random.getrandbits(64)
+        self.random = random.Random(seed)
+        # How many times some blocks had to be chosen again.
+        self.backtracks = 0
+        self.set_tables()
+
+    def get_backtracks(self): return self.backtracks
+
+    def set_tables(self):
+        # 'self.support[d][domain]' is the domain of the neighbor in direction d, when
+        # the block itself can become any tile in 'domain'. 'self.choices[domain]' lists
+        # the tiles of a domain.
+
+        compatible = [[0]*len(self.TILES) for d in range(4)]
+        for d in range(4):
+            opposite = (d+2)%4
+            for a, mask_a in enumerate(self.TILES):
+                for b, mask_b in enumerate(self.TILES):
+                    if (mask_a >> d & 1) == (mask_b >> opposite & 1):
+                        compatible[d][a] |= 1 << b
+
+        # The mask of the first tile in each domain, only single-tile domains are looked up.
+        self.masks = np.zeros(self.ANY+1, dtype=np.uint8)
+
+        self.support = [[0]*(self.ANY+1) for d in range(4)]
+        self.choices = [[] for domain in range(self.ANY+1)]
+        for domain in range(self.ANY+1):
+            for tile in range(len(self.TILES)):
+                if domain >> tile & 1:
+                    if not self.choices[domain]: self.masks[domain] = self.TILES[tile]
+                    self.choices[domain].append(tile)
+                    for d in range(4):
+                        self.support[d][domain] |= compatible[d][tile]
+
+    def generate(self):
+        # Return a new layout, check 'self.get_blocks'.
+
+        limit = self.dimensions
+        self.domains = [self.ANY]*(limit*limit)
+        self.fixed = [False]*(limit*limit)
+        self.set_presets()
+
+        # Let the fixed blocks limit their neighbors.
+        fixed = [index for index in range(limit*limit) if self.fixed[index]]
+        if not self.propagate(fixed):
+            raise ValueError('The fixed blocks of a '+str(limit)+'x'+str(limit)+' layout do not fit together')
+
+        # Choose the rest of the blocks one at a time.
+        self.collapse([i*limit+j for i in range(1, limit-1) for j in range(1, limit-1)])
+
+        return self.get_blocks()
+
+    def repair(self, blocks, margin=1):
+        # Choose the blocks in 'blocks', a list of (i, j) tuples, again together with
+        # every block within 'margin' blocks from them. The rest of the layout stays
+        # the same. This is called by the CityCenter-object to get rid of dead loops.
+        # Returns the new layout just like 'self.generate'.
+
+        limit = self.dimensions
+        area = set()
+        for i, j in blocks:
+            for i_area in range(max(1, i-margin), min(limit-2, i+margin)+1):
+                for j_area in range(max(1, j-margin), min(limit-2, j+margin)+1):
+                    if not self.fixed[i_area*limit+j_area]:
+                        area.add(i_area*limit+j_area)
+
+        for index in area:
+            self.domains[index] = self.ANY
+
+        # Let the surroundings limit the area again.
+        changed = set()
+        for index in area:
+            i, j = divmod(index, limit)
+            for i_next, j_next in ((i, j), (i+1, j), (i, j-1), (i-1, j), (i, j+1)):
+                changed.add(i_next*limit+j_next)
+        if not self.propagate(list(changed)):
+            # Just in case, everything is chosen again.
+            return self.generate()
+
+        self.collapse(sorted(area))
+        return self.get_blocks()
+
+    def collapse(self, order):
+        # Choose a tile for every block in 'order', a list of block indexes
+        # in increasing order, e.g. one column after another from the left.
+
+        position = 0
+        failures = 0
+        while position < len(order):
+            index = order[position]
+            domain = self.domains[index]
+            choices = self.choices[domain]
+            if len(choices) > 1:
+                tile = choices[self.random.randint(0, len(choices)-1)]
+                self.domains[index] = 1 << tile
+                if not self.propagate([index]):
+                    # Some block ran out of options, choose the
+                    # blocks around this one again, a bit further
+                    # each time this happens in a row.
+                    failures += 1
+                    area = self.backtrack(index, failures)
+                    for block in area:
+                        # The area may reach outside 'order'.
+                        k = bisect.bisect_left(order, block)
+                        if k == len(order) or order[k] != block:
+                            order.insert(k, block)
+                    # Continue from the first block of the area.
+                    position = bisect.bisect_left(order, area[0])
+                    continue
+            failures = 0
+            position += 1
+
+    def set_presets(self):
+        # Fix the bordering pieces, the connecting pieces near the corners and
+        # the centerpieces of the smaller layouts. These don't depend on chance.
+
+        limit = self.dimensions
+
+        def fix(i, j, block):
+            tile = self.TILES.index(block)
+            self.domains[i*limit+j] = 1 << tile
+            self.fixed[i*limit+j] = True
+
+        # Set the bottom and top rows first.
+        for i in range(limit):
+            if i%2 and i != limit-1: fix(i, 0, Blocks.VERTICAL)
+            else: fix(i, 0, Blocks.LAWN)
+            if limit%2: road = i%2
+            else: road = not i%2
+            if road and i != 0 and i != limit-1: fix(i, limit-1, Blocks.VERTICAL)
+            else: fix(i, limit-1, Blocks.LAWN)
+
+        # Set the left-most and right-most columns.
+        for j in range(1, limit-1):
+            if limit%2: road = j%2
+            else: road = not j%2
+            if road: fix(0, j, Blocks.HORIZONTAL)
+            else: fix(0, j, Blocks.LAWN)
+            if j%2: fix(limit-1, j, Blocks.HORIZONTAL)
+            else: fix(limit-1, j, Blocks.LAWN)
+
+        # Set four connecting pieces near the corners.
+        if limit >= 6 and limit%2:
+            fix(1, 1, Blocks.T_INTERSECTION_3)
+            fix(limit-2, 1, Blocks.T_INTERSECTION_2)
+            fix(1, limit-2, Blocks.T_INTERSECTION_4)
+            fix(limit-2, limit-2, Blocks.T_INTERSECTION_1)
+        elif limit >= 6:
+            fix(1, 2, Blocks.T_INTERSECTION_3)
+            fix(limit-3, 1, Blocks.T_INTERSECTION_2)
+            fix(2, limit-2, Blocks.T_INTERSECTION_4)
+            fix(limit-2, limit-3, Blocks.T_INTERSECTION_1)
+
+        # Set a few centerpieces next.
+        if limit == 4:
+            # No randomness in a 4x4 layout.
+            fix(1, 1, Blocks.VERTICAL)
+            fix(1, 2, Blocks.T_INTERSECTION_2)
+            fix(2, 1, Blocks.CURVE_4)
+            fix(2, 2, Blocks.T_INTERSECTION_3)
+        elif limit == 5:
+            fix(2, 2, Blocks.T_INTERSECTION_4)
+            fix(3, 2, Blocks.CURVE_2)
+            fix(2, 3, Blocks.CURVE_1)
+        elif limit == 6:
+            fix(2, 2, Blocks.CURVE_1)
+            fix(2, 3, Blocks.LAWN)
+            fix(3, 2, Blocks.T_INTERSECTION_4)
+            fix(3, 3, Blocks.VERTICAL)
+        elif limit == 7:
+            fix(2, 2, Blocks.T_INTERSECTION_4)
+            fix(2, 4, Blocks.FOUR_WAY)
+            fix(4, 2, Blocks.FOUR_WAY)
+            fix(4, 4, Blocks.T_INTERSECTION_2)
+            fix(3, 2, Blocks.HORIZONTAL)
+            fix(3, 4, Blocks.HORIZONTAL)
+            fix(2, 3, Blocks.VERTICAL)
+            fix(4, 3, Blocks.VERTICAL)
+            fix(3, 3, Blocks.LAWN)
+            fix(1, 4, Blocks.CURVE_1)
+            fix(4, 5, Blocks.LAWN)
+            fix(3, 5, Blocks.CURVE_3)
+        elif limit == 8:
+            fix(1, 1, Blocks.CURVE_1)
+            fix(1, 2, Blocks.T_INTERSECTION_4)
+            fix(2, 1, Blocks.T_INTERSECTION_4)
+            fix(2, 2, Blocks.CURVE_2)
+            fix(5, 2, Blocks.LAWN)
+            fix(2, 5, Blocks.LAWN)
+            fix(3, 3, Blocks.CURVE_4)
+            fix(4, 3, Blocks.FOUR_WAY)
+            fix(3, 4, Blocks.CURVE_2)
+            fix(4, 4, Blocks.VERTICAL)
+            fix(2, 4, Blocks.HORIZONTAL)
+            fix(2, 3, Blocks.LAWN)
+            fix(4, 2, Blocks.VERTICAL)
+            fix(3, 2, Blocks.LAWN)
+            fix(6, 4, Blocks.VERTICAL)
+        elif limit == 9:
+            fix(3, 3, Blocks.LAWN)
+            fix(4, 3, Blocks.VERTICAL)
+            fix(5, 3, Blocks.LAWN)
+            fix(3, 4, Blocks.HORIZONTAL)
+            fix(4, 4, Blocks.FOUR_WAY)
+            fix(5, 4, Blocks.HORIZONTAL)
+            fix(3, 5, Blocks.LAWN)
+            fix(4, 5, Blocks.VERTICAL)
+            fix(5, 5, Blocks.LAWN)
+            fix(2, 1, Blocks.LAWN)
+            fix(7, 2, Blocks.LAWN)
+            fix(1, 6, Blocks.LAWN)
+            fix(6, 7, Blocks.CURVE_2)
+            fix(7, 6, Blocks.CURVE_3)
+            fix(7, 5, Blocks.T_INTERSECTION_2)
+            fix(7, 4, Blocks.VERTICAL)
+            fix(2, 3, Blocks.VERTICAL)
+
+    def propagate(self, changed):
+        # Remove the tiles that no longer fit from the neighbors of the blocks in
+        # 'changed', and from their neighbors in turn, for as long as something
+        # changes. Returns False if some block runs out of options.
+
+        limit = self.dimensions
+        domains = self.domains
+        support = self.support
+        steps = self.STEPS
+
+        while changed:
+            index = changed.pop()
+            i, j = divmod(index, limit)
+            domain = domains[index]
+            for d in range(4):
+                i_next = i+steps[d][0]
+                j_next = j+steps[d][1]
+                if i_next < 0 or j_next < 0 or i_next >= limit or j_next >= limit: continue
+                neighbor = i_next*limit+j_next
+                before = domains[neighbor]
+                after = before & support[d][domain]
+                if after == before: continue
+                if not after: return False
+                domains[neighbor] = after
+                changed.append(neighbor)
+        return True
+
+    def backtrack(self, index, failures):
+        # Forget the choices made within 'failures' blocks from block 'index' and
+        # work out the options of these blocks again from their surroundings. Returns
+        # the indexes of these blocks in increasing order. Whenever the same area
+        # keeps failing, the area grows until it covers the whole layout.
+
+        self.backtracks += 1
+        limit = self.dimensions
+        i, j = divmod(index, limit)
+
+        while True:
+            radius = failures
+            i_min, i_max = max(1, i-radius), min(limit-2, i+radius)
+            j_min, j_max = max(1, j-radius), min(limit-2, j+radius)
+
+            area = []
+            for i_area in range(i_min, i_max+1):
+                for j_area in range(j_min, j_max+1):
+                    if not self.fixed[i_area*limit+j_area]:
+                        area.append(i_area*limit+j_area)
+                        self.domains[i_area*limit+j_area] = self.ANY
+
+            # Every block around the area and inside it limits the blocks in the area again.
+            changed = []
+            for i_area in range(max(0, i_min-1), min(limit-1, i_max+1)+1):
+                for j_area in range(max(0, j_min-1), min(limit-1, j_max+1)+1):
+                    changed.append(i_area*limit+j_area)
+            if self.propagate(changed): break
+
+            # Even the area itself doesn't fit together anymore, make it bigger.
+            failures += 1
+
+        return area
+
+    def get_blocks(self):
+        # Return the chosen tiles as an array of masks, e.g. 'CityCenter.blocks'.
+        limit = self.dimensions
+        domains = np.array(self.domains, dtype=np.int32).reshape(limit, limit)
+        return self.masks[domains]
+
+
+if __name__ == '__main__':
+    # Measure how long it takes to generate a layout, e.g.
+    # 'python layout_generator.py 1000 1' forms a 1000x1000
+    # layout with seed 1.
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    generator = LayoutGenerator(size, seed)
+    start = time.perf_counter()
+    blocks = generator.generate()
+    elapsed = time.perf_counter()-start
+
+    print(str(size)+'x'+str(size)+' layout in '+str(round(elapsed, 3))+' s, '+str(generator.get_backtracks())+' backtracks')
@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class PairCache():
+
+    '''
+    This class remembers where the paths of two vehicles come close, the
+    CityCenter-object owns one that is shared by every Radar-object. A vehicle
+    looks the crossing of every visible vehicle up every 200 milliseconds, check
+    'Vehicle.set_intersections', while the pieces the relevant coordinates come
+    from only change when either vehicle moves on to the next piece. The key is
+    the (smaller id, bigger id) pair and the value is a list [progress of the
+    smaller, progress of the bigger, close pairs]. 'close pairs' maps the id of
+    the observing vehicle to the index arrays of 'ConflictTable.close_pairs'
+    for the whole pieces of both windows, check 'Pathh.get_window'. The arrays
+    are formed once for the vehicle with the smaller id and swapped for the
+    other one. The passed coordinates of both vehicles are left out when the
+    crossing is looked up, so the answer is the same as 'ConflictTable.find'
+    gives. When either path progress has changed, the pairs are formed again.
+    '''
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        self.pairs = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self): return len(self.pairs)
+
+    def find(self, own, target):
+        # Return the (has_to_yield, cross_point, angle) triple for vehicle 'own'
+        # observing vehicle 'target', check 'ConflictTable.find'.
+
+        if own.id < target.id: small, big = own, target
+        else: small, big = target, own
+        key = (small.id, big.id)
+        small_path, big_path = small.get_path(), big.get_path()
+
+        pair = self.pairs.get(key)
+        if pair is None or pair[0] != small_path.progress or pair[1] != big_path.progress:
+            self.misses += 1
+            close = self.conflicts.close_pairs(small_path.get_window(), small_path.get_window_coordinates(), \
+                big_path.get_window(), big_path.get_window_coordinates())
+            pair = [small_path.progress, big_path.progress, {small.id: close}]
+            self.pairs[key] = pair
+        else:
+            self.hits += 1
+
+        found = pair[2]
+        if own.id not in found:
+            # The same pairs the other way around, sorted by the indexes of 'own'.
+            i, j = found[target.id]
+            order = np.lexsort((i, j))
+            found[own.id] = (j[order], i[order])
+
+        own_path, target_path = own.get_path(), target.get_path()
+        first = self.conflicts.first_close(found[own.id], own.passed, len(own_path.get_window_coordinates()), \
+            target.passed, len(target_path.get_window_coordinates()))
+        if first is None: return False, None, None
+        return self.conflicts.radar.crossing(own.get_relevant_coordinates(), \
+            target.get_relevant_coordinates(), first[0], first[1])
+
+    def forget(self, vehicle):
+        # Leave out every pair 'vehicle' belongs to.
+        for key in [key for key in self.pairs if vehicle.id in key]:
+            del self.pairs[key]
+
+    def clear(self):
+        self.pairs = dict()
@@ -1,6 +1,10 @@
 
 from constants import Constants
+from blocks import Blocks
 import math
+import heapq
+import bisect
+import numpy as np
 
 class Pathh():
     
@@ -11,22 +15,39 @@ class Pathh():
     generated right after the spawn and goal locations are
     determined by the CityCenter-object. 'seld.generate_path'
     is called by the CityCenter-object and will do the
-    calculations with the help of Dijkstra's algorithm
-    regarding the path. However, if a path can not be
-    generated due to an unaccessible goal location (from
-    the spawn), 'self.generate_path' is given a new goal. 
-    This keeps on going until a functioning path is formed.
-    A vehicle's path is fixed once it has been successfully
+    calculations with the help of the A* search algorithm
+    regarding the path. The CityCenter-object only gives
+    goals that can be reached from the spawn, check
+    'CityCenter.set_reachable', so a path is always formed
+    on the first try. A vehicle's path is fixed once it has been successfully
     created on can be set visible by clicking  on the respective
-    vehicle. The  length of 'self.coordinates' is equal to the
-    amount of blocks the vehicle is supposed to cross plus two.
+    vehicle. Once the path is generated, 'self.coordinates' is a
+    single (n, 2) NumPy array of every coordinate pair on the path and
+    the pieces of the path start at the indexes in 'self.offsets'. The
+    amount of pieces is equal to the amount of blocks the vehicle is
+    supposed to cross plus two.
     One set of coordinates is added at the start and one at the 
     end, since the vehicle is spawned outside the map and will
     eventually exit it as well. 'self.update' is called every
     time the vehicle has progressed enough on the path, check
     'Vehicle.update_path_progress' for further information.
+    Every path piece is also listed in 'self.pieces' as a
+    ((column, row), (kind, ctuple)) tuple, where the first tuple
+    tells the block the piece is placed on and the second one
+    what kind of a piece it is. The pieces are in the same
+    order as their coordinates, check 'ConflictTable'. The
+    coordinates are samples of lines and arcs, these are kept
+    in 'self.primitives' so that the closest point of the path
+    can be worked out exactly, check 'self.closest'.
     '''
     
+    # The three kinds of path pieces
+    LINE = 0
+    CURVE_1 = 1
+    CURVE_2 = 2
+    # The coordinates of every (kind, ctuple) piece, check 'self.get_template'.
+    TEMPLATES = dict()
+    
     def __init__(self, vehicle_type):
         # This many coordinate pairs for one normal-sized map piece.
         self.count = 20
@@ -34,8 +55,12 @@ class Pathh():
         self.decreased_count = 12
         self.size = Constants.BLOCK_SIZE
         self.set_radius(vehicle_type)
-        # This will be a 3-dimensional list.
+        # This will be a list of tuples of coordinate pairs, one tuple per piece,
+        # until the path is complete, check 'self.set_coordinates'.
         self.coordinates = []
+        self.offsets = [0]
+        self.pieces = []
+        self.primitives = []
         self.progress = 0
         self.sub_progress = 0
         
@@ -45,9 +70,63 @@ class Pathh():
         return self.spawn
         
     def get_coordinates(self):
-        # Return the 3-dimensional list of all the coordinates.
+        # Return the (n, 2) array of all the coordinates.
         return self.coordinates
     
+    def get_offsets(self): return self.offsets
+    
+    def get_window_range(self):
+        # Return the indexes in 'self.coordinates' where the pieces in
+        # 'self.get_window' start and where the piece after them starts.
+        stop = min(self.progress+4, self.limit+1)
+        return self.offsets[self.progress], self.offsets[stop]
+    
+    def get_window_coordinates(self):
+        # Return the coordinates of the pieces in 'self.get_window' as a view of
+        # 'self.coordinates', no coordinates are copied.
+        first, last = self.get_window_range()
+        return self.coordinates[first:last]
+    
+    def get_pieces(self): return self.pieces
+    
+    def get_window(self):
+        # Return the pieces matching the coordinates in 'Vehicle.proximity', 
+        # e.g. the four pieces starting from 'self.progress' if there are enough.
+        return self.pieces[self.progress:min(self.progress+4, self.limit+1)]
+    
+    def get_route(self):
+        # Return the generated path as a (coordinates, offsets, pieces, primitives, spawn, goal) tuple.
+        # The tuple is stored in the RouteCache of the CityCenter-object and handed to the
+        # next paths with the same route, check 'self.set_route'. The coordinate array is
+        # read-only, so every one of these paths uses the very same array.
+        self.pieces = tuple(self.pieces)
+        self.primitives = tuple(self.primitives)
+        return self.coordinates, self.offsets, self.pieces, self.primitives, tuple(self.spawn), tuple(self.goal)
+
+    def set_route(self, route):
+        # Take a route given by 'self.get_route' of another path into use
+        # instead of generating one. Only the progress is this path's own.
+        self.coordinates, self.offsets, self.pieces, self.primitives, spawn, goal = route
+        self.spawn = list(spawn)
+        self.goal = list(goal)
+        self.limit = len(self.offsets)-2
+    
+    def set_coordinates(self):
+        # Gather the coordinates of the finished path into one read-only
+        # array, the pieces start at the indexes in 'self.offsets'.
+        self.offsets = [0]
+        for piece in self.coordinates:
+            self.offsets.append(self.offsets[-1]+len(piece))
+        self.offsets = tuple(self.offsets)
+        self.coordinates = np.array([location for piece in self.coordinates for location in piece], dtype=float)
+        self.coordinates.flags.writeable = False
+
+    def add_piece(self, attach_point, kind, ctuple):
+        # List the block, the kind and the line or arc of the piece that was just added.
+        block = (int(round(attach_point[0]/self.size)), int(round(attach_point[1]/self.size)))
+        self.pieces.append((block, (kind, ctuple)))
+        self.primitives.append(self.place_primitive(attach_point, kind, ctuple))
+    
     def get_progress(self):
         # 'self.progress' will define which indexes from 'self.coordinates'
         # are considered relevant to the vehicle. 'self.sub_progress' in it's
@@ -131,8 +210,9 @@ class Pathh():
             
         self.goal = [x, y]
     
-    def generate_path(self, graph, city_blocks, entry, goal):
+    def generate_path(self, graph, city_blocks, entry, goal, bidirectional_search=False):
         # This method is responsible for creating the shortest path between entry and goal.
+        # With 'bidirectional_search' the path is searched from both ends at the same time.
         
         # Form vertices source and target with the help of coordinates entry and goal.
         # Entry and goal are the exact coordinates the vehicle is supposed to enter/exit the city.
@@ -143,65 +223,122 @@ class Pathh():
         for i in range(2):
             if source[i] > upper_limit: source[i] -= 1
             if target[i] > upper_limit: target[i] -= 1
-        source = str(source[0]) + str(source[1])
-        target = str(target[0]) + str(target[1])
+        source = graph.get_vertex(source[0], source[1])
+        target = graph.get_vertex(target[0], target[1])
     
         dist = dict()
         prev = dict()
 
-        def Dijkstra():
-            # This is Dijkstra's algorithm for finding the minimum path from source to target.
-            vertices = graph.get_vertices()[:] # example: ['01', '10', '11', '12', '21'] 
-            adjacency = graph.get_adjacency() # example: {'01': [('11', 1, 0)], '11': [('21', 1, 0), ('01', 1, 2)]}
-    
-            # Initially, every unexplored vertex has an infinite distance. If a vertex is left 
-            # unexplored we can easily tell this from whether distance is infinite or not. 
-            for vertex in vertices:
-                dist[vertex] = math.inf
-                prev[vertex] = 'undefined'
-                
-            # We start from vertex source.
+        location = graph.get_location
+        goal_i, goal_j = location(target)
+        source_i, source_j = location(source)
+
+        def to_target(vertex):
+            # Every edge is at least as long as the amount of blocks between its
+            # ends, therefore the Manhattan distance never overestimates the
+            # remaining distance and the first time we pop the target, we're done.
+            i, j = location(vertex)
+            return abs(i-goal_i)+abs(j-goal_j)
+
+        def to_source(vertex):
+            # Same as the one above, but for searching backwards.
+            i, j = location(vertex)
+            return abs(i-source_i)+abs(j-source_j)
+
+        def A_star():
+            # This is the A* algorithm for finding the minimum path from source to target.
+            # 'queue' is a heap of (estimate, order, vertex) tuples, where estimate is the
+            # distance so far plus the heuristic. 'order' keeps ties in the order they were
+            # found. Vertices are not removed from the heap when a shorter route is found,
+            # the outdated entries are simply skipped when they come up.
             dist[source] = 0
-            
-            while vertices != []:
-                
-                # Choose the vertex with the smallest distance.
-                distance = math.inf
-                for vertex in vertices:
-                    if dist[vertex] < distance:
-                        distance = dist[vertex]
-                        chosen_vertex = vertex
-                        
-                # If we have to break the loop, it means that the city layout has isolated road
-                # pieces and that all reachable vertices (from source) have already been visited.
-                if distance == math.inf: break
-    
-                vertices.remove(chosen_vertex)
-                
+            prev[source] = 'undefined'
+            visited = set()
+            queue = [(to_target(source), 0, source)]
+            order = 1
+
+            while queue:
+                estimate, unused, chosen_vertex = heapq.heappop(queue)
+                if chosen_vertex in visited: continue
+                visited.add(chosen_vertex)
+
                 # Enough is done.
-                #if chosen_vertex == target: break
-                
-                adj = adjacency[chosen_vertex] # example: [('21', 1, 0), ('10', 1, 1), ('01', 1, 2)]
-                
+                if chosen_vertex == target: break
+
                 # In an adjacency tuple, the first value represents the neighboring vertex, 
                 # the second it's distance and the third one it's direction from chosen_vertex.  
-                for tuple in adj:
-                    neighbor = tuple[0]
-                    # If this vertex is not in vertices anymore, it's not taken to account.
-                    if neighbor in vertices:
-                        edge_length = tuple[1]
-                        alt = dist[chosen_vertex] + edge_length
-                        # The smallest possible alternative is saved.
-                        if alt < dist[neighbor]:
-                            dist[neighbor] = alt
-                            prev[neighbor] = chosen_vertex
-                        
-        Dijkstra()
+                for neighbor, edge_length, direction in graph.get_edges(chosen_vertex):
+                    if neighbor in visited: continue
+                    alt = dist[chosen_vertex] + edge_length
+                    # The smallest possible alternative is saved.
+                    if alt < dist.get(neighbor, math.inf):
+                        dist[neighbor] = alt
+                        prev[neighbor] = chosen_vertex
+                        heapq.heappush(queue, (alt+to_target(neighbor), order, neighbor))
+                        order += 1
+
+        def bidirectional():
+            # Search from source and from target at the same time, always advancing the side
+            # with the smaller estimate. Every road can be driven both ways, so searching
+            # backwards from target uses the same adjacency. The searches stop once no
+            # route through the remaining vertices can beat the best one found so far.
+            # The resulting path is written into 'dist' and 'prev' just like 'A_star' does.
+
+            # [distances, previous vertices, visited, heap, heuristic]
+            forward = [{source: 0}, {source: 'undefined'}, set(), [(to_target(source), 0, source)], to_target]
+            backward = [{target: 0}, {target: 'undefined'}, set(), [(to_source(target), 0, target)], to_source]
+            order = 1
+            best, meeting = math.inf, None
 
-        if dist[target] == math.inf:
-            # This means that we have failed at generating the path. If we failed, it's all right, 
-            # since it was bound to happen anyway. By returning False we let the CityCenter-object
-            # know that we need new coordinates for source and target, the graph remains unchanged.
+            while forward[3] and backward[3]:
+                if best <= max(forward[3][0][0], backward[3][0][0]):
+                    # A* estimates on either side are lower bounds for any better route.
+                    break
+                side = forward if forward[3][0][0] <= backward[3][0][0] else backward
+                other = backward if side is forward else forward
+                distances, previous, visited, queue, heuristic = side
+
+                estimate, unused, chosen_vertex = heapq.heappop(queue)
+                if chosen_vertex in visited: continue
+                visited.add(chosen_vertex)
+
+                for neighbor, edge_length, direction in graph.get_edges(chosen_vertex):
+                    if neighbor in visited: continue
+                    alt = distances[chosen_vertex] + edge_length
+                    if alt < distances.get(neighbor, math.inf):
+                        distances[neighbor] = alt
+                        previous[neighbor] = chosen_vertex
+                        heapq.heappush(queue, (alt+heuristic(neighbor), order, neighbor))
+                        order += 1
+                    if neighbor in other[0] and alt + other[0][neighbor] < best:
+                        # The two searches have met.
+                        best = alt + other[0][neighbor]
+                        meeting = (chosen_vertex, neighbor) if side is forward else (neighbor, chosen_vertex)
+
+            if meeting is None: return
+
+            # Walk from source to the meeting point and
+            # from there on backwards to the target.
+            vertex = meeting[0]
+            while vertex != 'undefined':
+                prev[vertex] = forward[1][vertex]
+                vertex = forward[1][vertex]
+            vertex, previous_vertex = meeting[1], meeting[0]
+            while vertex != 'undefined':
+                prev[vertex] = previous_vertex
+                vertex, previous_vertex = backward[1][vertex], vertex
+            dist[target] = best
+
+        if source == target:
+            dist[source] = 0
+            prev[source] = 'undefined'
+        elif bidirectional_search: bidirectional()
+        else: A_star()
+
+        if dist.get(target, math.inf) == math.inf:
+            # The target can't be reached from the source. The CityCenter-object never asks
+            # for such a path, check 'CityCenter.set_reachable', but if it did, it would be
+            # told so by returning False. The path and the graph remain unchanged.
             return False
         
         def set_pieces(target):
@@ -221,12 +358,11 @@ class Pathh():
             # Dictionary 'dire' will tell which direction
             # we must travel from each vertex on the path.
             dire = dict()
-            adjacency = graph.get_adjacency()
             limit = len(path_vertices)-1
             for index in range(limit):
                 vertex = path_vertices[index]
                 next_vertex = path_vertices[index+1]
-                neighbors = adjacency[vertex]
+                neighbors = graph.get_edges(vertex)
                 for neighbor in neighbors:
                     # This is the neighbor whose direction we want to save.
                     if neighbor[0] == next_vertex:
@@ -239,7 +375,7 @@ class Pathh():
             while True:
                 
                 loc = path_vertices.pop(0)
-                i, j = int(loc[0]), int(loc[1])
+                i, j = graph.get_location(loc)
                 direction = dire[loc]
 
                 if direction == 'final': break
@@ -297,14 +433,13 @@ class Pathh():
                 elif direction == 1: j -= 1
                 elif direction == 2: i -= 1
                 else: j += 1
-                loc = str(i)+str(j)
+                loc = graph.get_vertex(i, j)
                 
                 while not loc in path_vertices:
                     # Define direction with the help of 'city_blocks'.
                     
-                    block = city_blocks[i][j]
-                    for index in range(4):
-                        if block[index] == 1 and not index == previous_direction:
+                    for index in Blocks.DIRECTIONS[city_blocks[i, j]]:
+                        if not index == previous_direction:
                             direction = index
                             previous_direction = set_piece(direction, previous_direction, i ,j)
                             break
@@ -314,24 +449,183 @@ class Pathh():
                     elif direction == 2: i -= 1
                     else: j += 1
                     
-                    loc = str(i)+str(j)
+                    loc = graph.get_vertex(i, j)
             
             # Last two pieces
             self.set_final(goal)
         
         set_pieces(target)
 
-        # This will tell the biggest allowed index in self.coordinates.
-        self.limit = len(self.get_coordinates())-1
+        # This will tell the biggest allowed piece index.
+        self.limit = len(self.coordinates)-1
+        self.set_coordinates()
 
         # Path generated successfully.
         return True
         
+    def get_template(self, kind, ctuple):
+        # Return the piece of the given kind as a (base, points, primitive) tuple where the
+        # points and the primitive are relative to 'base' and 'base' is relative to the block
+        # origin. The pieces look the same on every block and for every vehicle type, so each
+        # template is formed once and shared by all the paths, check 'self.place'.
+        key = (kind, ctuple)
+        if not key in self.TEMPLATES:
+            if kind == self.LINE: self.TEMPLATES[key] = self.form_line(ctuple)
+            elif kind == self.CURVE_1: self.TEMPLATES[key] = self.form_curve_1(ctuple)
+            else: self.TEMPLATES[key] = self.form_curve_2(ctuple)
+        return self.TEMPLATES[key]
+    
+    def place(self, attach_point, kind, ctuple):
+        # Return the coordinates of a piece placed on the block at 'attach_point'.
+        base, template, primitive = self.get_template(kind, ctuple)
+        x_0 = attach_point[0]+base[0]
+        y_0 = attach_point[1]+base[1]
+        return tuple((x_0+x, y_0+y) for x, y in template)
+    
+    def place_primitive(self, attach_point, kind, ctuple):
+        # Return the line or the arc of a piece placed on the block at 'attach_point'. A line
+        # is a (kind, x, y, direction x, direction y, length) tuple where (x, y) is the start
+        # of the line and the direction is a unit vector. An arc is a (kind, x, y, radius,
+        # angle, sweep) tuple where (x, y) is the center of the circle, 'angle' tells where
+        # the arc starts and 'sweep' how far it turns, both in radians growing counter-clockwise.
+        # Both are followed by the length of the piece and a circle (x, y, radius) that
+        # the whole piece fits in, check 'self.closest'.
+        base, template, primitive = self.get_template(kind, ctuple)
+        x, y, a, b, c = primitive
+        primitive = (kind, attach_point[0]+base[0]+x, attach_point[1]+base[1]+y, a, b, c)
+        if kind == self.LINE: length = c
+        else: length = a*abs(c)
+        primitive += (length,)
+        start = self.evaluate(primitive, 0)[0]
+        middle = self.evaluate(primitive, length/2)[0]
+        end = self.evaluate(primitive, length)[0]
+        center_x = (start[0]+end[0])/2
+        center_y = (start[1]+end[1])/2
+        reach = max(math.sqrt(pow(start[0]-center_x,2)+pow(start[1]-center_y,2)), \
+            math.sqrt(pow(middle[0]-center_x,2)+pow(middle[1]-center_y,2)))
+        return primitive+(center_x, center_y, reach)
+    
+    def evaluate(self, primitive, s):
+        # Return the point at distance 's' from the start of a line or an arc along
+        # it and the unit tangent in the direction of travel at that point.
+        kind, x, y, a, b, c = primitive[:6]
+        if kind == self.LINE:
+            return (x+s*a, y+s*b), (a, b)
+        # In the graphics scene y grows downwards, hence the minus signs.
+        sign = 1 if c > 0 else -1
+        theta = b+sign*s/a
+        return (x+a*math.cos(theta), y-a*math.sin(theta)), (-sign*math.sin(theta), -sign*math.cos(theta))
+    
+    def project(self, primitive, location, low, high):
+        # Return the distance from the start of a line or an arc to its point closest to
+        # 'location' and the squared distance between the two. Only the part between
+        # distances 'low' and 'high' from the start counts.
+        kind, x, y, a, b, c = primitive[:6]
+        delta_x = location[0]-x
+        delta_y = location[1]-y
+        if kind == self.LINE:
+            s = min(max(delta_x*a+delta_y*b, low), high)
+            delta_x -= s*a
+            delta_y -= s*b
+            return s, delta_x*delta_x+delta_y*delta_y
+        # The direction of 'location' seen from the center of the circle.
+        sign = 1 if c > 0 else -1
+        s = (sign*(math.atan2(-delta_y, delta_x)-b))%(2*math.pi)*a
+        squared = delta_x*delta_x+delta_y*delta_y
+        if low <= s <= high:
+            gap = math.sqrt(squared)-a
+            return s, gap*gap
+        # Outside the arc one of the ends is the closest point, the one with the smaller
+        # angle between it and 'location' seen from the center of the circle.
+        circle = 2*math.pi*a
+        to_low = abs(s-low)
+        to_low = min(to_low, circle-to_low)
+        to_high = abs(s-high)
+        to_high = min(to_high, circle-to_high)
+        if to_low <= to_high: s, angle = low, to_low/a
+        else: s, angle = high, to_high/a
+        return s, max(squared+a*a-2*a*math.sqrt(squared)*math.cos(angle), 0)
+    
+    def get_parameter(self, index, end=False):
+        # Return the piece that the fractional coordinate index 'index' falls on and the
+        # distance from the start of that piece. Index 2.5 is halfway between the
+        # coordinates at indexes 2 and 3, the path ends at index len(self.coordinates).
+        # Where two pieces meet, the index is the start of the latter one, or the end
+        # of the former one if 'end' is True.
+        offsets = self.offsets
+        if end: piece = bisect.bisect_left(offsets, index)-1
+        else: piece = bisect.bisect_right(offsets, index)-1
+        piece = min(max(piece, 0), len(offsets)-2)
+        count = offsets[piece+1]-offsets[piece]
+        fraction = min(max(index-offsets[piece], 0), count)
+        return piece, fraction*self.primitives[piece][6]/count
+    
+    def locate(self, index):
+        # Return the point and the unit tangent at the fractional coordinate index 'index'.
+        piece, s = self.get_parameter(index)
+        return self.evaluate(self.primitives[piece], s)
+    
+    def closest(self, location, first, last):
+        # Return the point of the path closest to 'location' between the fractional coordinate
+        # indexes 'first' and 'last' as a (distance, index, point, tangent) tuple. The closest
+        # point of each line and arc is found directly, no matter how many coordinates there
+        # are, so only the few pieces between the indexes have to be checked.
+        first_piece, first_s = self.get_parameter(first)
+        last_piece, last_s = self.get_parameter(last, True)
+        location_x, location_y = location[0], location[1]
+        best, best_piece, best_s = math.inf, None, None
+        for piece in range(first_piece, last_piece+1):
+            primitive = self.primitives[piece]
+            # A piece that is further away than the closest point so far as a
+            # whole can be skipped, this is usually the case after the first piece.
+            gap = math.sqrt(pow(location_x-primitive[7],2)+pow(location_y-primitive[8],2))-primitive[9]
+            if gap > 0 and gap*gap >= best: continue
+            low = first_s if piece == first_piece else 0
+            high = last_s if piece == last_piece else primitive[6]
+            s, squared = self.project(primitive, location, low, high)
+            if squared < best:
+                best, best_piece, best_s = squared, piece, s
+        primitive = self.primitives[best_piece]
+        point, tangent = self.evaluate(primitive, best_s)
+        count = self.offsets[best_piece+1]-self.offsets[best_piece]
+        index = self.offsets[best_piece]+best_s*count/primitive[6]
+        return math.sqrt(best), index, point, tangent
+    
+    def is_within(self, location, first, last, distance):
+        # Return True if some point of the path between the fractional coordinate indexes
+        # 'first' and 'last' is within 'distance' from 'location', check 'self.closest'.
+        first_piece, first_s = self.get_parameter(first)
+        last_piece, last_s = self.get_parameter(last, True)
+        location_x, location_y = location[0], location[1]
+        for piece in range(first_piece, last_piece+1):
+            primitive = self.primitives[piece]
+            gap = math.sqrt(pow(location_x-primitive[7],2)+pow(location_y-primitive[8],2))-primitive[9]
+            if gap > distance: continue
+            low = first_s if piece == first_piece else 0
+            high = last_s if piece == last_piece else primitive[6]
+            if self.project(primitive, location, low, high)[1] <= distance*distance: return True
+        return False
+    
     def set_line(self, attach_point, ctuple):
+        # Add a straight line to the path.
+        self.coordinates.append(self.place(attach_point, self.LINE, ctuple))
+        self.add_piece(attach_point, self.LINE, ctuple)
+    
+    def set_curve_1(self, attach_point, ctuple):
+        # Add a wide left turn to the path.
+        self.coordinates.append(self.place(attach_point, self.CURVE_1, ctuple))
+        self.add_piece(attach_point, self.CURVE_1, ctuple)
+    
+    def set_curve_2(self, attach_point, ctuple):
+        # Add a strict right turn to the path.
+        self.coordinates.append(self.place(attach_point, self.CURVE_2, ctuple))
+        self.add_piece(attach_point, self.CURVE_2, ctuple)
+        
+    def form_line(self, ctuple):
         # This method creates a straight line of coordinates.
         
-        x_0 = attach_point[0]
-        y_0 = attach_point[1]
+        x_0 = 0
+        y_0 = 0
         points = []
         reverse = False
         
@@ -355,9 +649,7 @@ class Pathh():
             y_0 += 11.0/16.0*self.size
 
         for i in range(self.count):
-            points.append([])
-            points[i].append(x_0+i*x_step)
-            points[i].append(y_0+i*y_step)
+            points.append((i*x_step, i*y_step))
         
         # In 2/4 cases reversing must be done so that the list index grows as we move along the path.
         # If we reverse the order, we must also take care that no "holes" are left in the path. A hole
@@ -365,28 +657,29 @@ class Pathh():
         # identical coordinates in the path either.
         if reverse:
             if ctuple == (1, 1):
-                points.append([])
-                points[-1].append(x_0)
-                points[-1].append(y_0+self.size)
+                points.append((0, self.size))
                 points.reverse()
                 points.pop(-1)
             elif ctuple == (-1, 1):
-                points.append([])
-                points[-1].append(x_0+self.size)
-                points[-1].append(y_0)
+                points.append((self.size, 0))
                 points.reverse()
                 points.pop(-1)
         
-        self.coordinates.append(points)
+        # The line starts from the first point and heads to the second one.
+        direction_x = (points[1][0]-points[0][0])/(self.size/self.count)
+        direction_y = (points[1][1]-points[0][1])/(self.size/self.count)
+        primitive = (points[0][0], points[0][1], direction_x, direction_y, self.size)
+        
+        return (x_0, y_0), tuple(points), primitive
     
-    def set_curve_1(self, attach_point, ctuple):
+    def form_curve_1(self, ctuple):
         # This method creates a set of coordinates resembling
         # a quarter of a big circle, a wide left turn.
         
         r = 11.0/16.0*self.size
         step = 90.0/self.count
-        x_0 = attach_point[0]
-        y_0 = attach_point[1]
+        x_0 = 0
+        y_0 = 0
         points = []
         offset = self.size
         
@@ -404,19 +697,20 @@ class Pathh():
             y_0 += offset
         
         for i in range(self.count):
-            points.append([])
-            points[i].append(x_0+r*math.cos(math.radians(angle+i*step)))
-            points[i].append(y_0-r*math.sin(math.radians(angle+i*step)))
+            points.append((r*math.cos(math.radians(angle+i*step)), -r*math.sin(math.radians(angle+i*step))))
+
+        # A quarter of a circle counter-clockwise around the base.
+        primitive = (0, 0, r, math.radians(angle), math.pi/2)
 
-        self.coordinates.append(points)
+        return (x_0, y_0), tuple(points), primitive
             
-    def set_curve_2(self, attach_point, ctuple):
+    def form_curve_2(self, ctuple):
         # Similar to the one above but the circle radius is smaller.
         # This curve resembles a strict right turn.
         r = 5.0/16.0*self.size
         step = 90.0/(self.decreased_count)
-        x_0 = attach_point[0]
-        y_0 = attach_point[1]
+        x_0 = 0
+        y_0 = 0
         points = []
         offset = self.size
         
@@ -434,29 +728,17 @@ class Pathh():
             y_0 += offset
         
         for i in range(self.decreased_count):
-            points.append([])
-            points[i].append(x_0+r*math.cos(math.radians(angle+i*step)))
-            points[i].append(y_0-r*math.sin(math.radians(angle+i*step)))
+            points.append((r*math.cos(math.radians(angle+i*step)), -r*math.sin(math.radians(angle+i*step))))
             
         # Add one more point in the far end of the curve, when adjacent path-pieces
         # are not identical, there's a chance that a "hole" will be left in the path.
         # Adding a coordinate pair at index self.count will stop this from happening.
         # Note that after reversing the order the following point will be at index 0.
         
-        points.append([])
-        
-        if ctuple == (1, 1):
-            points[-1].append(x_0)
-            points[-1].append(y_0+r)
-        elif ctuple == (-1, 1):
-            points[-1].append(x_0+r)
-            points[-1].append(y_0)
-        elif ctuple == (-1, -1):
-            points[-1].append(x_0)
-            points[-1].append(y_0-r)
-        else:
-            points[-1].append(x_0-r)
-            points[-1].append(y_0)
+        if ctuple == (1, 1): points.append((0, r))
+        elif ctuple == (-1, 1): points.append((r, 0))
+        elif ctuple == (-1, -1): points.append((0, -r))
+        else: points.append((-r, 0))
         
         # This must be done so that the list index grows as we move along the path.
         points.reverse()
@@ -465,19 +747,7 @@ class Pathh():
         # path piece would otherwise be identical.
         points.pop(-1)
         
-        self.coordinates.append(points)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        # A quarter of a circle clockwise around the base, from the far end.
+        primitive = (0, 0, r, math.radians(angle+90), -math.pi/2)
+        
+        return (x_0, y_0), tuple(points), primitive
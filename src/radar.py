@@ -1,6 +1,8 @@
 
 import math
+import numpy as np
 from constants import Constants
+from geometry import Geometry
 
 
 class Radar():
@@ -11,48 +13,57 @@ class Radar():
     vector calculations. The radar has to be constantly updated to
     have it in the correct location and keep it pointing the right way.
     The radar is a full circle around the vehicle, the radius is equal
-    to 'self.range'. Every vehicle (except the owner) in the 
-    city can be found in 'self.targets', not all of these are visible
-    though.
+    to 'self.range'. The radar gets it's targets from the KineticQueue-
+    object shared by every vehicle in the city, which only looks at a
+    pair of vehicles when they could have crossed the range since the
+    last look. 'self.owner' is the vehicle the
+    radar belongs to, it's never a target of it's own radar. The
+    ConflictTable-object of the city tells where paths intersect.
+    The vector calculations are done by a Geometry-object.
     '''
     
-    def __init__(self):
-        self.range = 1.75*Constants.BLOCK_SIZE
+    # Shared by every radar, check the Geometry-class.
+    GEOMETRY = Geometry()
+    # Every radar reaches this far.
+    RANGE = 1.75*Constants.BLOCK_SIZE
+    
+    def __init__(self, owner=None):
+        self.range = self.RANGE
+        self.owner = owner
+        self.queue = None
+        self.conflicts = None
+        self.pairs = None
+        self.geometry = self.GEOMETRY
         self.location = None
-        self.rotation = None
         self.direction = [None, None]
-        self.targets = []
         self.visible = []
     
-    def set_radar(self, radar_position, rotation):
+    def set_radar(self, radar_position, heading):
         # This is constantly called to keep the radar up to date.
         
         # Same as the vehicle position
         self.location = radar_position
         
-        # Same as the vehicle rotation
-        self.rotation = rotation
-        
-        # A pseudo velocity
-        x_component = 10*math.cos(math.radians(self.rotation))
-        y_component = 10*math.sin(math.radians(self.rotation))
-        self.direction = [x_component, y_component]
+        # A pseudo velocity in the direction of the vehicle heading
+        self.direction = [10*heading[0], 10*heading[1]]
         
         # All the relevant targets
         self.visible = []
-        for vehicle in self.targets:
-            if self.distance(self.location, vehicle.get_position()) <= self.range:
-                # 'vehicle' is inside the range.
-                self.visible.append(vehicle)
+        if self.queue is None: return
+        self.visible = self.queue.query(self.owner)
+    
+    def set_queue(self, queue):
+        # The KineticQueue-object is given by the CityCenter-
+        # object as the owner of this radar is added to the city.
+        self.queue = queue
     
-    def add_target(self, new_vehicle):
-        # Update the vehicles to the current situation, this is
-        # called every time a new vehicle is spawned on the map.
-        self.targets.append(new_vehicle)
+    def set_conflicts(self, conflicts):
+        # The ConflictTable-object is given by the CityCenter-object as well.
+        self.conflicts = conflicts
     
-    def remove_target(self, removed_vehicle):
-        # Remove the target after it has reached it's goal.
-        self.targets.remove(removed_vehicle)
+    def set_pairs(self, pairs):
+        # The PairCache-object of the city remembers the crossings of every pair of vehicles.
+        self.pairs = pairs
         
     def in_radar(self):
         # Return a list of all the vehicles inside the radar.
@@ -60,7 +71,7 @@ class Radar():
     
     def distance(self, p1, p2):
         # Return the distance between the given locations.
-        return math.sqrt(pow(p1[0]-p2[0],2)+pow(p1[1]-p2[1],2))
+        return self.geometry.distance(p1, p2)
     
     def magnitude(self, vector):
         # Get the vector magnitude.
@@ -69,7 +80,6 @@ class Radar():
     def normalize(self, vector):
         # Returns the given vector with it's magnitude scaled to one.
         magn = self.magnitude(vector)
-        direction = self.get_direction(vector)
         if magn == 0: normalized = [0, 0]
         else: normalized = [vector[0]/magn, vector[1]/magn]
         return normalized
@@ -77,52 +87,25 @@ class Radar():
     def set_vector(self, p1, p2):
         # Create a two-dimensional vector from 
         # coordinates 'p1' to coordinates 'p2'.
-        vector = []
-        vector.append(p2[0]-p1[0]) # delta x
-        vector.append(p2[1]-p1[1]) # delta y
-        return vector
+        return [p2[0]-p1[0], p2[1]-p1[1]]
     
     def get_direction(self, vector):
         # Returns the direction of the given vector between 0 and 360 degrees.
-        magn = self.magnitude(vector)
-        if magn == 0:
-            return None
-        elif vector[1] >= 0:
-            return math.degrees(math.acos(vector[0]/magn))
-        else:
-            return 360-math.degrees(math.acos(vector[0]/magn))
+        return self.geometry.direction(vector)
 
     def check_angle(self, v_original, v_new):
         # This method returns the angle between vectors 'v_original' and 'v_new'.
         # The angle is calculated starting from v_original and is given between
         # -180 and 180 degrees.
-        
-        dir1 = self.get_direction(v_original)
-        dir2 = self.get_direction(v_new)
-        if dir1==None or dir2==None: print('oh dear lord')
-        delta = dir2-dir1
-        
-        if abs(delta) <= 180: return delta
-        elif delta > 0: return delta-360
-        else: return delta+360
+        return self.geometry.signed_angle(v_original, v_new)
 
     def is_ahead(self, target_location):
         # Return True if 'target_location' is ahead of the radar location.
-        
-        v_target = self.set_vector(self.location, target_location)
-        v_target[1] = -v_target[1]       
-        angle_between = self.check_angle(self.direction, v_target)
-            
-        if abs(angle_between) <= 90: return True
-        else: return False
+        return self.geometry.is_ahead(self.location, self.direction, target_location)
     
     def is_behind(self, target_location):
         # Return True if 'target_location' is behind the radar location.
-        
-        ahead = self.is_ahead(target_location)
-        
-        if ahead: return False
-        else: return True
+        return not self.is_ahead(target_location)
     
     def get_yielding_distance(self, angle, own_length):
         # Define the distance the vehicle must stay back from
@@ -132,28 +115,8 @@ class Radar():
         # The angle between the intersecting routes and the vehicle
         # length are enough to determine a polite distance between
         # the yielding vehicle and the location of intersection.
-                                
-        base = own_length/2
-        x = Constants.BLOCK_SIZE
-        
-        if angle > 0:
-            if angle < 32: addition = 7/10*x
-            elif angle < 41.625: addition = 5/16*x
-            elif angle < 65: addition = x/3
-            elif angle < 100: addition = x/2
-            elif angle < 140: addition = 8/21*x
-            else: addition = 5/12*x
-        else:
-            angle = abs(angle)
-            if angle < 32: addition = 11/15*x
-            elif angle < 41.625: addition = 4/5*x
-            elif angle < 65: addition = 4/5*x
-            elif angle < 95: addition = 2/3*x
-            elif angle < 111: addition = 7/16*x
-            else: addition = 3/5*x
-            return base + addition
-            
-        return base + addition
+        # The distances are listed in the Geometry-class.
+        return own_length/2 + self.geometry.yielding_addition(angle)
 
     def get_blocking_distance(self, angle, own_length, target_width, ahead):
         # Define the minimum distance the vehicle must stay back
@@ -161,48 +124,7 @@ class Radar():
         # is the location where the paths overlap, the angle between
         # the paths is enough to define the minimum safe distance.
         # The bigger the vehicles, the further away they have to be.
-        
-        x = Constants.BLOCK_SIZE
-        base = own_length/2 + target_width/2
-        
-        if ahead:
-            if angle > 0:
-                if angle < 32: addition = x/1.7
-                elif angle < 41.625: addition = x/20
-                elif angle < 65: addition = x/15
-                elif angle < 95: addition = x/15
-                elif angle < 111: addition = x/5
-                elif angle < 140: addition = x/10
-                else: addition = x/5.5
-            else:
-                angle = abs(angle)
-                if angle < 32: addition = x/3
-                elif angle < 41.625: addition = x/10
-                elif angle < 65: addition = x/10
-                elif angle < 95: addition = x/15
-                elif angle < 111: addition = x/7
-                elif angle < 140: addition = x/3
-                else: addition = x/5.5
-        else: # behind
-            if angle > 0:
-                if angle < 32: addition = 0
-                elif angle < 41.625: addition = x/20
-                elif angle < 65: addition = 0
-                elif angle < 95: addition = x/5
-                elif angle < 111: addition = x/7
-                elif angle < 140: addition = x/3.5
-                else: addition = x/5.5
-            else:
-                angle = abs(angle)
-                if angle < 32: addition = x/3
-                elif angle < 41.625: addition = x/10
-                elif angle < 65: addition = x/10
-                elif angle < 95: addition = x/12
-                elif angle < 111: addition = x/7        
-                elif angle < 140: addition = x/4
-                else: addition = x/6
-            
-        return base + addition
+        return own_length/2 + target_width/2 + self.geometry.blocking_addition(angle, ahead)
     
     def get_collision_distance(self, observer, observed, angle):
         # Define the the minimum distance between vehicles
@@ -240,98 +162,52 @@ class Radar():
     def distance_to_cross(self, org_posi, location, angle, ahead):
         # Return the safe distance to location where paths intersect.
         
-        base = self.distance(org_posi, location)
-        x = Constants.BLOCK_SIZE
-        angle = abs(angle)
-        addition = 0
-        
-        if angle < 32:
-            if ahead: addition = -x/3.5
-        elif angle < 41.625:
-            if ahead: addition = -x/10
-        elif angle < 140: pass
-        else: addition = -x/2.5
-        
-        return base + addition
+        return self.distance(org_posi, location) + self.geometry.cross_addition(angle, ahead)
+     
+    def find_conflict(self, own_pieces, own_passed, own_coordinates, target_pieces, target_passed, target_coordinates):
+        # Return True as the first returnable if the paths made of 'own_pieces' and 
+        # 'target_pieces' intersect and this vehicle has to yield. The location of
+        # intersection and the angle between the routes are returned as well. The
+        # ConflictTable-object tells which pieces have to be compared. The first
+        # 'own_passed' and 'target_passed' coordinates of the pieces have been passed
+        # already and are left out of 'own_coordinates' and 'target_coordinates'.
+        return self.conflicts.find(own_pieces, own_passed, own_coordinates, \
+            target_pieces, target_passed, target_coordinates)
+    
+    def find_crossing(self, vehicle):
+        # Same as 'self.find_conflict' for the paths of the owner and 'vehicle', the
+        # answer is shared with 'vehicle' while neither of them moves on on it's path.
+        if self.pairs is None:
+            return self.find_conflict(self.owner.get_path().get_window(), self.owner.passed, \
+                self.owner.get_relevant_coordinates(), vehicle.get_path().get_window(), \
+                vehicle.passed, vehicle.get_relevant_coordinates())
+        return self.pairs.find(self.owner, vehicle)
      
-    def intersects(self, own_coordinates, target_coordinates, cross_location):
-        # Return True as the first returnable if 'own_coordinates' intersect with
-        # 'target_coordinates'. The location of intersection is also returned as well 
-        # as the angle between the routes if they exist.
+    def crossing(self, own_coordinates, target_coordinates, i, j):
+        # The coordinates at index 'i' in 'own_coordinates' and 'j' in 'target_coordinates'
+        # are the first ones closer than 'min_distance', return the (has_to_yield,
+        # cross_point, angle) triple for them. Check 'ConflictTable.find'.
         
-        def get_first_indexes():
-            # If 'cross_location' doesn't equal None, paths 'own_coordinates' and
-            # 'target_coordinates' have been found crossing before near location
-            # 'cross_location'. This information can be used to find the first indexes
-            # in 'target_coordinates' and in 'cross_location' to save time and energy.
-            # The indexes themselves are not returned, since the the relevant coordinates
-            # change while the vehicle moves, the crossing location can remain unchanged
-            # for long periods of time though.
-            
-            start_i, start_j = 0, 0
-                
-            while own_coordinates[start_i] != cross_location:
-                start_i += 1
-                if start_i == limit_i:
-                    # Doesn't work every time.
-                    start_i = 0
-                    break
-                
-            if start_i != 0:
-                own_start_location = own_coordinates[start_i]
-                while self.distance(own_start_location, \
-                    target_coordinates[start_j]) > min_distance:
-                    # When the crossing location was found last time,
-                    # the coordinates must have been within the distance
-                    # of 'identical_distance' from each other.
-                    start_j += 1
-                    if start_j == limit_j:
-                        # Doesn't work every time either.
-                        start_j = 0
-                        break
-                    
-            return start_i, start_j
-                 
-        def identical_paths(starting_from):
-            # If two consecutive coordinate pairs are within 'identical_distance'
-            # of each other, the paths are considered identical at those indexes.
-            
-            test_i, test_j = starting_from
-            idd = identical_distance
-                        
-            if self.distance(own_coordinates[test_i+2], target_coordinates[test_j+1]) <= idd: return True
-            elif self.distance(own_coordinates[test_i+3], target_coordinates[test_j+1]) <= idd: return True
-            elif self.distance(own_coordinates[test_i+1], target_coordinates[test_j+2]) <= idd: return True
-            elif self.distance(own_coordinates[test_i+2], target_coordinates[test_j+2]) <= idd: return True
-            elif self.distance(own_coordinates[test_i+3], target_coordinates[test_j+2]) <= idd: return True
-            elif self.distance(own_coordinates[test_i+1], target_coordinates[test_j+3]) <= idd: return True
-            elif self.distance(own_coordinates[test_i+2], target_coordinates[test_j+3]) <= idd: return True
-            elif self.distance(own_coordinates[test_i+3], target_coordinates[test_j+3]) <= idd: return True
-            else: return False
-                
-        min_distance = Constants.BLOCK_SIZE/10
         identical_distance = Constants.BLOCK_SIZE/100
-        start_i, limit_i = 0, len(own_coordinates)-4
-        start_j, limit_j = 0, len(target_coordinates)-4
-        
-        if cross_location: start_i, start_j = get_first_indexes()
-        
-        for i in range(start_i, limit_i-4):
-            for j in range(start_j, limit_j):
-                if self.distance(own_coordinates[i], target_coordinates[j]) < min_distance:
-                    # The routes intersect.
-                    cross_point = own_coordinates[i]
-                    if identical_paths((i, j)):
-                        # The routes intersect due to being at least partially identical.
-                        return False, cross_point, None
-                    v_current = self.set_vector(own_coordinates[i], own_coordinates[i+1])
-                    v_nearby = self.set_vector(target_coordinates[j], target_coordinates[j+1])
-                    angle_between = self.check_angle(v_current, v_nearby)
-                    if angle_between < 0 or abs(angle_between) > 150:
-                        # The nearby vehicle is approaching from the right.
-                        return True, cross_point, angle_between
-                    # The nearby vehicle is approaching from the left.
-                    return False, cross_point, angle_between
-        # This vehicle doesn't have an intersecting route with the observed one.
-        return False, None, None 
+        own = np.asarray(own_coordinates, dtype=float)
+        target = np.asarray(target_coordinates, dtype=float)
+        cross_point = (float(own[i][0]), float(own[i][1]))
+        
+        # If two consecutive coordinate pairs are within 'identical_distance'
+        # of each other, the paths are considered identical at those indexes.
+        delta = own[i+1:i+4,None,:]-target[None,j+1:j+4,:]
+        identical = (delta[:,:,0]**2+delta[:,:,1]**2 <= identical_distance**2)
+        identical[0,0] = False
+        if identical.any():
+            # The routes intersect due to being at least partially identical.
+            return False, cross_point, None
+        
+        v_current = self.set_vector(own_coordinates[i], own_coordinates[i+1])
+        v_nearby = self.set_vector(target_coordinates[j], target_coordinates[j+1])
+        angle_between = self.check_angle(v_current, v_nearby)
+        if angle_between < 0 or abs(angle_between) > 150:
+            # The nearby vehicle is approaching from the right.
+            return True, cross_point, angle_between
+        # The nearby vehicle is approaching from the left.
+        return False, cross_point, angle_between
 
@@ -0,0 +1,48 @@
+
+
+from collections import OrderedDict
+
+
+class RouteCache():
+
+    '''
+    This class remembers the routes the CityCenter-object has already
+    generated. A map only has a few dozen entry and exit points, therefore
+    the same routes are asked for over and over again as vehicles keep on
+    spawning. The key is an (entry index, exit index) tuple, the indexes
+    refer to 'CityCenter.entry_points' and 'CityCenter.exit_points'. The
+    vehicle type is not part of the key since the coordinates of a path do
+    not depend on it, only 'Pathh.radius' does. The value is None if there
+    is no route between the two points, otherwise it is the tuple returned
+    by 'Pathh.get_route'. The coordinates of a route are a read-only array,
+    so the same route can be shared by any number of Pathh-objects that all
+    keep their own progress. When 'self.capacity' routes are stored, the one
+    that was used the longest time ago is forgotten.
+    '''
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.routes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key): return key in self.routes
+
+    def __len__(self): return len(self.routes)
+
+    def get(self, key):
+        # Return the route stored for 'key', check '__contains__' first.
+        self.routes.move_to_end(key)
+        self.hits += 1
+        return self.routes[key]
+
+    def put(self, key, route):
+        # Store 'route' for 'key' and forget the least recently used route if needed.
+        self.misses += 1
+        self.routes[key] = route
+        self.routes.move_to_end(key)
+        if len(self.routes) > self.capacity:
+            self.routes.popitem(last=False)
+
+    def clear(self):
+        self.routes = OrderedDict()
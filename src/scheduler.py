@@ -0,0 +1,70 @@
+from constants import Constants
+
+
+class Scheduler():
+
+    '''
+    This class decides on which cycles each vehicle does it's heavy work,
+    looking up the crossings with every visible vehicle (check
+    'Vehicle.set_intersections'). The work is done once each 'period'
+    milliseconds, so there are period/TIME_STEP buckets that take turns, one
+    bucket each cycle. 'self.buckets' lists the vehicles of each bucket and
+    'self.current' is the bucket whose turn it is. A vehicle is added to the
+    bucket with the fewest vehicles, the buckets therefore never differ by
+    more than one vehicle and no cycle has to do more than 'self.get_budget'
+    heavy evaluations, no matter how many vehicles spawn at once. If removing
+    a vehicle leaves the buckets uneven, a vehicle is moved from the fullest
+    bucket to the emptiest one. The CityCenter-object owns the scheduler.
+    '''
+
+    def __init__(self, period=200):
+        self.size = int(period/Constants.TIME_STEP)
+        self.buckets = [[] for i in range(self.size)]
+        self.current = 0
+        self.count = 0
+
+    def get_budget(self):
+        # The maximum amount of heavy evaluations on one cycle.
+        return -(-self.count//self.size)
+
+    def get_load(self):
+        # The amount of heavy evaluations on this cycle.
+        return len(self.buckets[self.current])
+
+    def next(self):
+        # Called once at the start of each cycle.
+        self.current = (self.current+1)%self.size
+
+    def is_due(self, vehicle):
+        # Return True if it's 'vehicle's turn on this cycle.
+        return vehicle.bucket == self.current
+
+    def add(self, vehicle):
+        # Put 'vehicle' in the emptiest bucket. A vehicle does the heavy work right
+        # as it spawns, so of equally empty buckets the one with the furthest turn
+        # is chosen. The turn of 'self.current'+1 comes on the very next cycle and
+        # the turn of 'self.current' itself is the furthest, it has just been.
+        best = None
+        for k in range(self.size, 0, -1):
+            bucket = (self.current+k)%self.size
+            if best is None or len(self.buckets[bucket]) < len(self.buckets[best]):
+                best = bucket
+        self.place(vehicle, best)
+        self.count += 1
+        vehicle.scheduler = self
+
+    def place(self, vehicle, bucket):
+        self.buckets[bucket].append(vehicle)
+        vehicle.bucket = bucket
+
+    def remove(self, vehicle):
+        self.buckets[vehicle.bucket].remove(vehicle)
+        self.count -= 1
+        fullest = max(range(self.size), key=lambda k: len(self.buckets[k]))
+        emptiest = min(range(self.size), key=lambda k: len(self.buckets[k]))
+        if len(self.buckets[fullest])-len(self.buckets[emptiest]) > 1:
+            self.place(self.buckets[fullest].pop(), emptiest)
+
+    def clear(self):
+        self.buckets = [[] for i in range(self.size)]
+        self.count = 0
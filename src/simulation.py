@@ -0,0 +1,240 @@
+
+
+import sys
+import math
+import random
+import time
+from random import randint
+from city_center import CityCenter
+from vehicle import Vehicle
+from constants import Constants
+
+
+class Simulation():
+
+    '''
+    This class is the headless engine of the traffic simulation. It owns
+    the CityCenter-object, decides when new vehicles are spawned and keeps
+    track of the simulated time. Nothing in here depends on PyQt, the GUI is
+    merely one consumer of the engine: it calls 'self.step' once every time
+    its QTimer fires and draws whatever was spawned or expired. Other consumers
+    can call 'self.step' or 'self.run_until' to run thousands of cycles back to
+    back at full speed, for example when measuring performance. The simulated
+    clock 'self.time' grows by 'Constants.TIME_STEP' milliseconds each cycle,
+    regardless of how long the cycle took in real life. Passing 'seed' makes
+    the layout and the traffic reproducible.
+    '''
+
+    def __init__(self, dimensions, seed=None):
+        if seed is not None:
+            random.seed(seed)
+        # The city layout, the vehicles and the traffic rules.
+        self.city = CityCenter(dimensions)
+        # Simulated milliseconds since the start.
+        self.time = 0
+        # Calm traffic by default.
+        self.rush_hour = 0
+        # The preferred amount of vehicles on the map.
+        self.set_default_counts()
+
+    def get_city(self): return self.city
+
+    def get_time(self): return self.time
+
+    def get_count(self): return self.count
+
+    def set_count(self, count):
+        # Set the preferred amount of vehicles, decreasing this
+        # will not lead to any vehicle suddenly disappearing.
+        self.count = count
+
+    def is_rush_hour(self): return self.rush_hour
+
+    def set_default_counts(self):
+        # Set the default amount of vehicles on the map
+        # for casual and rush hour traffic simulation.
+
+        casual_max = self.city.get_maximum(0)
+        rush_max = self.city.get_maximum(1)
+        difference = rush_max-casual_max
+
+        self.default_rush_count = casual_max
+        self.default_casual_count = casual_max-difference
+        self.count = self.default_casual_count
+
+    def change_mode(self):
+        # Switch between rush hour and calm traffic, every vehicle
+        # already on the map will switch its mode as well.
+
+        self.rush_hour = 1 - self.rush_hour
+
+        if self.rush_hour: self.count = self.default_rush_count
+        else: self.count = self.default_casual_count
+
+        for vehicle in self.city.get_vehicles():
+            if self.rush_hour and not vehicle.is_rushing():
+                vehicle.change_mode()
+            elif not self.rush_hour and vehicle.is_rushing():
+                vehicle.change_mode()
+
+    def step(self, n=1):
+        # Run 'n' cycles of the simulation back to back. Returns two lists, the
+        # vehicles that were spawned and the vehicles that reached their goal
+        # during these cycles. A vehicle that did both is left out of both.
+
+        spawned = []
+        expired = []
+
+        for i in range(n):
+            if len(self.city.get_vehicles()) < self.count:
+                spawned += self.spawn_vehicles()
+            expired += self.city.update()
+            self.time += Constants.TIME_STEP
+
+        if n > 1 and len(spawned) and len(expired):
+            # These never existed as far as the consumer is concerned.
+            both = set(spawned) & set(expired)
+            spawned = [vehicle for vehicle in spawned if not vehicle in both]
+            expired = [vehicle for vehicle in expired if not vehicle in both]
+
+        return spawned, expired
+
+    def run_until(self, sim_time):
+        # Keep stepping until the simulated clock reaches 'sim_time' milliseconds.
+        n = math.ceil((sim_time-self.time)/Constants.TIME_STEP)
+        if n <= 0: return [], []
+        return self.step(n)
+
+    def remove_vehicles(self, removed):
+        # Take vehicles off the map before they reach their goal.
+        self.city.remove_vehicles(removed)
+
+    def reset(self):
+        # Start over with the same layout.
+        self.city.reset()
+        self.time = 0
+        self.rush_hour = 0
+        self.count = self.default_casual_count
+
+    def spawn_vehicles(self):
+        # Add vehicles to the simulation until the amount of vehicles is close
+        # enough to 'self.count'. Returns a list of the vehicles added this cycle.
+
+        spawned = []
+
+        def another_one():
+            # Add one vehicle to the simulation.
+
+            if self.city.is_overheated():
+                # There is no spot to place
+                # the vehicle at the moment.
+                return
+
+            if self.city.is_at_full_capacity(self.rush_hour):
+                # The map is at the maximum capacity,
+                # can not place another vehicle.
+                return
+
+            # Choose the vehicle type randomly, but with bigger chance
+            # of getting a sedan than a mini van and a bigger chance
+            # of getting a mini van than a pickup truck.
+            result = randint(1, 10)
+
+            if result <= 2:
+                # 20 percent chance
+                vehicle_type = Constants.PICKUP_TRUCK
+            elif result <= 5:
+                # 30 percent chance
+                vehicle_type = Constants.MINI_VAN
+            else:
+                # 50 percent chance
+                vehicle_type = Constants.SEDAN
+
+            # All colors are equally likely.
+            colors = ['Green','Blue','Yellow','Turquoise','Violet','Gray','Black','Orange','White']
+            color = colors[randint(0, len(colors)-1)]
+
+            # Doesn't have a path yet, therefore doesn't
+            # have a position, a velocity or a rotation either.
+            vehicle = Vehicle(vehicle_type, color)
+
+            # Determine where the vehicle is spawned
+            # and what kind of a path it will get.
+            self.city.add_vehicle(vehicle)
+
+            if self.rush_hour:
+                # Casual mode by default
+                vehicle.change_mode()
+
+            spawned.append(vehicle)
+
+        current_amount = len(self.city.get_vehicles())
+        desired_amount = self.count
+        difference = desired_amount-current_amount
+
+        if difference >= 3:
+            # Don't let the vehicle count drop
+            # more than 2 from the desired amount.
+            while difference > 2:
+                another_one()
+                difference -= 1
+        elif difference == 2:
+            # A vehicle won't be spawned immediately with a 100% chance, but
+            # with the offset of 2 vehicles, another one will be shortly spawned.
+            if self.rush_hour: another_one()
+            elif randint(1, 250) == 250: another_one()
+        else:
+            # Same as the one above, but a new vehicle won't appear as fast.
+            if self.rush_hour:
+                if randint(1, 250) == 250: another_one()
+            elif randint(1, 300) == 300: another_one()
+
+        return spawned
+
+
+if __name__ == '__main__':
+    # Run the simulation without a display and report how fast it
+    # went, e.g. 'python simulation.py 9 10000 1' runs 10000 cycles
+    # on a 9x9 map with seed 1. Adding 'rush' to the end runs the
+    # cycles in rush hour-mode and adding 'profile' runs them under
+    # cProfile and lists the most often called functions. The cycles
+    # are timed one by one, the slowest ones tell how even the work is.
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    profile = 'profile' in sys.argv[4:]
+
+    simulation = Simulation(size, seed)
+    if 'rush' in sys.argv[4:]: simulation.change_mode()
+    if profile:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+    expired = []
+    durations = []
+    # The heavy evaluations done on each cycle, check the Scheduler-class.
+    loads = []
+    scheduler = simulation.get_city().scheduler
+    start = time.perf_counter()
+    for i in range(ticks):
+        cycle_start = time.perf_counter()
+        expired += simulation.step()[1]
+        durations.append(time.perf_counter()-cycle_start)
+        loads.append(scheduler.get_load())
+    elapsed = time.perf_counter()-start
+    if profile:
+        profiler.disable()
+    durations.sort()
+
+    print(str(size)+'x'+str(size)+', '+str(ticks)+' cycles, '+str(simulation.get_time()/1000)+' simulated seconds')
+    print('wall clock '+str(round(elapsed, 3))+' s, '+str(round(ticks/elapsed))+' cycles per second')
+    print('cycle time p99 '+str(round(1000*durations[int(0.99*(ticks-1))], 3))+' ms, max '+str(round(1000*durations[-1], 3))+' ms')
+    print(str(len(expired))+' vehicles reached their goal')
+    print('heavy evaluations per cycle '+str(round(sum(loads)/ticks, 2))+' on average, max '+str(max(loads)))
+    routes = simulation.get_city().routes
+    print('routes generated '+str(routes.misses)+', reused '+str(routes.hits))
+    queue = simulation.get_city().queue
+    print('radar range checks per cycle '+str(round(queue.checks/ticks, 2))+', '+str(len(queue.pairs))+' pairs on the queue')
+    if profile:
+        pstats.Stats(profiler).sort_stats('ncalls').print_stats(15)
@@ -0,0 +1,113 @@
+import math
+from constants import Constants
+
+
+class SpatialGrid():
+
+    '''
+    This class is a uniform grid that keeps track of which vehicles are
+    located in which part of the map. The map is divided into square cells
+    that are 'self.cell_size' wide, by default one cell equals one city block.
+    'self.cells' is a dictionary where the key is a (column, row) tuple and the
+    value is a list of the vehicles currently in that cell. The KineticQueue-
+    object of the city owns one grid, check 'KineticQueue.locate'. A vehicle
+    is moved to another cell only once it has gone 'self.margin' past the
+    edges of it's current one, the grid tells which vehicles it has just
+    become a neighbour of. Vehicles keep moving between the moves, therefore
+    every query covers 'self.margin' worth of extra distance in each direction.
+    '''
+
+    def __init__(self, cell_size=Constants.BLOCK_SIZE, margin=Constants.BLOCK_SIZE/10):
+        self.cell_size = cell_size
+        # A vehicle is never further than this outside of it's cell.
+        self.margin = margin
+        self.cells = dict()
+        # The cell each vehicle was last placed in.
+        self.located = dict()
+
+    def get_cell(self, location):
+        # Return the key of the cell 'location' is in.
+        return int(location[0]//self.cell_size), int(location[1]//self.cell_size)
+
+    def get_slack(self, vehicle):
+        # Return how far 'vehicle' can go before it's 'self.margin' past the
+        # edges of the cell it's in, e.g. before it has to be moved.
+        size, margin = self.cell_size, self.margin
+        cell, location = self.located[vehicle], vehicle.get_position()
+        x, y = location[0]-cell[0]*size, location[1]-cell[1]*size
+        return min(x, size-x, y, size-y)+margin
+
+    def insert(self, vehicle):
+        # Place 'vehicle' in the cell matching it's current position.
+        cell = self.get_cell(vehicle.get_position())
+        if cell in self.cells: self.cells[cell].append(vehicle)
+        else: self.cells[cell] = [vehicle]
+        self.located[vehicle] = cell
+
+    def remove(self, vehicle):
+        # Take 'vehicle' off the grid, this is called
+        # when the vehicle is removed from the city.
+        cell = self.located.pop(vehicle, None)
+        if cell is None: return
+        occupants = self.cells[cell]
+        occupants.remove(vehicle)
+        if not len(occupants): del self.cells[cell]
+
+    def move(self, vehicle):
+        # Place 'vehicle' in the cell matching it's current position. Return
+        # the vehicles in the cells around the new cell that weren't around
+        # the old one, e.g. the vehicles it has just become a neighbour of.
+        old = self.located[vehicle]
+        cell = self.get_cell(vehicle.get_position())
+        if cell == old: return []
+        self.remove(vehicle)
+        self.insert(vehicle)
+        found = []
+        for i in range(cell[0]-1, cell[0]+2):
+            for j in range(cell[1]-1, cell[1]+2):
+                if abs(i-old[0]) <= 1 and abs(j-old[1]) <= 1: continue
+                occupants = self.cells.get((i, j))
+                if occupants: found += occupants
+        return found
+
+    def neighbours(self, vehicle):
+        # Return every other vehicle in the cell of 'vehicle' or the eight cells around it.
+        cell = self.located[vehicle]
+        found = []
+        for i in range(cell[0]-1, cell[0]+2):
+            for j in range(cell[1]-1, cell[1]+2):
+                occupants = self.cells.get((i, j))
+                if occupants: found += occupants
+        found.remove(vehicle)
+        return found
+
+    def are_neighbours(self, v1, v2):
+        # Return True if 'v1' and 'v2' are in the same or neighbouring cells.
+        cell1, cell2 = self.located[v1], self.located[v2]
+        return abs(cell1[0]-cell2[0]) <= 1 and abs(cell1[1]-cell2[1]) <= 1
+
+    def query(self, location, radius):
+        # Return every vehicle that may be within 'radius' from 'location'. The
+        # exact distance is left for the caller to check. The vehicles are listed
+        # in the order they were added to the city, e.g. by their identifiers.
+
+        reach = radius+self.margin
+        size = self.cell_size
+        x_min = int(math.floor((location[0]-reach)/size))
+        x_max = int(math.floor((location[0]+reach)/size))
+        y_min = int(math.floor((location[1]-reach)/size))
+        y_max = int(math.floor((location[1]+reach)/size))
+
+        found = []
+        cells = self.cells
+        for i in range(x_min, x_max+1):
+            for j in range(y_min, y_max+1):
+                occupants = cells.get((i, j))
+                if occupants: found += occupants
+
+        found.sort(key=lambda vehicle: vehicle.get_id())
+        return found
+
+    def clear(self):
+        self.cells = dict()
+        self.located = dict()
@@ -0,0 +1,38 @@
+
+
+class UnionFind():
+
+    '''
+    This class keeps track of elements 0, 1, 2 ... 'size'-1 that are
+    divided into disjoint sets. Initially every element is a set of its
+    own, 'self.union' merges two sets and 'self.find' returns the root
+    element of the set an element belongs to. Two elements are in the same
+    set if they have the same root. 'self.parent' tells the parent of each
+    element, a root is its own parent. The smaller set is always attached
+    under the larger one and the paths are halved on the way to the root,
+    so both operations take practically constant time. The CityCenter-object
+    uses this to group road blocks into chains, check 'CityCenter.find_dead_loops'.
+    '''
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1]*size
+
+    def find(self, element):
+        parent = self.parent
+        while parent[element] != element:
+            # Skip every other element on the way up.
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, a, b):
+        # Merge the sets of 'a' and 'b', returns the new root.
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b: return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
@@ -25,16 +25,54 @@ class Vehicle():
     targets for the vehicle, check 'self.update' for further information.
     '''
     
+    # Unit vectors for the spawn rotations given by the path.
+    SPAWN_HEADINGS = {0: (1.0, 0.0), 90: (0.0, 1.0), 180: (-1.0, 0.0), 270: (0.0, -1.0)}
+    # Degrees to radians
+    RADIANS = math.pi/180
+    # The distance moved in one cycle at the speed of 1.0, check 'self.scale'.
+    STEP = Constants.BLOCK_SIZE*0.01*Constants.TIME_STEP/100
+    
+    # The parameters of every vehicle type, the type is the index:
+    # SEDAN, MINI_VAN and PICKUP_TRUCK. Check 'self.set_parameters'.
+    MASS = (1000, 1500, 2000)
+    WIDTH = (1.05*Constants.VEHICLE_SIZE, 1.1*Constants.VEHICLE_SIZE, 1.15*Constants.VEHICLE_SIZE)
+    LENGTH = (WIDTH[0]*1.85, WIDTH[1]*1.85, WIDTH[2]*2.1)
+    MAX_SPEED = (50, 42, 30)
+    MIN_RADIUS = (0.40, 0.43, 0.50)
+    # Off road-, turning- and cruising speeds in casual mode and in rush hour-mode.
+    DEFAULT_SPEEDS = (((4.4, 5.5, 6.0), (4.6, 5.8, 6.4)),
+                      ((3.7, 4.0, 5.5), (3.9, 4.3, 5.9)),
+                      ((3.5, 3.5, 4.5), (3.7, 3.8, 4.9)))
+    
     def __init__(self, vehicle_type, color='White'):
         # Not all relevant attributes are initialized
         # here, check 'self.spawn' for further information.
         self.type = vehicle_type
+        # Given by the CityCenter-object, grows in the order of spawning.
+        self.id = None
+        # The index of the closest passed path coordinate, the
+        # lanes are told about every change, check 'self.update_path_progress'.
+        self.path_index = 0
         self.position = [None, None]
-        self.velocity = [None, None]
+        # The velocity is kept as a scalar speed and a unit vector pointing to
+        # the direction of travel. The heading is turned with small rotation
+        # matrices, check 'self.rotate'. The rotation in degrees is only worked
+        # out when asked for, check 'self.get_rotation'.
+        self.speed = None
+        self.heading = None
         self.rotation = None
+        # 'self.cycle' counts the calls of 'self.drive', the
+        # on path and on course checks are only done once per cycle.
+        self.cycle = 0
+        self.on_path_cycle, self.on_path_value = None, None
+        self.on_course_cycle, self.on_course_value = None, None
+        # The point of the relevant coordinates closest to the vehicle as a
+        # (distance, index, point, tangent) tuple, found once per cycle.
+        # Check 'self.update_path_progress' and 'Pathh.closest'.
+        self.nearest = None
         self.color = color
         self.path = Pathh(self.type)
-        self.radar = Radar()
+        self.radar = Radar(self)
         # These attributes define the vehicle status,
         # check 'self.update_blocking', 'self.set_limit'
         # and 'self.update_yielding' for further information.
@@ -51,9 +89,18 @@ class Vehicle():
         self.set_parameters()
         # These will list other vehicles.
         self.blocking, self.to_ignore = [], []
-        # The next two are for calling 'heavy' 
-        # functions periodically, but not each cycle.
-        self.counter, self.pause = 0, 200 # 200 milliseconds
+        # The counter is for calling 'heavy' functions periodically, but not
+        # each cycle. The Scheduler-object of the city tells when it's this
+        # vehicle's turn, it also gives 'self.bucket'.
+        self.counter = 0
+        self.scheduler, self.bucket = None, None
+        # The Lanes-object of the city, given by the CityCenter-object.
+        self.lanes = None
+        # A stopped vehicle whose situation doesn't change falls asleep and
+        # isn't driven until woken up, check 'self.sleep'. 'self.sleepers'
+        # are the sleeping vehicles that wake up as this vehicle changes.
+        self.asleep = False
+        self.sleepers = set()
         # True when the goal has been reached.
         self.done = False
             
@@ -62,10 +109,9 @@ class Vehicle():
         # information for this is found in 'self.path.spawn'.
         
         (x, y, initial_rotation) = self.get_path().get_spawn()
-        v_x = 0.02*math.cos(math.radians(initial_rotation))
-        v_y = 0.02*math.sin(math.radians(initial_rotation))
         self.position = [x, y]
-        self.velocity = [v_x, v_y]
+        self.set_speed(0.02)
+        self.set_heading(self.SPAWN_HEADINGS[initial_rotation])
         self.rotation = initial_rotation
         
         # This refers to trying to get through a traffic jam.
@@ -85,6 +131,10 @@ class Vehicle():
         # vehicle like the drive method does the drive method.
         self.update()
             
+    def get_id(self):
+        # Vehicles added to the city earlier have smaller identifiers.
+        return self.id
+            
     def get_position(self):
         # The initial position and velocity are not determined upon constructing,
         # but when the spawn-point is set in the Pathhh-object (self.path.set_spawn()).
@@ -93,12 +143,33 @@ class Vehicle():
 
     def get_speed(self):
         # Return the velocity magnitude.
-        return math.sqrt(math.pow(self.velocity[0],2)+math.pow(self.velocity[1],2))
+        return self.speed
+
+    def set_speed(self, speed):
+        self.speed = speed
+
+    def set_heading(self, heading):
+        # 'heading' is a unit vector, the rotation is worked out again when needed.
+        self.heading = heading
+        self.rotation = None
+
+    def get_velocity(self):
+        # Return the velocity vector, the y-axis points up.
+        return [self.speed*self.heading[0], self.speed*self.heading[1]]
+
+    def get_heading(self):
+        # Return the unit vector pointing to the direction the vehicle is traveling.
+        # If the vehicle is not moving, the direction it was traveling before stopping
+        # is given. This is never worked out from the velocity, check 'self.rotate'.
+        return self.heading
 
     def get_rotation(self):
-        # Get the velocity direction in degrees counting from the positive
-        # x-axis counter clockwise. If the velocity equals zero, the direction
-        # the vehicle was traveling before stopping is given.
+        # Get the heading in degrees counting from the positive x-axis
+        # counter clockwise. This is only needed for drawing the vehicle and
+        # for the radar, so it is worked out once after each change of the heading.
+        if self.rotation is None:
+            self.rotation = math.degrees(math.atan2(self.heading[1], self.heading[0]))
+            if self.heading[1] < 0: self.rotation += 360
         return self.rotation
 
     def get_path(self):
@@ -114,7 +185,8 @@ class Vehicle():
     def get_relevant_coordinates(self):
         # Return the coordinates that are considered relevant, typically these are
         # the coordinates of the closest four path pieces. Coordinates that have
-        # been passed already are not taken to account.
+        # been passed already are not taken to account. This is a view of the
+        # path's coordinate array, check 'self.proximity'.
         return self.relevant
     
     def get_scene_rotation(self):
@@ -122,7 +194,7 @@ class Vehicle():
         # positive x-axis and grows clock wise. In this class,
         # the angle grows counter-clockwise and the origin is in 
         # the bottom-left corner unlike in the graphics scene.
-        return 450 - self.rotation
+        return 450 - self.get_rotation()
     
     def is_blocked(self):
         # Return True if this vehicle is physically blocked.
@@ -148,6 +220,7 @@ class Vehicle():
         self.rushing = 1 - self.rushing
         self.set_default_speeds()
         self.set_default_forces()
+        self.wake()
         
     def finish(self):
         # This method is called when this vehicle reaches it's goal.
@@ -163,12 +236,17 @@ class Vehicle():
         # CityCenter-object. After this vehicle has been spawned, it's
         # ready to drive. Most of the work is done in 'self.update', but
         # this method decides how the velocity is affected by that outcome.
+        # Every vehicle has already been moved for this cycle, check
+        # 'self.run'. The position doesn't change again during this cycle,
+        # so whether the vehicle is on path or on course stays the same.
+        
+        self.asleep = False
+        state = self.get_state()
+        due = self.is_due()
         
         # Update everything that needs to be updated.
         self.update()
-        
-        # Keep the vehicle moving.
-        self.run()
+        self.cycle += 1
         
         offroad, turn, cruise = self.default_speeds
                          
@@ -200,15 +278,61 @@ class Vehicle():
         else:
             # No correction needs to be done, drive "freely".
             self.achieve_speed(cruise)
+        
+        if self.get_state() != state:
+            # The vehicles watching this one have to look again.
+            self.wake_sleepers()
+        elif not due and not self.get_speed() and (self.yields or self.blocked):
+            self.sleep()
+    
+    def get_state(self):
+        # Everything this vehicle's next cycle depends on, besides the surrounding
+        # vehicles and the lists 'self.set_intersections' keeps. The position
+        # isn't here, it changes in 'self.run', which wakes the sleepers itself.
+        return (self.speed, self.heading, self.get_path().get_progress(), self.tried_already, \
+            self.yields, self.blocked, self.slows, self.commited, self.limit, \
+            tuple(self.blocking), self.to_follow[0])
+    
+    def is_due(self):
+        # Return True if 'self.set_intersections' is done on this cycle.
+        return not self.counter or self.scheduler.is_due(self)
+    
+    def is_asleep(self):
+        return self.asleep
+    
+    def sleep(self):
+        # Stop driving this vehicle. It has stopped and the cycle that
+        # just ended left it exactly as it was, so driving it again gives
+        # the same outcome until one of the vehicles it looks at changes.
+        # The vehicles it looks at will wake it up, and so does it's own
+        # turn to look for intersections, check 'CityCenter.update'.
+        self.asleep = True
+        watched = list(self.get_radar().in_radar())
+        watched += self.intersections.keys()
+        watched += self.yield_coords.keys()
+        if self.to_follow[0]: watched.append(self.to_follow[0])
+        for vehicle in watched:
+            if not vehicle.is_done(): vehicle.sleepers.add(self)
+    
+    def wake(self):
+        # Drive this vehicle again from the next call on.
+        self.asleep = False
+    
+    def wake_sleepers(self):
+        # This vehicle has changed, the vehicles watching it have to look again.
+        if not self.sleepers: return
+        for vehicle in self.sleepers: vehicle.wake()
+        self.sleepers = set()
+    
+    def doze(self):
+        # Called instead of 'self.drive' while asleep, only the counters go on.
+        self.counter += int(Constants.TIME_STEP)
+        self.cycle += 1
     
     def update(self):
-
-        # 'self.rotation' is set for each cycle 
-        # and then used in numerous methods.
-        self.update_rotation()
         
         # Let the radar know where the vehicle is going.
-        self.get_radar().set_radar(self.get_position(), self.get_rotation())
+        self.get_radar().set_radar(self.get_position(), self.get_heading())
         
         # Check if the vehicle has moved enough to consider
         # another set of coordinates the most relevant.
@@ -254,35 +378,32 @@ class Vehicle():
     def run(self):
         # Keep the vehicle running, if this is suddenly not called it will
         # appear as if the vehicle gets stopped by an inhumanely large force.
-        self.position[0] += Constants.BLOCK_SIZE*self.scale(self.velocity[0])/100
-        self.position[1] -= Constants.BLOCK_SIZE*self.scale(self.velocity[1])/100
-    
-    def update_rotation(self):
-        # This is done to remember the vehicle direction. When the speed equals
-        # zero, it is impossible to calculate the direction using the velocity vector.
-        if self.get_speed() <= 0.01:
-            return
-        if self.velocity[1] >= 0:
-            self.rotation = math.degrees(math.acos(self.velocity[0]/self.get_speed()))
-        else:
-            self.rotation = 360-math.degrees(math.acos(self.velocity[0]/self.get_speed()))
+        # The CityCenter-object calls this for every vehicle before they drive.
+        # Every vehicle moves before any of them drives, so the sleeping vehicles
+        # watching this one are woken up in time to see the new position.
+        if self.done or not self.speed: return
+        step = self.speed*self.STEP
+        self.position[0] += step*self.heading[0]
+        self.position[1] -= step*self.heading[1]
+        self.wake_sleepers()
+    
+    def rotate(self, angle):
+        # Turn the heading counter clockwise by 'angle' radians. The rotation
+        # in each cycle is small, so the sine and cosine are replaced by the
+        # first terms of their series. The result is then scaled back to unit
+        # length with one Newton step, the length is never far from one.
+        angle_2 = angle*angle
+        c = 1 - angle_2/2 + angle_2*angle_2/24
+        s = angle*(1 - angle_2/6 + angle_2*angle_2/120)
+        h_x, h_y = self.heading
+        h_x, h_y = c*h_x - s*h_y, s*h_x + c*h_y
+        n = (3 - h_x*h_x - h_y*h_y)/2
+        self.set_heading((n*h_x, n*h_y))
                
     def proximity(self):
         # Return the coordinates of the four closest path pieces determined by 'self.path.progress'.
         # If we are close enough to reaching the goal, return as many coordinates as possible.
-        
-        all_coordinates = self.get_path().get_coordinates()
-        index, sub_index = self.get_path().get_progress()
-        up_limit = self.get_path().limit
-        
-        if index+3 <= up_limit:
-            return all_coordinates[index]+all_coordinates[index+1]+\
-                all_coordinates[index+2]+all_coordinates[index+3]
-        elif index+2 <= up_limit:
-            return all_coordinates[index]+all_coordinates[index+1]+\
-                all_coordinates[index+2]
-        else:
-            return all_coordinates[index]+all_coordinates[index+1]
+        return self.get_path().get_window_coordinates()
     
     def update_path_progress(self):
         # This method decides when it's okay to increase the path progress (self.path.progress).
@@ -292,51 +413,48 @@ class Vehicle():
         posi = self.get_position()
         own_radar = self.get_radar()
         own_path = self.get_path()
-        all_coordinates = own_path.get_coordinates()
         index, sub_index = own_path.get_progress()
         up_limit = own_path.limit
-        nearby_coordinates = self.proximity()
+        coordinates = own_path.get_coordinates()
+        first, last = own_path.get_window_range()
          
         if index+1 == up_limit:
             # The vehicle is starting to be very close to the end, so this is a good time to
             # start observing whether it is within 'r' distance from the goal point. When the goal 
             # point is within the distance, the CityCenter-object will stop calling the drive() method.
+            # The path progress must not grow anymore ('sub_progress' can though).
             
             r = Constants.BLOCK_SIZE/2
             if own_radar.distance(posi, own_path.goal) <= r:
                 # The simulation will end for this vehicle.
                 self.finish()
-
-            close = own_radar.distance(posi, nearby_coordinates[sub_index])
-            next = own_radar.distance(posi, nearby_coordinates[sub_index+1])
+        else:
+            behind = own_radar.distance(posi, coordinates[first])
+            ahead = own_radar.distance(posi, coordinates[last-1])
             
-            while next < close:
-                own_path.update()
-                sub_index = own_path.get_progress()[-1]
-                close = own_radar.distance(posi, nearby_coordinates[sub_index])
-                next = own_radar.distance(posi, nearby_coordinates[sub_index+1])
-                
-            # The path progress must not grow anymore ('sub_progress' can though).
-            return
-        
-        past_location = nearby_coordinates[0]
-        future_location = nearby_coordinates[-1]
-        behind = own_radar.distance(posi, past_location)
-        ahead = own_radar.distance(posi, future_location)
-        
-        if ahead < behind:
-            own_path.update(next_piece=True)
-            nearby_coordinates = self.proximity()
-        
-        close = own_radar.distance(posi, nearby_coordinates[sub_index])
-        next = own_radar.distance(posi, nearby_coordinates[sub_index+1])
-        
-        while next < close:
-            # Loop until we have the index of the closest coordinates.
+            if ahead < behind:
+                own_path.update(next_piece=True)
+                first, last = own_path.get_window_range()
+                sub_index = 0
+        
+        # Move on to the coordinates closest to the vehicle. The closest point of
+        # the path is found directly, only the coordinates ahead of it are left.
+        # The point stays within the relevant coordinates as the vehicle moves on,
+        # it's kept for the rest of the cycle, check 'self.seek' for example.
+        self.nearest = own_path.closest(posi, first+self.get_passed(sub_index), last)
+        target = min(int(self.nearest[1]-first+0.5), last-first-2)
+        while sub_index < target:
             own_path.update()
-            sub_index = own_path.get_progress()[-1]
-            close = own_radar.distance(posi, nearby_coordinates[sub_index])
-            next = own_radar.distance(posi, nearby_coordinates[sub_index+1])
+            sub_index += 1
+        index = first+sub_index
+        if index != self.path_index or self.lanes.get_lane(self) is None:
+            self.path_index = index
+            self.lanes.move(self, index)
+    
+    def get_passed(self, sub_index):
+        # Return how many coordinates of the relevant pieces are left out, e.g.
+        # all the coordinates that are further than self.path.count/2 dots behind.
+        return max(0, sub_index-int(self.get_path().count/2)+1)
     
     def set_relevant_coordinates(self):
         # Define the relevant coordinates for the vehicle.
@@ -344,14 +462,15 @@ class Vehicle():
         relevant = self.proximity()
         sub_index = self.get_path().get_progress()[-1]
         
-        # Remove all the coordinates that are further
-        # than self.path.count/2 dots behind the vehicle.
-        while sub_index >= int(self.get_path().count/2):
-            relevant.pop(0)
-            sub_index -= 1
+        # Remove the coordinates that have been passed.
+        self.passed = self.get_passed(sub_index)
+        if self.passed: relevant = relevant[self.passed:]
             
-        self.last = relevant[-1]
-        self.first = relevant[0]
+        self.last = tuple(relevant[-1].tolist())
+        self.first = tuple(relevant[0].tolist())
+        # The same coordinates as indexes of the whole path, check 'Pathh.closest'.
+        first, last = self.get_path().get_window_range()
+        self.relevant_range = (first+self.passed, last)
             
         self.relevant = relevant
     
@@ -359,23 +478,25 @@ class Vehicle():
         # Set all the dangerous locations, e.g. the locations where this
         # vehicle's path intersects with the path of another vehicle.
         
-        # We can't afford to do this every cycle. This method is paused
-        # for self.pause amount of milliseconds between each active cycle.
-        if self.counter%self.pause: return
+        # We can't afford to do this every cycle. The vehicles take turns,
+        # check the Scheduler-class. This is always done right after spawning.
+        if not self.is_due(): return
         
         if self.counter >= 1000:
             # Reset every second.
             self.counter = 0
             self.to_ignore = []
         
-        own = self.get_relevant_coordinates()
         radar = self.get_radar()
         checked = []
+        
+        # The vehicles on the same lanes are in order, check the Lanes-class.
+        lane = self.lanes.get_lane(self)
+        leader = self.lanes.get_leader(self)
                 
         for vehicle in radar.in_radar():
             
             check = False
-            cross_location = None
             spotted_now = vehicle.get_position()
             
             if vehicle in self.to_ignore: 
@@ -384,13 +505,20 @@ class Vehicle():
                 last_spotted = self.to_follow[1]
                 if not radar.distance(last_spotted, spotted_now):
                     check = True
-            elif vehicle in self.intersections.keys():
-                cross_location, angle, last_spotted = self.intersections[vehicle]
+            elif vehicle == leader:
+                # The vehicle right ahead on this lane or on the next lanes
+                # of the path is followed, their paths don't cross.
+                self.follow(vehicle)
+                check = True
+            elif self.lanes.get_lane(vehicle) == lane:
+                # The other vehicles on this lane are further ahead or behind.
+                check = True
             
             if not check:
                 
-                obsv = vehicle.get_relevant_coordinates()
-                has_to_yield, coords, angle = radar.intersects(own, obsv, cross_location)
+                # Look the crossing up piece by piece, check the ConflictTable-class.
+                # The answer is shared by both vehicles, check the PairCache-class.
+                has_to_yield, coords, angle = radar.find_crossing(vehicle)
                 
                 if has_to_yield:
                     relevant_dist = Constants.BLOCK_SIZE/1.5
@@ -418,22 +546,8 @@ class Vehicle():
                 elif coords:
                     # If 'angle' equals None but 'coords' exist, the paths are at least
                     # partially identical and therefore this vehicle is following 'vehicle'
-                    if radar.is_ahead(coords):
-                        # Only vehicles ahead count.
-                        if not self.to_follow[0]:
-                            self.to_follow = [vehicle, spotted_now]
-                        elif vehicle == self.to_follow[0]:
-                            # The only vehicle in 'visible' (so far!)
-                            # that shares the same path with this vehicle.
-                            self.to_follow = [vehicle, spotted_now]
-                        else:
-                            # If this vehicle's path is shared with more than one other
-                            # vehicle in 'visible', follow the closest one of these.
-                            own_posi = self.get_position()
-                            new = self.get_radar().distance(own_posi, vehicle.get_position())
-                            org = self.get_radar().distance(own_posi, self.to_follow[0].get_position())
-                            if new < org:
-                                self.to_follow = [vehicle, vehicle.get_position()]
+                    # Only vehicles ahead count.
+                    if radar.is_ahead(coords): self.follow(vehicle)
                 else:
                     self.to_ignore.append(vehicle)
                     
@@ -442,6 +556,23 @@ class Vehicle():
         # Keep the the leading vehicle for as long as it's relevant.
         if not self.to_follow[0] in checked: self.to_follow = [None, None]
     
+    def follow(self, vehicle):
+        # 'vehicle' is ahead of this one on the same road.
+        if not self.to_follow[0]:
+            self.to_follow = [vehicle, vehicle.get_position()]
+        elif vehicle == self.to_follow[0]:
+            # The only vehicle in 'visible' (so far!)
+            # that shares the same path with this vehicle.
+            self.to_follow = [vehicle, vehicle.get_position()]
+        else:
+            # If this vehicle's path is shared with more than one other
+            # vehicle in 'visible', follow the closest one of these.
+            own_posi = self.get_position()
+            new = self.get_radar().distance(own_posi, vehicle.get_position())
+            org = self.get_radar().distance(own_posi, self.to_follow[0].get_position())
+            if new < org:
+                self.to_follow = [vehicle, vehicle.get_position()]
+    
     def set_limit(self):
         # Set a limit to this vehicle's speed considering the
         # distance between this vehicle and the one being followed.
@@ -601,56 +732,45 @@ class Vehicle():
     def on_path(self):
         # Return True if the vehicle position is inside the path's radius.
         
-        posi = self.get_position()
+        if self.on_path_cycle == self.cycle: return self.on_path_value
         r = self.get_path().radius
-        nearby = self.get_relevant_coordinates()
-        for point in nearby:
-            if self.get_radar().distance(posi, point) <= r:
-                return True
-        # If we get here, there is no coordinate pair in the vehicle's path 
-        # within the the 'r' distance, therefore the vehicle is off path.
-        return False
+        # If the closest point of the relevant part of the path isn't
+        # within the the 'r' distance, the vehicle is off path.
+        self.on_path_value = self.nearest[0] <= r
+        self.on_path_cycle = self.cycle
+        return self.on_path_value
     
     def on_course(self):
         # Return True if the scaled velocity vector is pointing inside the path radius.
+        # The velocity doesn't change before the last call in a cycle, check 'self.drive'.
+        if self.on_course_cycle == self.cycle: return self.on_course_value
         
         magnitude = 25
-        normalized = self.get_radar().normalize(self.velocity)
+        if self.get_speed(): normalized = self.get_heading()
+        else: normalized = [0, 0]
         x = self.get_position()[0] + magnitude*normalized[0]
         y = self.get_position()[1] - magnitude*normalized[1]
         headed = [x, y]
         # 'headed' is a coordinate pair directly in front of the vehicle, the distance 
         # from the vehicle'sfront is determined by the velocity direction and 'magnitude'.
         r = self.get_path().radius
-        nearby = self.get_relevant_coordinates()
         # This is very similar to self.on_path().
-        for point in nearby:
-            if self.get_radar().distance(point, headed) <= r:
-                return True                
-        return False
+        self.on_course_value = self.get_path().is_within(headed, self.relevant_range[0], self.relevant_range[1], r)
+        self.on_course_cycle = self.cycle
+        return self.on_course_value
     
     def seek(self, offroad_speed):
         # This method makes the car return to it's desired path. The
         # vehicle is considered off path when it's position is not within
         # the distance of 'self.path.radius' from any of the path coordinates.
         
-        dist = math.inf
-        posi = self.get_position()
         radar = self.get_radar()
-        nearby = self.get_relevant_coordinates()
+        path = self.get_path()
         
         self.achieve_speed(offroad_speed)
         
-        # Stepper i is used to remember the 
-        # index of the path's closest point.
-        i = 0
-        for point in nearby:
-            new_dist = radar.distance(posi, point)
-            if new_dist < dist:
-                dist = new_dist
-                closest = point
-                i_0 = i
-            i += 1
+        # The path's closest point and its (fractional) coordinate index.
+        dist, index, closest, tangent = self.nearest
         
         x = Constants.PATH_RADIUS
         r = self.get_path().radius
@@ -670,10 +790,14 @@ class Vehicle():
                 
         # This is a vector from the path's closest point to the vehicle location.
         v_positon = [self.get_position()[0]-closest[0], -(self.get_position()[1]-closest[1])]
-        # This vector represents the path's direction two points forward from the closest point.
-        v_path = [nearby[i_0+2][0]-closest[0], -nearby[i_0+2][1]+closest[1]]
+        # This vector represents the path's direction two points forward from the closest
+        # point. It's measured between the coordinates, from the one nearest to the point.
+        coordinates = path.get_coordinates()
+        nearest = int(index+0.5)
+        forward = coordinates[min(nearest+2, len(coordinates)-1)]
+        v_path = [forward[0]-coordinates[nearest][0], -forward[1]+coordinates[nearest][1]]
         # This is the direction the vehicle is headed.
-        v_direction = [math.cos(math.radians(self.get_rotation())), math.sin(math.radians(self.get_rotation()))]
+        v_direction = self.get_heading()
         # This is the angle counting from the path direction to the vehicle direction.
         angle_between = radar.check_angle(v_path, v_direction)
         
@@ -700,29 +824,20 @@ class Vehicle():
     def regain_course(self, turn_speed, cruise_speed):
         # This method will make the vehicle steer the correct way until it's back on course.
         
-        dist = math.inf
-        posi = self.get_position()
         radar = self.get_radar()
-        nearby = self.get_relevant_coordinates()
-        
-        # Stepper 'i' is used to remember the index
-        # of the path's closest coordinate pair.
-        i = 0
-        for point in nearby:
-            new_dist = radar.distance(posi, point)
-            if new_dist < dist:
-                dist = new_dist
-                #closest = point
-                i_0 = i
-            i += 1
+        path = self.get_path()
+        
+        # The index of the coordinates nearest to the path's closest point.
+        index = int(self.nearest[1]+0.5)
+        coordinates = path.get_coordinates()
         
         lead = 4
-        start = i_0+lead
-        end = i_0+int(lead/2)
+        start = coordinates[min(index+lead, len(coordinates)-1)]
+        end = coordinates[min(index+int(lead/2), len(coordinates)-1)]
         # This vector represents the path's direction 'lead' points forward from the closest point.
-        v_path = [nearby[start][0]-nearby[end][0], -nearby[start][1]+nearby[end][1]]
+        v_path = [start[0]-end[0], -start[1]+end[1]]
         # This is the direction the vehicle is headed.
-        v_direction = [math.cos(math.radians(self.get_rotation())), math.sin(math.radians(self.get_rotation()))]
+        v_direction = self.get_heading()
         # This is the angle counting from the path direction to the vehicle direction.
         angle_between = radar.check_angle(v_path, v_direction)
         
@@ -750,7 +865,6 @@ class Vehicle():
             # the vehicle can not rotate in place.        
             return
         
-        angle = self.get_rotation()
         abs_speed = self.get_speed()
         
         # 'self.F_normal' amount of force can not be exceeded.
@@ -763,34 +877,12 @@ class Vehicle():
         # This makes sure the maximum amount is not exceeded.
         c_rotate = min(c_rotate_max, c_rotate_des)
         # The change is scaled considering 'Constants.TIME_STEP'.
-        angle = angle + self.scale(c_rotate)
-        
-        # First quarter
-        if self.velocity[0] >= 0 and self.velocity[1] >= 0:
-            v_x = abs_speed*math.cos(math.radians(angle))
-            v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-        # Second quarter
-        if self.velocity[0] < 0 and self.velocity[1] >= 0:
-            v_x = -abs_speed*math.sin(math.radians(angle-90))
-            if angle <= 180: v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-            else: v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-        # Third quarter    
-        if self.velocity[0] < 0 and self.velocity[1] < 0:
-            v_x = -abs_speed*math.cos(math.radians(angle-180))
-            v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-        # Fourth quarter
-        if self.velocity[0] >= 0 and self.velocity[1] < 0:
-            v_x = abs_speed*math.sin(math.radians(angle-270))
-            if angle < 360: v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-            else: v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-    
-        self.velocity = [v_x, v_y]
+        self.rotate(self.scale(c_rotate)*self.RADIANS)
     
     def steer_right(self, F):
         # Can not steer if the vehicle is not moving, the vehicle can not rotate in place.
         if not self.get_speed(): return
         # This is used alongside self.run() to simulate steering to the right.
-        angle = self.get_rotation()
         abs_speed = self.get_speed()
         # self.F_normal can not be exceeded.
         F = min(F, self.F_normal)
@@ -802,28 +894,7 @@ class Vehicle():
         # This makes sure the maximum amount is not exceeded.
         c_rotate = min(c_rotate_max, c_rotate_des)
         # The change is scaled considering the Constants.TIME_STEP.
-        angle = angle - self.scale(c_rotate)
-    
-        # First quarter
-        if self.velocity[0] >= 0 and self.velocity[1] >= 0:
-            v_x = abs_speed*math.cos(math.radians(angle))
-            if angle >= 0: v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-            else: v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-        # Second quarter
-        if self.velocity[0] < 0 and self.velocity[1] >= 0:
-            v_x = -abs_speed*math.sin(math.radians(angle-90))
-            v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-        # Third quarter    
-        if self.velocity[0] < 0 and self.velocity[1] < 0:
-            v_x = -abs_speed*math.cos(math.radians(angle-180))
-            if angle >= 180: v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-            else: v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-        # Fourth quarter
-        if self.velocity[0] >= 0 and self.velocity[1] < 0:
-            v_x = abs_speed*math.sin(math.radians(angle-270))
-            v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
-    
-        self.velocity = [v_x, v_y]
+        self.rotate(-self.scale(c_rotate)*self.RADIANS)
     
     def achieve_speed(self, desired_speed):
         # This method makes the vehicle achieve the speed of 'desired_speed'.
@@ -849,10 +920,7 @@ class Vehicle():
         def match_velocity():
             # When the actual speed is within the margin of 0.01
             # from the desired one, we might as well say they are equal.
-            angle = self.get_rotation()
-            v_x = desired_speed*math.cos(math.radians(angle))
-            v_y = desired_speed*math.sin(math.radians(angle))
-            self.velocity = [v_x, v_y]
+            self.set_speed(desired_speed)
                 
         if self.get_speed() > desired_speed:
             if not self.get_speed()-0.01 < desired_speed:
@@ -864,39 +932,20 @@ class Vehicle():
             else: match_velocity()
     
     def accelerate(self, F):
-        # Grow the vehicle velocity magnitude in
-        # small increments to simulate accelerating.
+        # Grow the vehicle speed in small
+        # increments to simulate accelerating.
         
         if self.get_speed() == self.max_speed: return
         
-        angle = math.radians(self.get_rotation())
-        
         if not self.get_speed(): 
-            # A minimal velocity to ensure the
-            # vehicle starts driving the correct way.
-            self.velocity[0] = 0.01*math.cos(angle)
-            self.velocity[1] = 0.01*math.sin(angle)
+            # A minimal speed to ensure the vehicle starts
+            # driving the way it was heading before stopping.
+            self.speed = 0.01
         
         F = min(F, self.F_positive) # 'self.F_positive' can not be exceeded.
         acceleration = self.scale(F/self.mass)
-        x_step = abs(acceleration*math.cos(angle))
-        y_step = math.sqrt(pow(acceleration,2)-pow(x_step,2))
-        
-        # These are the velocity components when the
-        # vehicle is traveling at the maximum speed.
-        x_max = abs(self.max_speed*math.cos(angle))
-        y_max = abs(self.max_speed*math.sin(angle))
-        
-        if abs(self.velocity[0])+x_step >= x_max:
-            if self.velocity[0] > 0: self.velocity[0] = x_max
-            else: self.velocity[0] = -x_max
-            if self.velocity[1] > 0: self.velocity[1] = y_max
-            else: self.velocity[1] = -y_max
-        else:
-            if self.velocity[0] > 0: self.velocity[0] = self.velocity[0] + x_step
-            else: self.velocity[0] = self.velocity[0] - x_step
-            if self.velocity[1] > 0: self.velocity[1] = self.velocity[1] + y_step
-            else: self.velocity[1] = self.velocity[1] - y_step            
+        # The maximum speed can not be exceeded.
+        self.set_speed(min(self.speed+acceleration, self.max_speed))
     
     def decelerate(self, F):
         # Bring the vehicle to a full stop if 
@@ -908,85 +957,28 @@ class Vehicle():
         F = min(F, self.F_negative)
         acceleration = self.scale(F/self.mass)
         
-        angle = math.radians(self.get_rotation())
-        x_step = abs(acceleration*math.cos(angle))
-        y_step = math.sqrt(pow(acceleration,2)-pow(x_step,2))
-        
-        if abs(self.velocity[0]) <= x_step: self.velocity[0] = 0
-        elif self.velocity[0] > 0: self.velocity[0] = self.velocity[0] - x_step
-        else: self.velocity[0] = self.velocity[0] + x_step
-        
-        if abs(self.velocity[1]) < y_step: self.velocity[1] = 0
-        elif self.velocity[1] > 0: self.velocity[1] = self.velocity[1] - y_step
-        else: self.velocity[1] = self.velocity[1] + y_step
+        if self.speed <= acceleration: self.set_speed(0)
+        else: self.set_speed(self.speed - acceleration)
     
     def set_parameters(self):
-        # Different types of vehicles have differing parameters.
-        
-        def set_mass():
-            if self.type == Constants.SEDAN:
-                self.mass = 1000
-            elif self.type == Constants.MINI_VAN:
-                self.mass = 1500
-            else:
-                self.mass = 2000
-            
-        def set_size():
-            base = Constants.VEHICLE_SIZE
-            if self.type == Constants.SEDAN:
-                self.width = 1.05*base
-                self.length = self.width*1.85
-            elif self.type == Constants.MINI_VAN:
-                self.width = 1.1*base
-                self.length = self.width*1.85
-            else:
-                self.width = 1.15*base
-                self.length = self.width*2.1
-            
-        def set_max_speed():
-            if self.type == Constants.SEDAN:
-                self.max_speed = 50
-            elif self.type == Constants.MINI_VAN:
-                self.max_speed = 42
-            else:
-                self.max_speed = 30
-    
-        def set_min_radius():
-            # This is a value to represent the minimum turn radius.
-            # This is not a physical radius, but a proportion between the vehicle's
-            # speed and the amount of rotation it can experience during each cycle.
-            # The smaller the value, the tighter the curve.
-            if self.type == Constants.SEDAN:
-                self.min_radius = 0.40
-            elif self.type == Constants.MINI_VAN:
-                self.min_radius = 0.43
-            else:
-                self.min_radius = 0.50
-        
-        set_mass()
-        set_size()
-        set_max_speed()
-        set_min_radius()
+        # Different types of vehicles have differing parameters,
+        # they are listed in the tables of this class.
+        
+        self.mass = self.MASS[self.type]
+        self.width = self.WIDTH[self.type]
+        self.length = self.LENGTH[self.type]
+        self.max_speed = self.MAX_SPEED[self.type]
+        # This is a value to represent the minimum turn radius.
+        # This is not a physical radius, but a proportion between the vehicle's
+        # speed and the amount of rotation it can experience during each cycle.
+        # The smaller the value, the tighter the curve.
+        self.min_radius = self.MIN_RADIUS[self.type]
         self.set_default_speeds()
         self.set_default_forces()
     
     def set_default_speeds(self):
-        # Off road-, turning- and cruising speeds for each vehicle type:
-                
-        if not self.is_rushing():
-            if self.type == Constants.SEDAN:
-                self.default_speeds = (4.4, 5.5, 6.0)
-            elif self.type == Constants.MINI_VAN:
-                self.default_speeds = (3.7, 4.0, 5.5)
-            else:
-                self.default_speeds = (3.5, 3.5, 4.5)
-        else:
-            if self.type == Constants.SEDAN:
-                self.default_speeds = (4.6, 5.8, 6.4)
-            elif self.type == Constants.MINI_VAN:
-                self.default_speeds = (3.9, 4.3, 5.9)
-            else:
-                self.default_speeds = (3.7, 3.8, 4.9)
+        # Off road-, turning- and cruising speeds for each vehicle type and mode.
+        self.default_speeds = self.DEFAULT_SPEEDS[self.type][self.rushing]
         
     def set_default_forces(self):
         # The amount of accelerating- braking- and steering force 
@@ -0,0 +1,35 @@
+
+import os
+import sys
+import pytest
+
+# The modules of the simulation import each other by their plain names.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from simulation import Simulation
+
+
+def sample_vehicles(size, seed, cycles, every):
+    # Run a rush hour simulation and return a list of snapshots taken every
+    # 'every' cycles, each one a list of (relevant coordinates, path pieces,
+    # passed coordinates) tuples, the state the radars look the crossings up by.
+    simulation = Simulation(size, seed)
+    simulation.change_mode()
+    snapshots = []
+    for i in range(cycles//every):
+        simulation.step(every)
+        snapshot = []
+        for vehicle in simulation.get_city().get_vehicles():
+            pieces = vehicle.get_path().get_window()
+            snapshot.append((vehicle.get_relevant_coordinates().copy(), pieces, vehicle.passed))
+        snapshots.append(snapshot)
+    return snapshots
+
+
+@pytest.fixture(scope='session')
+def snapshots():
+    # A few maps of different sizes, a couple of thousand cycles each.
+    found = []
+    for size, seed in ((5, 1), (7, 2), (9, 3)):
+        found += sample_vehicles(size, seed, 2000, 250)
+    return found
@@ -0,0 +1,75 @@
+from radar import Radar
+from constants import Constants
+from conflict_table import ConflictTable
+
+
+def intersects_loop(radar, own_coordinates, target_coordinates):
+    # The original coordinate by coordinate comparison of two paths.
+
+    def identical_paths(starting_from):
+        test_i, test_j = starting_from
+        for di, dj in ((2, 1), (3, 1), (1, 2), (2, 2), (3, 2), (1, 3), (2, 3), (3, 3)):
+            if radar.distance(own_coordinates[test_i+di], target_coordinates[test_j+dj]) <= identical_distance:
+                return True
+        return False
+
+    min_distance = Constants.BLOCK_SIZE/10
+    identical_distance = Constants.BLOCK_SIZE/100
+    limit_i = len(own_coordinates)-4
+    limit_j = len(target_coordinates)-4
+
+    for i in range(0, limit_i-4):
+        for j in range(0, limit_j):
+            if radar.distance(own_coordinates[i], target_coordinates[j]) < min_distance:
+                cross_point = own_coordinates[i]
+                if identical_paths((i, j)):
+                    return False, cross_point, None
+                v_current = radar.set_vector(own_coordinates[i], own_coordinates[i+1])
+                v_nearby = radar.set_vector(target_coordinates[j], target_coordinates[j+1])
+                angle_between = radar.check_angle(v_current, v_nearby)
+                if angle_between < 0 or abs(angle_between) > 150:
+                    return True, cross_point, angle_between
+                return False, cross_point, angle_between
+    return False, None, None
+
+
+def as_tuple(location):
+    if location is None: return None
+    return tuple(float(value) for value in location)
+
+
+def test_find_matches_loop(snapshots):
+    # The table only picks the pieces to compare, the answers
+    # must be exactly the ones the coordinates give.
+    radar = Radar()
+    table = ConflictTable()
+    compared, crossing = 0, 0
+    for snapshot in snapshots:
+        for own, own_pieces, own_passed in snapshot:
+            own_list = own.tolist()
+            for target, target_pieces, target_passed in snapshot:
+                if target is own: continue
+                expected = intersects_loop(radar, own_list, target.tolist())
+                answer = table.find(own_pieces, own_passed, own, target_pieces, target_passed, target)
+                assert (answer[0], as_tuple(answer[1]), answer[2]) == (expected[0], as_tuple(expected[1]), expected[2])
+                compared += 1
+                if expected[1] is not None: crossing += 1
+    assert compared > 1000 and crossing > 100
+
+
+def test_far_pieces_are_not_near():
+    # A piece never reaches further than the next block.
+    table = ConflictTable()
+    key = (0, (1, 1))
+    assert not table.is_near((3, 3), key, (5, 3), key)
+    assert table.is_near((3, 3), key, (3, 3), key)
+
+
+def test_spans_leave_out_passed_coordinates():
+    table = ConflictTable()
+    line, curve = (0, (1, 1)), (2, (1, 1))
+    pieces = [((1, 1), line), ((1, 2), curve), ((1, 3), line)]
+    lengths = [table.get_length(key) for block, key in pieces]
+    spans = table.spans(pieces, lengths[0]+2, 30)
+    assert spans[0] == ((1, 2), curve, 0, lengths[1]-2)
+    assert spans[-1][3] == 30
@@ -0,0 +1,23 @@
+from simulation import Simulation
+
+
+def test_visible_matches_the_distances():
+    # Only the pairs in neighbouring cells are kept on the queue, every
+    # vehicle within the range must still be seen and nothing else.
+    simulation = Simulation(21, 1)
+    simulation.change_mode()
+    queue = simulation.get_city().queue
+    fewer = False
+    for i in range(300):
+        simulation.step(10)
+        vehicles = simulation.get_city().get_vehicles()
+        for own in vehicles:
+            expected = []
+            for target in vehicles:
+                if target is own: continue
+                p1, p2 = own.get_position(), target.get_position()
+                dx, dy = p1[0]-p2[0], p1[1]-p2[1]
+                if dx*dx + dy*dy <= queue.reach*queue.reach: expected.append(target)
+            assert queue.query(own) == expected
+        if len(queue.pairs) < len(vehicles)*(len(vehicles)-1)//2: fewer = True
+    assert fewer
@@ -0,0 +1,50 @@
+from lanes import Lanes
+
+
+class Path():
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.offsets = [10*k for k in range(len(pieces)+1)]
+        self.progress = 0
+
+    def get_pieces(self): return self.pieces
+
+    def get_offsets(self): return self.offsets
+
+    def get_window(self): return self.pieces[self.progress:self.progress+4]
+
+
+class Member():
+
+    def __init__(self, pieces):
+        self.path = Path(pieces)
+
+    def get_path(self): return self.path
+
+
+def test_first_on_a_lane_follows_the_next_lane():
+    lanes = Lanes()
+    pieces = ['a', 'b', 'c', 'd', 'e']
+    first, second, third = Member(pieces), Member(pieces), Member(pieces)
+    lanes.move(first, 25)
+    lanes.move(second, 5)
+    lanes.move(third, 3)
+    # 'b' is empty, the last vehicle on 'c' leads the one on 'a'.
+    assert lanes.get_leader(third) == second
+    assert lanes.get_leader(second) == first
+    assert lanes.get_leader(first) is None
+    lanes.move(second, 12)
+    assert lanes.get_last('b') == second
+    assert lanes.get_leader(third) == second
+
+
+def test_leaders_beyond_the_window_are_left_out():
+    lanes = Lanes()
+    pieces = ['a', 'b', 'c', 'd', 'e']
+    ahead, behind = Member(pieces), Member(pieces)
+    lanes.move(ahead, 45)
+    lanes.move(behind, 5)
+    assert lanes.get_leader(behind) is None
+    behind.get_path().progress = 1
+    assert lanes.get_leader(behind) == ahead
@@ -0,0 +1,24 @@
+from simulation import Simulation
+
+
+def test_find_matches_the_conflict_table():
+    # The pairs are formed once per path progress of both vehicles, the
+    # answers must still be the ones the relevant coordinates give.
+    simulation = Simulation(9, 3)
+    simulation.change_mode()
+    city = simulation.get_city()
+    compared, crossing = 0, 0
+    for i in range(8):
+        simulation.step(250)
+        vehicles = city.get_vehicles()
+        for own in vehicles:
+            for target in vehicles:
+                if target is own: continue
+                expected = city.conflicts.find(own.get_path().get_window(), own.passed, \
+                    own.get_relevant_coordinates(), target.get_path().get_window(), \
+                    target.passed, target.get_relevant_coordinates())
+                assert city.pairs.find(own, target) == expected
+                compared += 1
+                if expected[1] is not None: crossing += 1
+    assert compared > 1000 and crossing > 100
+    assert city.pairs.hits
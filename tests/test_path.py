@@ -0,0 +1,59 @@
+import math
+import numpy as np
+import pytest
+from simulation import Simulation
+
+
+@pytest.fixture(scope='module')
+def positions():
+    # The positions of the vehicles during a rush hour as (path, position,
+    # relevant range) tuples, the relevant range as it was at that moment.
+    found = []
+    for size, seed in ((5, 1), (9, 3)):
+        simulation = Simulation(size, seed)
+        simulation.change_mode()
+        for i in range(100):
+            simulation.step(10)
+            for vehicle in simulation.get_city().get_vehicles():
+                found.append((vehicle.get_path(), tuple(vehicle.get_position()), vehicle.relevant_range))
+    return found
+
+
+def test_locate_hits_the_coordinates(positions):
+    # At whole indexes the pieces give the very same points as the samples.
+    for path in {id(path): path for path, _, _ in positions}.values():
+        coordinates = path.get_coordinates()
+        for index in range(len(coordinates)):
+            point = path.locate(index)[0]
+            assert math.dist(point, coordinates[index]) < 1e-9
+
+
+def test_closest_matches_the_coordinates(positions):
+    assert len(positions) > 1000
+    for path, position, (first, last) in positions:
+        dist, index, point, tangent = path.closest(position, first, last)
+        assert first <= index <= last
+        assert math.dist(point, position) == pytest.approx(dist, abs=1e-9)
+        assert math.dist(point, path.locate(index)[0]) < 1e-9
+        # The samples are on the path, none of them can be closer.
+        distances = np.hypot(*(path.get_coordinates()[first:last]-position).T)
+        nearest = int(distances.argmin())
+        assert dist <= distances[nearest]+1e-9
+        # The closest point lies next to the nearest sample.
+        assert abs(index-(first+nearest)) <= 1
+
+
+def test_closest_matches_a_dense_search(positions):
+    for path, position, (first, last) in positions[::10]:
+        dist = path.closest(position, first, last)[0]
+        dense = min(math.dist(path.locate(index)[0], position) for index in np.arange(first, last, 0.02))
+        assert dist <= dense+1e-9
+        assert dense-dist < 0.05
+
+
+def test_is_within_agrees_with_closest(positions):
+    for path, position, (first, last) in positions:
+        dist = path.closest(position, first, last)[0]
+        for distance in (path.radius, dist-1e-6, dist+1e-6):
+            if distance < 0: continue
+            assert path.is_within(position, first, last, distance) == (dist <= distance)
@@ -0,0 +1,26 @@
+import pytest
+from constants import Constants
+from path import Pathh
+from simulation import Simulation
+
+
+@pytest.mark.parametrize('size, seed', ((5, 1), (7, 2), (9, 3), (11, 5)))
+def test_searches_find_the_shortest_routes(size, seed):
+    # A* and the bidirectional search must find routes as short as the
+    # ones in the plain Dijkstra shortest path tree of 'Graph.get_distances'.
+    city = Simulation(size, seed).get_city()
+    graph = city.graph
+    compared = 0
+    for index1, (preferred, reachable) in enumerate(city.reachable):
+        distances = graph.get_distances(city.border_vertices[index1])
+        for index2 in reachable:
+            entry, goal = city.entry_points[index1], city.exit_points[index2]
+            lengths = []
+            for bidirectional_search in (False, True):
+                path = Pathh(Constants.SEDAN)
+                assert path.generate_path(graph, city.blocks, entry, goal, bidirectional_search)
+                lengths.append(len(path.get_pieces()))
+            # One piece per block crossed, plus the pieces outside the map.
+            assert lengths[0] == lengths[1] == distances[city.border_vertices[index2]]+3
+            compared += 1
+    assert compared > 10
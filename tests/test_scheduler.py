@@ -0,0 +1,32 @@
+from scheduler import Scheduler
+
+
+class Member():
+
+    def __init__(self):
+        self.bucket = None
+
+
+def test_add_picks_the_furthest_empty_bucket():
+    scheduler = Scheduler()
+    scheduler.current = 3
+    first, second = Member(), Member()
+    scheduler.add(first)
+    # The turn of the current bucket has just been, it comes again last.
+    assert first.bucket == 3
+    scheduler.add(second)
+    assert second.bucket == 2
+
+
+def test_add_keeps_the_buckets_even():
+    scheduler = Scheduler()
+    members = [Member() for i in range(3*scheduler.size+1)]
+    for member in members:
+        scheduler.add(member)
+        scheduler.next()
+    loads = [len(bucket) for bucket in scheduler.buckets]
+    assert max(loads)-min(loads) <= 1
+    assert scheduler.get_budget() == 4
+    for member in members[:scheduler.size]: scheduler.remove(member)
+    loads = [len(bucket) for bucket in scheduler.buckets]
+    assert max(loads)-min(loads) <= 1
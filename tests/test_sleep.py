@@ -0,0 +1,28 @@
+import pytest
+from simulation import Simulation
+from vehicle import Vehicle
+
+
+def trajectories(size, seed, cycles):
+    # The positions of every vehicle every ten cycles of a rush hour.
+    simulation = Simulation(size, seed)
+    simulation.change_mode()
+    found = []
+    for i in range(cycles//10):
+        simulation.step(10)
+        found.append(sorted((vehicle.id, tuple(vehicle.get_position())) \
+            for vehicle in simulation.get_city().get_vehicles()))
+    return found
+
+
+@pytest.mark.parametrize('size, seed', ((7, 1), (9, 3), (11, 5)))
+def test_sleeping_does_not_change_the_trajectories(monkeypatch, size, seed):
+    # A sleeping vehicle must be woken up whenever driving it would make a difference.
+    calls = []
+    sleep = Vehicle.sleep
+    monkeypatch.setattr(Vehicle, 'sleep', lambda vehicle: calls.append(vehicle) or sleep(vehicle))
+    asleep = trajectories(size, seed, 4000)
+    assert calls
+    monkeypatch.setattr(Vehicle, 'sleep', lambda vehicle: None)
+    awake = trajectories(size, seed, 4000)
+    assert asleep == awake
@@ -0,0 +1,160 @@
+import math
+import random
+import pytest
+from constants import Constants
+from vehicle import Vehicle
+
+
+class DegreeVehicle():
+
+    '''
+    The original velocity and degree based update of the vehicle, the
+    heading of 'Vehicle' is checked against this. 'self.update_rotation'
+    was called once at the start of each cycle.
+    '''
+
+    def __init__(self, vehicle, rotation, speed):
+        self.mass, self.min_radius = vehicle.mass, vehicle.min_radius
+        self.max_speed = vehicle.max_speed
+        self.F_positive, self.F_normal, self.F_negative = vehicle.F_positive, vehicle.F_normal, vehicle.F_negative
+        self.rotation = rotation
+        angle = math.radians(rotation)
+        self.velocity = [speed*math.cos(angle), speed*math.sin(angle)]
+        self.position = list(vehicle.get_position())
+
+    def scale(self, base_value):
+        return 0.01*base_value*Constants.TIME_STEP
+
+    def get_speed(self):
+        return math.sqrt(math.pow(self.velocity[0],2)+math.pow(self.velocity[1],2))
+
+    def run(self):
+        self.position[0] += Constants.BLOCK_SIZE*self.scale(self.velocity[0])/100
+        self.position[1] -= Constants.BLOCK_SIZE*self.scale(self.velocity[1])/100
+
+    def update_rotation(self):
+        if self.get_speed() <= 0.01: return
+        if self.velocity[1] >= 0:
+            self.rotation = math.degrees(math.acos(self.velocity[0]/self.get_speed()))
+        else:
+            self.rotation = 360-math.degrees(math.acos(self.velocity[0]/self.get_speed()))
+
+    def get_rotate(self, F):
+        abs_speed = self.get_speed()
+        F = min(F, self.F_normal)
+        return self.scale(min(abs_speed/self.min_radius, 100*F/(abs_speed*self.mass)))
+
+    def steer_left(self, F):
+        if not self.get_speed(): return
+        abs_speed = self.get_speed()
+        angle = self.rotation+self.get_rotate(F)
+        if self.velocity[0] >= 0 and self.velocity[1] >= 0:
+            v_x = abs_speed*math.cos(math.radians(angle))
+            v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+        if self.velocity[0] < 0 and self.velocity[1] >= 0:
+            v_x = -abs_speed*math.sin(math.radians(angle-90))
+            if angle <= 180: v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+            else: v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+        if self.velocity[0] < 0 and self.velocity[1] < 0:
+            v_x = -abs_speed*math.cos(math.radians(angle-180))
+            v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+        if self.velocity[0] >= 0 and self.velocity[1] < 0:
+            v_x = abs_speed*math.sin(math.radians(angle-270))
+            if angle < 360: v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+            else: v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+        self.velocity = [v_x, v_y]
+
+    def steer_right(self, F):
+        if not self.get_speed(): return
+        abs_speed = self.get_speed()
+        angle = self.rotation-self.get_rotate(F)
+        if self.velocity[0] >= 0 and self.velocity[1] >= 0:
+            v_x = abs_speed*math.cos(math.radians(angle))
+            if angle >= 0: v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+            else: v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+        if self.velocity[0] < 0 and self.velocity[1] >= 0:
+            v_x = -abs_speed*math.sin(math.radians(angle-90))
+            v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+        if self.velocity[0] < 0 and self.velocity[1] < 0:
+            v_x = -abs_speed*math.cos(math.radians(angle-180))
+            if angle >= 180: v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+            else: v_y = math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+        if self.velocity[0] >= 0 and self.velocity[1] < 0:
+            v_x = abs_speed*math.sin(math.radians(angle-270))
+            v_y = -math.sqrt(math.pow(abs_speed,2)-math.pow(v_x,2))
+        self.velocity = [v_x, v_y]
+
+    def accelerate(self, F):
+        if self.get_speed() == self.max_speed: return
+        angle = math.radians(self.rotation)
+        acceleration = self.scale(min(F, self.F_positive)/self.mass)
+        x_step = abs(acceleration*math.cos(angle))
+        y_step = math.sqrt(pow(acceleration,2)-pow(x_step,2))
+        x_max = abs(self.max_speed*math.cos(angle))
+        y_max = abs(self.max_speed*math.sin(angle))
+        if abs(self.velocity[0])+x_step >= x_max:
+            self.velocity[0] = x_max if self.velocity[0] > 0 else -x_max
+            self.velocity[1] = y_max if self.velocity[1] > 0 else -y_max
+        else:
+            if self.velocity[0] > 0: self.velocity[0] += x_step
+            else: self.velocity[0] -= x_step
+            if self.velocity[1] > 0: self.velocity[1] += y_step
+            else: self.velocity[1] -= y_step
+
+    def decelerate(self, F):
+        if not self.get_speed(): return
+        acceleration = self.scale(min(F, self.F_negative)/self.mass)
+        angle = math.radians(self.rotation)
+        x_step = abs(acceleration*math.cos(angle))
+        y_step = math.sqrt(pow(acceleration,2)-pow(x_step,2))
+        if abs(self.velocity[0]) <= x_step: self.velocity[0] = 0
+        elif self.velocity[0] > 0: self.velocity[0] -= x_step
+        else: self.velocity[0] += x_step
+        if abs(self.velocity[1]) < y_step: self.velocity[1] = 0
+        elif self.velocity[1] > 0: self.velocity[1] -= y_step
+        else: self.velocity[1] += y_step
+
+
+def drive_both(vehicle_type, rotation, seed, steps):
+    # Drive a vehicle and it's degree based reference through the same random
+    # cycles, each one changing the speed, steering and then moving on.
+    vehicle = Vehicle(vehicle_type)
+    vehicle.position = [500.0, 500.0]
+    vehicle.set_speed(8.0)
+    angle = math.radians(rotation)
+    vehicle.set_heading((math.cos(angle), math.sin(angle)))
+    reference = DegreeVehicle(vehicle, rotation, 8.0)
+    rng = random.Random(seed)
+    for step in range(steps):
+        reference.update_rotation()
+        F = rng.uniform(0, 3000)
+        if vehicle.get_speed() < 4: action = 'accelerate'
+        elif vehicle.get_speed() > 12: action = 'decelerate'
+        else: action = rng.choice(('accelerate', 'decelerate', None))
+        if action:
+            getattr(vehicle, action)(F)
+            getattr(reference, action)(F)
+        F = rng.uniform(0, 3000)
+        action = rng.choice(('steer_left', 'steer_right', None))
+        if action:
+            getattr(vehicle, action)(F)
+            getattr(reference, action)(F)
+        vehicle.run()
+        reference.run()
+        yield vehicle, reference
+
+
+@pytest.mark.parametrize('vehicle_type, rotation, seed', ((Constants.SEDAN, 0, 1), \
+    (Constants.MINI_VAN, 135, 2), (Constants.PICKUP_TRUCK, 270, 3), (Constants.SEDAN, 315, 4)))
+def test_heading_matches_the_degree_update(vehicle_type, rotation, seed):
+    for vehicle, reference in drive_both(vehicle_type, rotation, seed, 2000):
+        reference.update_rotation()
+        heading = vehicle.get_heading()
+        # The heading stays a unit vector.
+        assert abs(heading[0]*heading[0]+heading[1]*heading[1]-1) < 1e-12
+        # The same direction and speed as the velocity of the reference.
+        assert abs(vehicle.get_speed()-reference.get_speed()) < 1e-9
+        difference = (vehicle.get_rotation()-reference.rotation+180)%360-180
+        assert abs(difference) < 1e-6
+    # The positions drift apart by round-off only.
+    assert math.dist(vehicle.get_position(), reference.position) < 1e-6